@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark filename_ban_hook's BAD_PATTERNS matcher as the rule table grows
+
+Compares the original per-pattern re.search loop against PatternIndex for
+rule tables scaled up with synthetic categories, and reports the cost per
+filename. PatternIndex should stay roughly flat while the loop grows.
+
+Usage: python3 benchmarks/bench_bad_patterns.py [--scales 1,4,16] [--names 2000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "hooks"))
+
+import filename_ban_hook  # noqa: E402
+
+WORDS = [
+    "user",
+    "auth",
+    "payment",
+    "service",
+    "handler",
+    "model",
+    "router",
+    "cache",
+    "client",
+    "parser",
+    "report",
+    "schema",
+]
+
+
+def scaled_patterns(scale, rng):
+    """Return BAD_PATTERNS plus synthetic categories of the same shape"""
+    table = dict(filename_ban_hook.BAD_PATTERNS)
+    for i in range(len(table) * (scale - 1)):
+        words = [
+            "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6))
+            for _ in range(4)
+        ]
+        patterns = []
+        for word in words:
+            patterns += [rf"^{word}$", rf"^{word}_", rf"_{word}$"]
+        patterns.append(rf"^{words[0]}\d+$")
+        table[f"synthetic_{i}"] = {
+            "patterns": patterns,
+            "reason": "Synthetic rule",
+            "suggestion": "Synthetic suggestion",
+        }
+    return table
+
+
+def loop_match(table, name):
+    """The original check_bad_patterns loop"""
+    for category, info in table.items():
+        for pattern in info["patterns"]:
+            if re.search(pattern, name, re.IGNORECASE):
+                return category
+    return None
+
+
+def index_match(index, name):
+    rule_ids = index.match_ids(name)
+    return index.rules[rule_ids[0]][0] if rule_ids else None
+
+
+def sample_names(count, rng):
+    names = []
+    for _ in range(count):
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.3:
+            parts.append(rng.choice(["final", "v2", "tmp", "backup", "debug"]))
+        names.append("_".join(parts))
+    return names
+
+
+def time_per_name(func, names, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            func(name)
+        best = min(best, time.perf_counter() - start)
+    return best / len(names) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="1,4,16", help="Rule table multipliers")
+    parser.add_argument("--names", type=int, default=2000, help="Filenames per run")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = sample_names(args.names, rng)
+
+    print(f"{'scale':>6} {'rules':>7} {'loop us/name':>14} {'index us/name':>15}")
+    for scale in (int(s) for s in args.scales.split(",")):
+        table = scaled_patterns(scale, rng)
+        index = filename_ban_hook.PatternIndex(table)
+        for name in names[:200]:
+            assert loop_match(table, name) == index_match(index, name), name
+        rules = sum(len(info["patterns"]) for info in table.values())
+        # The loop recompiles once the table outgrows re's cache; sample fewer names
+        loop_us = time_per_name(lambda n: loop_match(table, n), names[:200], repeat=1)
+        index_us = time_per_name(lambda n: index_match(index, n), names)
+        print(f"{scale:>6} {rules:>7} {loop_us:>14.2f} {index_us:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
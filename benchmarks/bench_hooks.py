@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Cold- and warm-start latency benchmark for every PreToolUse hook
+
+Runs each hook on a fixed corpus of Write/Edit/MultiEdit payloads and
+records, per (hook, payload):
+
+  cold_ms   best wall time of a fresh `python3 <hook>.py` process
+  rss_kb    peak resident set size of that process (VmHWM, Linux only)
+  warm_us   best in-process run_hook() time with the module already loaded
+  exit      the hook's exit code (a changed verdict is reported as well)
+
+check_phase runs in a scratch project deployed by phase_manager.py (phase
+testdesign). The verdict cache and telemetry are disabled so every call
+does the full evaluation. Results are written as JSON; with --baseline the
+run is compared to an earlier result file and exits 1 when a metric got
+slower (or bigger) by more than --threshold.
+
+Timings only compare on the same machine, so no baseline is committed.
+Record one from the revision to compare against, then check a change:
+
+  python3 benchmarks/bench_hooks.py --save-baseline   # on the base revision
+  python3 benchmarks/bench_hooks.py --baseline        # with the change
+
+Both default to benchmarks/results/baseline.json.
+
+Usage: python3 benchmarks/bench_hooks.py [--output FILE] [--runs 5]
+                                         [--save-baseline [FILE]]
+                                         [--baseline [FILE]] [--threshold 0.2]
+                                         [--hooks chinese,show,...]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+HOOKS_DIR = os.path.join(REPO_ROOT, "hooks")
+sys.path.insert(0, HOOKS_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "local_hooks"))
+
+# Measure full evaluations, not cache hits or log writes
+os.environ["HOOK_VERDICT_CACHE"] = "false"
+os.environ["HOOK_TELEMETRY"] = "false"
+
+import dispatch_hook  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "bench_hooks.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "results", "baseline.json")
+METRICS = ("cold_ms", "rss_kb", "warm_us")
+# Differences below these are noise, whatever the relative change
+NOISE_FLOOR = {"cold_ms": 5.0, "rss_kb": 1024, "warm_us": 20.0}
+# Hooks benchmarked in-process on their own; "dispatch" runs the default checks
+HOOKS = ["chinese", "filename", "show", "protect_phase", "phase", "dispatch"]
+
+# Runs a hook as __main__ and writes its peak RSS on exit. ru_maxrss from
+# wait4 cannot be used: Linux carries the parent's peak across fork and exec,
+# so every child would report at least this process's size.
+RSS_WRAPPER = """
+import atexit, os, runpy, sys
+def report():
+    with open("/proc/self/status") as f:
+        hwm = next(line for line in f if line.startswith("VmHWM:"))
+    with open(os.environ["BENCH_RSS_FILE"], "w") as out:
+        out.write(hwm.split()[1])
+atexit.register(report)
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def python_module(lines):
+    """A representative Python source of about `lines` lines"""
+    out = ['"""Data loading helpers"""', "import os", "", ""]
+    i = 0
+    while len(out) < lines:
+        out += [
+            f"def load_{i}(path, limit=100):",
+            f'    """Load batch {i} from path, at most limit rows"""',
+            "    # Skip the header row",
+            "    rows = []",
+            '    with open(os.path.join(path, "data.csv")) as f:',
+            "        for line in f.readlines()[1:limit]:",
+            '            rows.append(line.split(","))',
+            f'    print(f"loaded {{len(rows)}} rows for batch {i}")',
+            "    return rows",
+            "",
+            "",
+        ]
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def js_module(lines):
+    """A representative JavaScript source of about `lines` lines"""
+    out = ["/**", " * Request handlers", " */", ""]
+    i = 0
+    while len(out) < lines:
+        out += [
+            f"// Handle request {i}",
+            f"export async function handle{i}(req, res) {{",
+            "  /* validate the body before use */",
+            '  const body = JSON.parse(req.body || "{}");',
+            f"  res.send(`handled ${{body.id}} by {i}`);",
+            "}",
+            "",
+        ]
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def build_corpus():
+    """Fixed payloads: name -> hook input"""
+    source = python_module(400)
+    lines = source.splitlines(keepends=True)
+    edits = [
+        {
+            "old_string": "".join(lines[i : i + 3]),
+            "new_string": "".join(lines[i : i + 3]).replace("rows", "records"),
+        }
+        for i in range(40, 40 + 10 * 33, 33)
+    ]
+    return {
+        "write_small": {
+            "tool_name": "Write",
+            "tool_input": {"file_path": "user_service.py", "content": "x = 1\n"},
+        },
+        "write_python": {
+            "tool_name": "Write",
+            "tool_input": {"file_path": "src/data_loader.py", "content": source},
+        },
+        "write_js": {
+            "tool_name": "Write",
+            "tool_input": {"file_path": "src/handlers.js", "content": js_module(300)},
+        },
+        "write_markdown": {
+            "tool_name": "Write",
+            "tool_input": {
+                "file_path": "docs/usage.md",
+                "content": "# Usage\n\n" + "Run `make test` before pushing.\n" * 100,
+            },
+        },
+        "write_blocked": {
+            "tool_name": "Write",
+            "tool_input": {
+                "file_path": "final_v2.py",
+                "content": "# 注释\nimport matplotlib.pyplot as plt\nplt.show()\n",
+            },
+        },
+        "edit_python": {
+            "tool_name": "Edit",
+            "tool_input": {"file_path": "src/data_loader.py", **edits[0]},
+        },
+        "multiedit_python": {
+            "tool_name": "MultiEdit",
+            "tool_input": {"file_path": "src/data_loader.py", "edits": edits},
+        },
+    }
+
+
+def deploy_phase_project(tmp_dir):
+    """Deploy the phase hooks into a scratch project, returning its hooks dir"""
+    from phase_manager import PhaseDeployer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        PhaseDeployer().copy_templates(tmp_dir)
+    with open(os.path.join(tmp_dir, ".claude", "current_phase"), "w") as f:
+        f.write("testdesign\n")
+    return os.path.join(tmp_dir, ".claude", "hooks")
+
+
+def hook_paths(phase_hooks_dir):
+    """Hook name -> script path"""
+    paths = {}
+    for name in HOOKS:
+        if name == "dispatch":
+            paths[name] = os.path.join(HOOKS_DIR, "dispatch_hook.py")
+        elif name == "phase":
+            paths[name] = os.path.join(phase_hooks_dir, "check_phase.py")
+        else:
+            paths[name] = dispatch_hook.find_check_file(name)
+    return paths
+
+
+def run_cold(path, payload, cwd):
+    """Run a hook in a fresh interpreter: (wall_ms, exit_code)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, path],
+        input=payload,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+    )
+    return (time.perf_counter() - start) * 1000, result.returncode
+
+
+def peak_rss_kb(path, payload, cwd):
+    """Peak RSS of one fresh hook process in KiB, or None off Linux"""
+    if not os.path.exists("/proc/self/status"):
+        return None
+    with tempfile.NamedTemporaryFile("r") as rss_file:
+        subprocess.run(
+            [sys.executable, "-c", RSS_WRAPPER, path],
+            input=payload,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+            env=dict(os.environ, BENCH_RSS_FILE=rss_file.name),
+        )
+        value = rss_file.read().strip()
+    return int(value) if value else None
+
+
+def time_warm(func, min_time=0.2):
+    """Best per-call time in microseconds, repeating for at least min_time"""
+    best, calls = float("inf"), 0
+    deadline = time.perf_counter() + min_time
+    while calls < 5 or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+        calls += 1
+    return best * 1e6
+
+
+def warm_runner(name, path):
+    """Return a function evaluating a payload in-process"""
+    if name == "dispatch":
+        checks = dispatch_hook.load_checks(
+            dispatch_hook.parse_check_names(dispatch_hook.DEFAULT_CHECKS)
+        )
+        return lambda data: dispatch_hook.dispatch(data, checks)
+    return dispatch_hook.load_module(f"bench_{name}", path).run_hook
+
+
+def run_benchmarks(names, runs, cwd, phase_hooks_dir):
+    corpus = build_corpus()
+    paths = hook_paths(phase_hooks_dir)
+    results = {}
+    for name in names:
+        runner = warm_runner(name, paths[name])
+        for case, data in corpus.items():
+            payload = json.dumps(data, ensure_ascii=False).encode()
+            cold = [run_cold(paths[name], payload, cwd) for _ in range(runs)]
+            with contextlib.redirect_stderr(io.StringIO()):
+                warm_us = time_warm(lambda: runner(data))
+            result = {
+                "cold_ms": round(min(c[0] for c in cold), 2),
+                "rss_kb": peak_rss_kb(paths[name], payload, cwd),
+                "warm_us": round(warm_us, 1),
+                "exit": cold[-1][1],
+            }
+            results[f"{name}/{case}"] = result
+            print(
+                f"{name:<14} {case:<18} {result['cold_ms']:>9.1f} "
+                f"{result['warm_us']:>10.1f} {result['rss_kb'] or '-':>9} "
+                f"{result['exit']:>5}",
+                flush=True,
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return regression messages against a baseline result set"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base.get("exit") != result["exit"]:
+            regressions.append(f"{key}: exit {base.get('exit')} -> {result['exit']}")
+        for metric in METRICS:
+            old, new = base.get(metric), result[metric]
+            if not old or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > NOISE_FLOOR[metric]:
+                regressions.append(
+                    f"{key}: {metric} {old} -> {new} ({(new / old - 1) * 100:+.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Result JSON file")
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="Earlier result JSON to compare against (default: the saved baseline)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help=f"Also save this run as the baseline (default {DEFAULT_BASELINE})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown before failing (default 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Cold runs per payload (best is kept)"
+    )
+    parser.add_argument("--hooks", default=",".join(HOOKS), help="Hooks to run")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.hooks.split(",") if n.strip()]
+    unknown = sorted(set(names) - set(HOOKS))
+    if unknown:
+        parser.error(f"unknown hooks: {', '.join(unknown)}")
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(
+            f"no baseline at {args.baseline}; record one first with --save-baseline"
+        )
+
+    print(
+        f"{'hook':<14} {'payload':<18} {'cold ms':>9} {'warm us':>10} "
+        f"{'rss KiB':>9} {'exit':>5}"
+    )
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        phase_hooks_dir = deploy_phase_project(tmp_dir)
+        # Cold and warm runs both see the scratch project as cwd
+        os.chdir(tmp_dir)
+        try:
+            results = run_benchmarks(names, args.runs, tmp_dir, phase_hooks_dir)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.baseline:
+        # Read before writing: --save-baseline may replace the same file
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[ERROR] {len(regressions)} regression(s) vs {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"[OK] No regressions beyond {args.threshold:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
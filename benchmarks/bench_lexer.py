@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark check_chinese_hook's comment/string extraction on adversarial input
+
+Compares the original regex extraction against the Lexer at doubling input
+sizes and prints the growth factor between consecutive sizes. A linear
+scanner doubles its time when the input doubles (factor ~2); the legacy
+regexes go quadratic on unterminated block comments (factor ~4).
+
+Usage: python3 benchmarks/bench_lexer.py [--sizes 2000,4000,8000,16000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "hooks"))
+
+import check_chinese_hook  # noqa: E402
+
+# name -> (extension, mode, unit repeated to build the input)
+CASES = {
+    "unterminated_block": (".c", "comments", "/* "),
+    "unterminated_docstring": (".py", "comments", '"""\nx = 1  # y\n'),
+    "hash_in_strings": (".py", "comments", 'a = "#x" + \'#y\'\n'),
+    "escaped_quotes": (".js", "strings", '"\\"\\\\" '),
+    "unbalanced_quotes": (".txt", "strings", "\"'"),
+}
+
+
+def legacy_comments(content, file_ext):
+    """The original regex-based extract_comments_from_content"""
+    comments = []
+    if file_ext in [".cpp", ".cc", ".c", ".h", ".hpp", ".cxx", ".js", ".jsx",
+                    ".ts", ".tsx", ".java", ".go", ".rs"]:  # fmt: skip
+        for match in re.finditer(r"//(.*)$", content, re.MULTILINE):
+            comments.append(match.group(1))
+        for match in re.finditer(r"/\*[\s\S]*?\*/", content):
+            comments.append(match.group(0))
+    elif file_ext in [".py", ".pyw"]:
+        for match in re.finditer(r"#(.*)$", content, re.MULTILINE):
+            comments.append(match.group(1))
+        for match in re.finditer(r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'', content):
+            comments.append(match.group(0))
+    elif file_ext in [".sh", ".bash", ".zsh"]:
+        for match in re.finditer(r"#(.*)$", content, re.MULTILINE):
+            comments.append(match.group(1))
+    return comments
+
+
+def legacy_strings(content, file_ext):
+    """The original strings-mode regex"""
+    return re.findall(r'"[^"]*"|\'[^\']*\'', content)
+
+
+def lexer_comments(content, file_ext):
+    return list(check_chinese_hook.iter_comments(content, file_ext))
+
+
+def lexer_strings(content, file_ext):
+    return list(check_chinese_hook.iter_strings(content, file_ext))
+
+
+EXTRACTORS = {
+    "comments": (legacy_comments, lexer_comments),
+    "strings": (legacy_strings, lexer_strings),
+}
+
+
+def best_time(func, content, file_ext, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content, file_ext)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", default="2000,4000,8000,16000", help="Repetitions of each unit"
+    )
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(
+        f"{'case':<24} {'size':>7} {'legacy ms':>10} {'x':>5} "
+        f"{'lexer ms':>9} {'x':>5}"
+    )
+    for name, (file_ext, mode, unit) in CASES.items():
+        legacy, lexer = EXTRACTORS[mode]
+        previous = None
+        for size in sizes:
+            content = unit * size
+            legacy_s = best_time(legacy, content, file_ext, repeat=1)
+            lexer_s = best_time(lexer, content, file_ext)
+            growth = ("", "")
+            if previous:
+                growth = (
+                    f"{legacy_s / previous[0]:.1f}",
+                    f"{lexer_s / previous[1]:.1f}",
+                )
+            print(
+                f"{name:<24} {len(content):>7} {legacy_s * 1000:>10.2f} "
+                f"{growth[0]:>5} {lexer_s * 1000:>9.2f} {growth[1]:>5}"
+            )
+            previous = (legacy_s, lexer_s)
+
+
+if __name__ == "__main__":
+    main()
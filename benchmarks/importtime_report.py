@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Track the cold-start import cost of every hook with -X importtime
+
+Runs each hook once per mode on a small Write payload, sums the cumulative
+import time of top-level imports, and appends one record per hook to a JSONL
+history so changes show up over time.
+
+Modes:
+  script  python3 -X importtime hooks/<hook>.py
+  bundle  python3 -I -S -X importtime claude_hooks.pyz <entry>
+
+Usage: python3 benchmarks/importtime_report.py [--modes script,bundle]
+                                               [--history FILE] [--runs 5]
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+HOOKS_DIR = os.path.join(REPO_ROOT, "hooks")
+sys.path.insert(0, HOOKS_DIR)
+
+import build_bundle  # noqa: E402
+
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "results", "importtime.jsonl")
+
+PAYLOAD = json.dumps(
+    {
+        "tool_name": "Write",
+        "tool_input": {"file_path": "user_service.py", "content": "x = 1\n"},
+    }
+)
+
+
+def parse_importtime(stderr):
+    """Return (total_us, {module: cumulative_us}) for top-level imports"""
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+    return sum(top_level.values()), top_level
+
+
+def run_once(cmd):
+    """Run a hook with -X importtime, returning (import_us, wall_ms, modules)"""
+    start = datetime.datetime.now()
+    result = subprocess.run(cmd, input=PAYLOAD, capture_output=True, text=True)
+    wall_ms = (datetime.datetime.now() - start).total_seconds() * 1000
+    import_us, modules = parse_importtime(result.stderr)
+    return import_us, wall_ms, modules
+
+
+def hook_commands(modes, bundle_path):
+    """Yield (hook, mode, command) for every hook and requested mode"""
+    sources = build_bundle.default_sources()
+    for entry, module in build_bundle.ENTRY_POINTS.items():
+        if "script" in modes:
+            cmd = [sys.executable, "-X", "importtime", sources[module]]
+            yield entry, "script", cmd
+        if "bundle" in modes:
+            cmd = [sys.executable, "-I", "-S", "-X", "importtime", bundle_path, entry]
+            yield entry, "bundle", cmd
+
+
+def load_previous(history):
+    """Return the latest record per (hook, mode) from the history file"""
+    previous = {}
+    if os.path.exists(history):
+        with open(history) as f:
+            for line in f:
+                record = json.loads(line)
+                previous[(record["hook"], record["mode"])] = record
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report hook cold-start import cost")
+    parser.add_argument("--modes", default="script,bundle", help="script,bundle")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL history")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per hook (median)")
+    parser.add_argument("--top", type=int, default=3, help="Top imports to record")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    previous = load_previous(args.history)
+    os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+    timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bundle_path = os.path.join(tmp_dir, "claude_hooks.pyz")
+        if "bundle" in modes:
+            build_bundle.write_bundle(
+                build_bundle.default_sources(), bundle_path, build_bundle.ENTRY_POINTS
+            )
+
+        print(f"{'hook':<15} {'mode':<7} {'import ms':>10} {'wall ms':>9} {'delta':>8}")
+        with open(args.history, "a") as history:
+            for hook, mode, cmd in hook_commands(modes, bundle_path):
+                runs = [run_once(cmd) for _ in range(args.runs)]
+                import_us = statistics.median(r[0] for r in runs)
+                wall_ms = statistics.median(r[1] for r in runs)
+                modules = runs[-1][2]
+                top = sorted(modules.items(), key=lambda kv: -kv[1])[: args.top]
+
+                record = {
+                    "timestamp": timestamp,
+                    "python": sys.version.split()[0],
+                    "hook": hook,
+                    "mode": mode,
+                    "import_us": import_us,
+                    "wall_ms": round(wall_ms, 2),
+                    "top_imports": dict(top),
+                }
+                history.write(json.dumps(record) + "\n")
+
+                prior = previous.get((hook, mode))
+                delta = ""
+                if prior:
+                    delta = f"{(import_us - prior['import_us']) / 1000:+.2f}"
+                print(
+                    f"{hook:<15} {mode:<7} {import_us / 1000:>10.2f} "
+                    f"{wall_ms:>9.1f} {delta:>8}"
+                )
+
+    print(f"\nHistory appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Payload-size scaling stress test for the content hooks
+
+Generates synthetic Write payloads at log-spaced sizes (64 KiB to 16 MiB by
+default, up to the 10-50 MB files agents sometimes generate) and runs
+check_chinese_hook (once per CHECK_MODE) and no_show_in_python_hook on them
+in-process, measuring time and peak traced memory per call.
+
+Cases include adversarial input for the extraction code: runs of
+unterminated `/*` and `\"\"\"`, dense CJK comments and Python full of
+candidate calls. check_chinese runs with BLOCK_ON_DETECTION=false so it
+scans the whole payload instead of stopping at the first match.
+
+For each series the log-log slope of time against size is reported: about
+1 is linear; anything above --max-slope is flagged as super-linear (and
+fails the run with --strict). --plot writes a PNG of time and memory
+against size (needs matplotlib).
+
+Usage: python3 benchmarks/stress_content_hooks.py [--min-size 64K]
+           [--max-size 16M] [--factor 4] [--cases ...] [--plot FILE]
+           [--output FILE] [--strict]
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOKS_DIR = os.path.join(os.path.dirname(BENCH_DIR), "hooks")
+sys.path.insert(0, HOOKS_DIR)
+
+import dispatch_hook  # noqa: E402
+from hook_daemon import patched_environ  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "stress_content_hooks.json")
+CHECK_MODES = ("comments", "strings", "all")
+
+# name -> (file name, unit repeated up to the payload size)
+CASES = {
+    "python_source": (
+        "generated.py",
+        "def load(path):\n"
+        '    """Load rows from path"""\n'
+        "    # Skip the header row\n"
+        '    with open(path) as f:\n'
+        '        return [line.split(",") for line in f][1:]\n\n\n',
+    ),
+    "json_dump": (
+        "fixture.json",
+        '{"id": 1, "name": "item", "tags": ["a", "b"], "price": 9.5},\n',
+    ),
+    "unterminated_block": ("vendored.c", "/* "),
+    "unterminated_docstring": ("generated.py", '"""\nx = 1  # y\n'),
+    "dense_cjk": ("notes.py", "# 这是一个很长的中文注释，用于压力测试\nx = '中文字符串'\n"),
+    "show_calls": ("plots.py", "plt.plot(x, y)\nplt.show()\n"),
+}
+
+# Hook series: label -> (check name, environment)
+SERIES = {
+    **{
+        f"chinese[{mode}]": (
+            "chinese",
+            {"CHECK_MODE": mode, "BLOCK_ON_DETECTION": "false"},
+        )
+        for mode in CHECK_MODES
+    },
+    "show": ("show", {"BLOCK_ON_DETECTION": "true"}),
+}
+
+
+def parse_size(value):
+    """Parse 64K / 16M / 1048576 into a number of characters"""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    value = value.strip().upper()
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def log_sizes(min_size, max_size, factor):
+    """Sizes from min_size multiplied by factor, ending exactly at max_size"""
+    sizes = []
+    size = min_size
+    while size < max_size:
+        sizes.append(size)
+        size *= factor
+    sizes.append(max_size)
+    return sizes
+
+
+def make_payload(case, size):
+    """A Write payload whose content is `size` characters of the case"""
+    file_name, unit = CASES[case]
+    content = (unit * (size // len(unit) + 1))[:size]
+    return {
+        "tool_name": "Write",
+        "tool_input": {"file_path": file_name, "content": content},
+    }
+
+
+def load_series(label):
+    """Import a fresh copy of the hook configured for one series"""
+    name, env = SERIES[label]
+    with patched_environ(env):
+        module = dispatch_hook.load_module(
+            f"stress_{label}", dispatch_hook.find_check_file(name)
+        )
+    return module
+
+
+def measure(module, data):
+    """Return (seconds, peak traced bytes, exit code) for one run_hook call"""
+    with contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        exit_code, _ = module.run_hook(data)
+        seconds = time.perf_counter() - start
+
+        # Memory in a separate call: tracing slows the hook down several times
+        tracemalloc.start()
+        module.run_hook(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return seconds, peak, exit_code
+
+
+def slope(points):
+    """Least-squares slope of log(time) against log(size)"""
+    xs = [math.log(size) for size, seconds in points if seconds > 0]
+    ys = [math.log(seconds) for size, seconds in points if seconds > 0]
+    if len(xs) < 2:
+        return None
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mean_x) ** 2 for x in xs)
+    if not var:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var
+
+
+def plot(results, path):
+    """Write time and memory against size, one line per series and case"""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[WARNING] matplotlib not installed, skipping --plot", file=sys.stderr)
+        return
+
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(14, 6))
+    for key, rows in results.items():
+        sizes = [r["size"] for r in rows]
+        ax_time.loglog(sizes, [r["seconds"] for r in rows], marker="o", label=key)
+        ax_mem.loglog(sizes, [r["peak_bytes"] for r in rows], marker="o", label=key)
+    ax_time.set(xlabel="payload characters", ylabel="seconds", title="Time")
+    ax_mem.set(xlabel="payload characters", ylabel="peak bytes", title="Memory")
+    ax_time.legend(fontsize="x-small")
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+    print(f"Plot written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-size", default="64K", help="Smallest payload")
+    parser.add_argument("--max-size", default="16M", help="Largest payload")
+    parser.add_argument("--factor", type=int, default=4, help="Size step factor")
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="Comma-separated payload cases"
+    )
+    parser.add_argument(
+        "--series", default=",".join(SERIES), help="Comma-separated hook series"
+    )
+    parser.add_argument(
+        "--max-slope",
+        type=float,
+        default=1.3,
+        help="Log-log slope above which a series is super-linear (default 1.3)",
+    )
+    parser.add_argument("--plot", help="Write a PNG of time/memory against size")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Result JSON file")
+    parser.add_argument(
+        "--strict", action="store_true", help="Exit 1 when any series is super-linear"
+    )
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    labels = [s.strip() for s in args.series.split(",") if s.strip()]
+    unknown = sorted((set(cases) - set(CASES)) | (set(labels) - set(SERIES)))
+    if unknown:
+        parser.error(f"unknown cases or series: {', '.join(unknown)}")
+    sizes = log_sizes(parse_size(args.min_size), parse_size(args.max_size), args.factor)
+
+    print(
+        f"{'series':<18} {'case':<24} {'size':>10} {'ms':>10} "
+        f"{'peak MiB':>9} {'exit':>5}"
+    )
+    results, flagged = {}, []
+    modules = {label: load_series(label) for label in labels}
+    for case in cases:
+        for size in sizes:
+            data = make_payload(case, size)
+            for label in labels:
+                seconds, peak, exit_code = measure(modules[label], data)
+                results.setdefault(f"{label} {case}", []).append(
+                    {
+                        "size": size,
+                        "seconds": seconds,
+                        "peak_bytes": peak,
+                        "exit": exit_code,
+                    }
+                )
+                print(
+                    f"{label:<18} {case:<24} {size:>10} {seconds * 1000:>10.1f} "
+                    f"{peak / (1 << 20):>9.1f} {exit_code:>5}",
+                    flush=True,
+                )
+
+    print(f"\n{'series':<43} {'slope':>6}")
+    slopes = {}
+    for key, rows in results.items():
+        value = slope([(r["size"], r["seconds"]) for r in rows])
+        slopes[key] = value
+        marker = ""
+        if value is not None and value > args.max_slope:
+            marker = "  [WARNING] super-linear"
+            flagged.append(key)
+        shown = f"{value:.2f}" if value is not None else "-"
+        print(f"{key:<43} {shown:>6}{marker}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"sizes": sizes, "slopes": slopes, "results": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.plot:
+        plot(results, args.plot)
+    if flagged and args.strict:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
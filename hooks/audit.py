@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Audit existing files with the hook rule engines
+
+Walks a directory tree with a process pool and runs the checks the
+PreToolUse hooks apply to live payloads on every file already there:
+
+  filename  BAD_PATTERNS, COMMON_TYPOS and the markdown allowlist
+  chinese   non-ASCII characters (scope set by CHECK_MODE, default comments)
+  show      blocking calls such as .show() in Python files
+
+Paths excluded by .gitignore, .git/info/exclude, .claude/hook_ignore or
+the vendor/build defaults (see path_ignore.py) are skipped, as the hooks
+skip them.
+
+Findings stream to stdout as JSON Lines (default) or SARIF 2.1.0 and a
+summary goes to stderr. Exits 2 when anything was found.
+
+With --staged it checks what is staged for commit instead: filenames of new
+files and the added lines of added or modified files, read from the index
+with git. Findings go to stderr and a hook-style {"decision": "block"} to
+stdout, so it works as a pre-commit gate for commits made outside Claude
+Code (.git/hooks/pre-commit: exec python3 /path/to/hooks/audit.py --staged).
+
+Usage: python3 audit.py [ROOT] [--checks filename,chinese,show]
+                        [--format jsonl|sarif] [--jobs N]
+       python3 audit.py --staged [--checks ...] [--jobs N]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HOOKS_DIR)
+
+import check_chinese_hook  # noqa: E402
+import filename_ban_hook  # noqa: E402
+import no_show_in_python_hook  # noqa: E402
+import path_ignore  # noqa: E402
+
+AUDIT_CHECKS = ("filename", "chinese", "show")
+
+# Rule id -> description (SARIF rule metadata)
+RULES = {
+    "filename.markdown": "Markdown file outside docs/ and the root allowlist",
+    "filename.pattern": "Filename matches a BAD_PATTERNS rule",
+    "filename.typo": "Filename contains a common typo",
+    "non_ascii": "Non-ASCII characters in checked content",
+    "blocking_call": "Python call that blocks unattended execution",
+}
+
+# Directories never worth auditing
+SKIP_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".venv",
+    "venv",
+    ".tox",
+    ".mypy_cache",
+}
+BATCH_SIZE = 256  # Paths per worker task
+STAGED_BATCH_SIZE = 32  # Staged files (with contents) per worker task
+MAX_BYTES = 1024 * 1024  # Larger files are skipped for content checks
+
+
+def walk_files(root):
+    """Yield the paths of all regular files under root, relative to root"""
+    prefix = os.path.join(root, "")
+    # Parents of what is visited are never ignored, so decide() suffices
+    matcher = path_ignore.IgnoreMatcher(root) if path_ignore.enabled() else None
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                relpath = entry.path[len(prefix) :]
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in SKIP_DIRS:
+                        continue
+                    if matcher and matcher.decide(relpath.replace(os.sep, "/"), True):
+                        continue
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if matcher and matcher.decide(relpath.replace(os.sep, "/"), False):
+                        continue
+                    yield relpath
+
+
+def batched(iterable, size):
+    """Group an iterable into lists of at most size items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def finding(path, rule, message, line=None, col=None):
+    """Build one finding record"""
+    record = {"path": path, "rule": rule, "message": message}
+    if line is not None:
+        record["line"] = line
+        record["col"] = col
+    return record
+
+
+def filename_findings(path):
+    """Apply the filename_ban_hook rules, in the hook's order, to one path"""
+    hook = filename_ban_hook
+    if hook.is_in_special_dir(path):
+        return []
+
+    markdown_check = hook.check_markdown_restrictions(path)
+    if not markdown_check["allowed"]:
+        message = f"{markdown_check['reason']}. {markdown_check['suggestion']}"
+        return [finding(path, "filename.markdown", message)]
+
+    filename = os.path.basename(path)
+    match_result = hook.check_bad_patterns(filename)
+    if match_result["matched"]:
+        if hook.is_context_appropriate(path, match_result)[0]:
+            return []
+        better_name = hook.suggest_better_name(path, match_result)
+        message = f"{match_result['reason']}. Try: {better_name}"
+        return [finding(path, "filename.pattern", message)]
+
+    typo_result = hook.check_typos(filename)
+    if typo_result["matched"]:
+        message = f"{typo_result['reason']}. Try: {typo_result['suggested_name']}"
+        return [finding(path, "filename.typo", message)]
+    return []
+
+
+def content_findings(path, content, checks):
+    """Apply the content rules to the text of path"""
+    findings = []
+    file_ext = os.path.splitext(path)[1].lower()
+
+    if "chinese" in checks:
+        found = check_chinese_hook.find_non_ascii(content, file_ext)
+        for label, info in found.items():
+            message = f"{info['count']} {label} characters: {info['sample']}"
+            findings.append(finding(path, "non_ascii", message))
+
+    show = no_show_in_python_hook
+    if (
+        "show" in checks
+        and path.endswith(".py")
+        and not (show.CHECK_TESTS_ONLY and not show.is_test_file(path))
+    ):
+        for line, col, entry in show.find_blocking_calls(content):
+            message = f"{entry.lstrip('*')}() {show.BLOCKING_CALLS[entry]}"
+            findings.append(finding(path, "blocking_call", message, line, col))
+    return findings
+
+
+def read_text(full_path, max_bytes=MAX_BYTES):
+    """Return a file's text, or None for unreadable, binary or huge files"""
+    try:
+        with open(full_path, "rb") as f:
+            data = f.read(max_bytes + 1)
+    except OSError:
+        return None
+    if len(data) > max_bytes or b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def audit_batch(task):
+    """Worker: audit a batch of paths, returning (files_checked, findings)"""
+    root, paths, checks = task
+    findings = []
+    for path in paths:
+        if "filename" in checks:
+            findings.extend(filename_findings(path))
+        if "chinese" in checks or "show" in checks:
+            content = read_text(os.path.join(root, path))
+            if content:
+                findings.extend(content_findings(path, content, checks))
+    return len(paths), findings
+
+
+def run_tasks(func, tasks, jobs):
+    """Yield func(task) for every task, in a process pool when jobs > 1"""
+    if jobs <= 1:
+        yield from map(func, tasks)
+        return
+    with multiprocessing.Pool(jobs) as pool:
+        yield from pool.imap_unordered(func, tasks)
+
+
+def git_output(*args):
+    """Run a git command in the current repository and return its stdout"""
+    cmd = ["git", "-c", "core.quotePath=false", *args]
+    return subprocess.run(cmd, capture_output=True, check=True).stdout
+
+
+def staged_files():
+    """Return {path: is_new} for staged added, copied, renamed or modified files"""
+    out = git_output("diff", "--cached", "--name-status", "-z", "--diff-filter=ACMR")
+    fields = out.decode("utf-8", errors="surrogateescape").split("\0")
+    files = {}
+    i = 0
+    while i + 1 < len(fields):
+        status = fields[i]
+        if status[:1] in ("R", "C"):
+            # Renames and copies list the old path, then the new one
+            files[fields[i + 2]] = True
+            i += 3
+        else:
+            files[fields[i + 1]] = status == "A"
+            i += 2
+    return files
+
+
+# Single-letter escapes in the C-quoted paths of git diff headers
+C_ESCAPES = {b"a": 7, b"b": 8, b"t": 9, b"n": 10, b"v": 11, b"f": 12, b"r": 13}
+
+
+def diff_header_path(name):
+    """Decode a path from a ---/+++ diff header as staged_files() spells it
+
+    git ends a name containing spaces with a tab and C-quotes names with
+    quotes, backslashes or control characters ("b/a\\"b\\303\\244").
+    """
+    if name.endswith(b"\t"):
+        name = name[:-1]
+    if name.startswith(b'"') and name.endswith(b'"') and len(name) > 1:
+        out, i, body = bytearray(), 0, name[1:-1]
+        while i < len(body):
+            c = body[i : i + 1]
+            if c == b"\\" and i + 1 < len(body):
+                nxt = body[i + 1 : i + 2]
+                if body[i + 1 : i + 4].isdigit():
+                    out.append(int(body[i + 1 : i + 4], 8))
+                    i += 4
+                    continue
+                out.append(C_ESCAPES.get(nxt, nxt[0]))
+                i += 2
+                continue
+            out += c
+            i += 1
+        name = bytes(out)
+    return name.decode("utf-8", errors="surrogateescape")
+
+
+def staged_added_lines():
+    """Return {path: [(line_number, text), ...]} for lines added in the index"""
+    out = git_output(
+        "diff",
+        "--cached",
+        "-U0",
+        "--no-color",
+        "--no-ext-diff",
+        "--src-prefix=a/",
+        "--dst-prefix=b/",
+        "--diff-filter=ACMR",
+    )
+    added = {}
+    lines = None
+    line_number = 0
+    in_header = False
+    for raw in out.split(b"\n"):
+        if in_header and raw.startswith(b"+++ "):
+            path = diff_header_path(raw[4:])
+            lines = added.setdefault(path[2:], []) if path.startswith("b/") else None
+            continue
+        line = raw.decode("utf-8", errors="replace")
+        if line.startswith("diff --git "):
+            in_header, lines = True, None
+        elif line.startswith("@@"):
+            in_header = False
+            # @@ -a,b +c,d @@: added lines start at c
+            new_range = line.split(" ")[2]
+            line_number = int(new_range[1:].split(",")[0])
+        elif not in_header and lines is not None and line.startswith("+"):
+            lines.append((line_number, line[1:]))
+            line_number += 1
+    return added
+
+
+def read_staged_blobs(paths, max_bytes=MAX_BYTES):
+    """Stream (path, text) for each path's staged blob via git cat-file --batch
+
+    text is None for missing, binary or oversized blobs.
+    """
+    proc = subprocess.Popen(
+        ["git", "cat-file", "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    try:
+        for path in paths:
+            proc.stdin.write(f":{path}\n".encode("utf-8", errors="surrogateescape"))
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) < 3:
+                yield path, None  # "<object> missing"
+                continue
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)  # Trailing newline
+            if len(data) > max_bytes or b"\0" in data[:8192]:
+                yield path, None
+            else:
+                yield path, data.decode("utf-8", errors="replace")
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+
+def staged_batch(task):
+    """Worker: audit staged files, returning (files_checked, findings)
+
+    Filenames are checked for new files only, as filename_ban_hook does.
+    Non-ASCII is checked on the added lines; blocking calls are found in the
+    whole staged file (so it parses) and kept when on an added line.
+    """
+    entries, checks = task
+    findings = []
+    for path, is_new, content, lines in entries:
+        if "filename" in checks and is_new:
+            findings.extend(filename_findings(path))
+        if content is None or not lines:
+            continue
+        if "chinese" in checks:
+            excerpt = "\n".join(text for _, text in lines)
+            findings.extend(content_findings(path, excerpt, ("chinese",)))
+        if "show" in checks:
+            added = {line_number for line_number, _ in lines}
+            for record in content_findings(path, content, ("show",)):
+                if record["line"] in added:
+                    findings.append(record)
+    return len(entries), findings
+
+
+def audit_staged(checks, jobs):
+    """Check the files staged for commit, returning (files_checked, findings)"""
+    files = staged_files()
+    if path_ignore.enabled():
+        top = git_output("rev-parse", "--show-toplevel").decode().strip()
+        matcher = path_ignore.IgnoreMatcher(top)
+        files = {path: new for path, new in files.items() if not matcher.ignored(path)}
+    lines = staged_added_lines() if "chinese" in checks or "show" in checks else {}
+
+    def entries():
+        content_paths = [path for path in files if lines.get(path)]
+        for path, content in read_staged_blobs(content_paths):
+            yield path, files[path], content, lines[path]
+        for path in files:
+            if not lines.get(path):
+                yield path, files[path], None, None
+
+    # A pool only pays off once there is more than one batch
+    if len(files) <= STAGED_BATCH_SIZE:
+        jobs = 1
+    tasks = ((batch, checks) for batch in batched(entries(), STAGED_BATCH_SIZE))
+
+    total_files, all_findings = 0, []
+    for checked, findings in run_tasks(staged_batch, tasks, jobs):
+        total_files += checked
+        all_findings.extend(findings)
+    return total_files, all_findings
+
+
+def staged_decision(findings, limit=10):
+    """Build the hook-style block decision for staged findings"""
+    reasons = [f"{record['path']}: {record['message']}" for record in findings]
+    if len(reasons) > limit:
+        reasons = reasons[:limit] + [f"... and {len(reasons) - limit} more"]
+    return {"decision": "block", "reason": "; ".join(reasons)}
+
+
+def run_staged(args):
+    """Pre-commit gate: report staged findings in the hook decision format"""
+    start = time.perf_counter()
+    try:
+        files, findings = audit_staged(args.checks, args.jobs)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[ERROR] Could not read staged changes: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if not findings:
+        print(f"[OK] {files} staged files checked in {elapsed:.2f}s", file=sys.stderr)
+        sys.exit(0)
+
+    findings.sort(key=lambda record: (record["path"], record.get("line") or 0))
+    print(f"\n[ERROR] {len(findings)} issues in staged files:", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+    for record in findings:
+        location = record["path"]
+        if "line" in record:
+            location += f":{record['line']}:{record['col']}"
+        print(f"  {location} [{record['rule']}] {record['message']}", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+
+    print(json.dumps(staged_decision(findings), ensure_ascii=False))
+    sys.exit(2)
+
+
+class JsonLinesWriter:
+    """Write one JSON object per finding"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.stream.flush()
+
+
+class SarifWriter:
+    """Stream findings as a single-run SARIF 2.1.0 log"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        header = {
+            "version": "2.1.0",
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "claude-suite-audit",
+                            "rules": [
+                                {"id": rule, "shortDescription": {"text": text}}
+                                for rule, text in RULES.items()
+                            ],
+                        }
+                    },
+                    "results": [],
+                }
+            ],
+        }
+        # Everything up to the opening bracket of the results array
+        text = json.dumps(header)
+        self.stream.write(text[: text.rindex("[]") + 1])
+
+    def write(self, record):
+        location = {"artifactLocation": {"uri": record["path"].replace(os.sep, "/")}}
+        if "line" in record:
+            location["region"] = {
+                "startLine": record["line"],
+                "startColumn": record["col"],
+            }
+        result = {
+            "ruleId": record["rule"],
+            "level": "error",
+            "message": {"text": record["message"]},
+            "locations": [{"physicalLocation": location}],
+        }
+        self.stream.write(("," if self.count else "") + json.dumps(result))
+        self.count += 1
+
+    def close(self):
+        self.stream.write("]}]}\n")
+        self.stream.flush()
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "sarif": SarifWriter}
+
+
+def parse_checks(value):
+    """Validate a comma-separated --checks value"""
+    checks = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = set(checks) - set(AUDIT_CHECKS)
+    if unknown:
+        unknown = ", ".join(sorted(unknown))
+        raise argparse.ArgumentTypeError(f"unknown checks: {unknown}")
+    return tuple(checks)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Audit existing files with the Claude Code hook rules"
+    )
+    parser.add_argument("root", nargs="?", default=".", help="Tree to audit")
+    parser.add_argument(
+        "--checks",
+        type=parse_checks,
+        default=AUDIT_CHECKS,
+        help="Comma-separated checks (default: filename,chinese,show)",
+    )
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check files staged for commit in the current git repository",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.staged:
+        run_staged(args)
+
+    if not os.path.isdir(args.root):
+        print(f"[ERROR] Not a directory: {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    writer = WRITERS[args.format](sys.stdout)
+    tasks = (
+        (args.root, paths, args.checks)
+        for paths in batched(walk_files(args.root), BATCH_SIZE)
+    )
+
+    files = total = 0
+    for checked, findings in run_tasks(audit_batch, tasks, args.jobs):
+        files += checked
+        for record in findings:
+            writer.write(record)
+        total += len(findings)
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Audited {files} files: {total} findings in {elapsed:.2f}s "
+        f"(jobs={args.jobs})",
+        file=sys.stderr,
+    )
+    sys.exit(2 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Build a startup-optimized zipapp bundle of the hooks
+
+Usage: python3 build_bundle.py [--output claude_hooks.pyz]
+
+The bundle stores precompiled bytecode (plus the sources, used only when the
+running Python has a different bytecode version) and runs one hook by name:
+
+  python3 -I -S claude_hooks.pyz dispatch
+
+-I and -S skip site-packages and user environment setup, which the hooks
+do not need.
+"""
+import argparse
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_HOOKS_DIR = os.path.join(
+    os.path.dirname(HOOKS_DIR), "local_hooks", "templates", "hooks"
+)
+
+# Entry point name -> module name
+ENTRY_POINTS = {
+    "dispatch": "dispatch_hook",
+    "chinese": "check_chinese_hook",
+    "filename": "filename_ban_hook",
+    "show": "no_show_in_python_hook",
+    "protect_phase": "protect_phase_file",
+}
+
+# Modules imported by the hooks that are not entry points themselves
+SUPPORT_MODULES = [
+    "hook_payload",
+    "verdict_cache",
+    "hook_telemetry",
+    "path_ignore",
+    "rule_packs",
+    "typo_index",
+    "typo_vocabulary",
+]
+
+MAIN_TEMPLATE = """import sys
+
+ENTRY_POINTS = {entry_points!r}
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else ""
+    if name not in ENTRY_POINTS:
+        print(f"Usage: {{sys.argv[0]}} <{{'|'.join(ENTRY_POINTS)}}>", file=sys.stderr)
+        sys.exit(1)
+    del sys.argv[1]
+    __import__(ENTRY_POINTS[name]).main()
+
+
+main()
+"""
+
+
+def default_sources():
+    """Map module names to the source files bundled by default"""
+    sources = {}
+    for module in [*ENTRY_POINTS.values(), *SUPPORT_MODULES]:
+        for directory in (HOOKS_DIR, TEMPLATE_HOOKS_DIR):
+            path = os.path.join(directory, module + ".py")
+            if os.path.isfile(path):
+                sources[module] = path
+                break
+    return sources
+
+
+def write_bundle(sources, output, entry_points):
+    """Write a zipapp with source and unchecked-hash bytecode for each module"""
+    tmp_output = output + ".tmp"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with zipfile.ZipFile(tmp_output, "w", zipfile.ZIP_STORED) as bundle:
+            bundle.writestr(
+                "__main__.py", MAIN_TEMPLATE.format(entry_points=entry_points)
+            )
+            for module, path in sorted(sources.items()):
+                cfile = os.path.join(tmp_dir, module + ".pyc")
+                py_compile.compile(
+                    path,
+                    cfile=cfile,
+                    dfile=module + ".py",
+                    doraise=True,
+                    invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                )
+                bundle.write(path, module + ".py")
+                bundle.write(cfile, module + ".pyc")
+    os.replace(tmp_output, output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a precompiled zipapp bundle of the Claude Code hooks"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=os.path.join(HOOKS_DIR, "claude_hooks.pyz"),
+        help="Bundle path (default: hooks/claude_hooks.pyz)",
+    )
+    args = parser.parse_args()
+
+    sources = default_sources()
+    missing = {*ENTRY_POINTS.values(), *SUPPORT_MODULES} - set(sources)
+    if missing:
+        print(f"[ERROR] Hook sources not found: {', '.join(sorted(missing))}")
+        sys.exit(1)
+
+    write_bundle(sources, args.output, ENTRY_POINTS)
+    print(f"Built {args.output} ({len(sources)} modules)")
+    print(f"Run with: python3 -I -S {args.output} <{'|'.join(ENTRY_POINTS)}>")
+
+
+if __name__ == "__main__":
+    main()
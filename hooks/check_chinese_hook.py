@@ -8,6 +8,10 @@ import os
 import re
 import sys
 
+import hook_telemetry
+import path_ignore
+from hook_payload import added_chunks, added_text, collect_text, read_payload
+
 # Chinese and other non-ASCII character Unicode ranges
 CHINESE_PATTERN = re.compile(
     r"[\u4e00-\u9fff"  # CJK Unified Ideographs
@@ -38,130 +42,360 @@ CHECK_CHINESE = os.environ.get("CHECK_CHINESE", "true").lower() == "true"
 CHECK_JAPANESE = os.environ.get("CHECK_JAPANESE", "false").lower() == "true"
 CHECK_KOREAN = os.environ.get("CHECK_KOREAN", "false").lower() == "true"
 
+# Enabled scripts, merged into one pattern so text is scanned once. Each
+# alternative matches a run of one script; lastindex tells which one.
+ENABLED_SCRIPTS = [
+    label
+    for label, enabled in [
+        ("Chinese", CHECK_CHINESE),
+        ("Japanese", CHECK_JAPANESE),
+        ("Korean", CHECK_KOREAN),
+    ]
+    if enabled
+]
+SCRIPT_PATTERNS = {
+    "Chinese": CHINESE_PATTERN,
+    "Japanese": JAPANESE_PATTERN,
+    "Korean": KOREAN_PATTERN,
+}
+NON_ASCII_PATTERN = (
+    re.compile("|".join(f"({SCRIPT_PATTERNS[l].pattern}+)" for l in ENABLED_SCRIPTS))
+    if ENABLED_SCRIPTS
+    else None
+)
+SAMPLE_SIZE = 20  # Distinct characters kept per script for the report
+SAMPLE_RUNS = 1000  # Leading runs the sample is drawn from
+
+
+class Lexer:
+    """Single-pass scanner yielding comment and string spans of source text
+
+    line_comments: markers that comment out the rest of the line
+    block_comments: (open, close) pairs
+    strings, docstrings: (open, close, escapes, multiline) tuples; docstring
+        spans are reported as "docstring" and checked as comments too
+    literals: regexes for whole string literals tried before any opener
+        (Rust character literals, whose ' also starts lifetimes)
+    comment_boundary: line comments only start at line start or after
+        whitespace (shell: `$#` and `${#var}` are not comments)
+
+    Each step jumps to the next opener with one regex search and to its
+    closer with str.find, so no character is scanned twice and the worst case
+    stays linear. Unterminated comments and strings run to the end of the
+    text (end of line for single-line strings).
+    """
+
+    def __init__(
+        self,
+        line_comments=(),
+        block_comments=(),
+        strings=(),
+        docstrings=(),
+        literals=(),
+        comment_boundary=False,
+    ):
+        self.tokens = {}
+        for marker in line_comments:
+            self.tokens[marker] = ("comment", None, False, False)
+        for opener, closer in block_comments:
+            self.tokens[opener] = ("comment", closer, False, True)
+        for opener, closer, escapes, multiline in strings:
+            self.tokens[opener] = ("string", closer, escapes, multiline)
+        for opener, closer, escapes, multiline in docstrings:
+            self.tokens[opener] = ("docstring", closer, escapes, multiline)
+        self.comment_boundary = comment_boundary
+        # Longest opener first so a triple quote wins over a single one
+        openers = sorted(self.tokens, key=len, reverse=True)
+        alternatives = list(map(re.escape, openers))
+        if literals:
+            literal = "|".join(f"(?:{pattern})" for pattern in literals)
+            alternatives.insert(0, f"(?P<literal>{literal})")
+        self.opener_pattern = re.compile("|".join(alternatives))
+
+    @staticmethod
+    def find_closer(text, closer, start, limit, escapes):
+        """Return the index just past an unescaped closer, or -1"""
+        while True:
+            end = text.find(closer, start, limit)
+            if end < 0:
+                return -1
+            if escapes:
+                # Count the backslashes since start only, keeping this linear
+                slash = end
+                while slash > start and text[slash - 1] == "\\":
+                    slash -= 1
+                if (end - slash) % 2:
+                    start = end + 1
+                    continue
+            return end + len(closer)
+
+    def spans(self, text):
+        """Lazily yield (kind, start, end) for each comment and string
+
+        Line comment spans exclude the marker; all other spans include their
+        delimiters.
+        """
+        size = len(text)
+        search = self.opener_pattern.search
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if not match:
+                return
+            start, body = match.span()
+            if match.lastgroup == "literal":
+                yield "string", start, body
+                pos = body
+                continue
+            kind, closer, escapes, multiline = self.tokens[match.group()]
+
+            if closer is None:
+                if self.comment_boundary and start and not text[start - 1].isspace():
+                    pos = body
+                    continue
+                end = text.find("\n", body)
+                end = size if end < 0 else end
+                yield kind, body, end
+                pos = end
+                continue
+
+            limit = size if multiline else text.find("\n", body)
+            limit = size if limit < 0 else limit
+            end = self.find_closer(text, closer, body, limit, escapes)
+            end = limit if end < 0 else end
+            yield kind, start, end
+            pos = end
+
+
+C_LEXER = Lexer(
+    line_comments=["//"],
+    block_comments=[("/*", "*/")],
+    strings=[('"', '"', True, False), ("'", "'", True, False)],
+)
+JS_LEXER = Lexer(
+    line_comments=["//"],
+    block_comments=[("/*", "*/")],
+    strings=[
+        ('"', '"', True, False),
+        ("'", "'", True, False),
+        ("`", "`", True, True),  # Template literals
+    ],
+)
+GO_LEXER = Lexer(
+    line_comments=["//"],
+    block_comments=[("/*", "*/")],
+    strings=[
+        ('"', '"', True, False),
+        ("'", "'", True, False),
+        ("`", "`", False, True),  # Raw strings
+    ],
+)
+RUST_LEXER = Lexer(
+    line_comments=["//"],
+    block_comments=[("/*", "*/")],
+    strings=[('"', '"', True, True)],
+    # Character literals ('x', '\'', '"', '\u{..}'); a lone ' is a lifetime
+    literals=[r"'(?:[^'\\\n]|\\(?:u\{[0-9a-fA-F_]*\}|x[0-9a-fA-F]{2}|.))'"],
+)
+PYTHON_LEXER = Lexer(
+    line_comments=["#"],
+    strings=[('"', '"', True, False), ("'", "'", True, False)],
+    docstrings=[('"""', '"""', True, True), ("'''", "'''", True, True)],
+)
+SHELL_LEXER = Lexer(
+    line_comments=["#"],
+    strings=[('"', '"', True, True), ("'", "'", False, True)],
+    comment_boundary=True,
+)
+# Strings mode for files without a registered lexer
+FALLBACK_STRING_LEXER = Lexer(
+    strings=[('"', '"', False, True), ("'", "'", False, True)],
+)
 
-def extract_comments_from_content(content, file_ext):
-    """Extract comments from content"""
-    comments = []
-
-    if file_ext in [
-        ".cpp",
-        ".cc",
-        ".c",
-        ".h",
-        ".hpp",
-        ".cxx",
-        ".js",
-        ".jsx",
-        ".ts",
-        ".tsx",
-        ".java",
-        ".go",
-        ".rs",
-    ]:
-        # C-style comments
-        for match in re.finditer(r"//(.*)$", content, re.MULTILINE):
-            comments.append(match.group(1))
-        for match in re.finditer(r"/\*[\s\S]*?\*/", content):
-            comments.append(match.group(0))
-
-    elif file_ext in [".py", ".pyw"]:
-        # Python comments
-        for match in re.finditer(r"#(.*)$", content, re.MULTILINE):
-            comments.append(match.group(1))
-        # Docstrings
-        for match in re.finditer(r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'', content):
-            comments.append(match.group(0))
-
-    elif file_ext in [".sh", ".bash", ".zsh"]:
-        # Shell comments
-        for match in re.finditer(r"#(.*)$", content, re.MULTILINE):
-            comments.append(match.group(1))
-
-    return comments
-
-
-def check_for_non_ascii(text):
-    """Check for non-ASCII characters in text"""
-    found_chars = {}
+# File extension -> Lexer; extend with register_lexer()
+LEXERS = {}
 
-    if CHECK_CHINESE:
-        chinese_matches = CHINESE_PATTERN.findall(text)
-        if chinese_matches:
-            found_chars["Chinese"] = chinese_matches
 
-    if CHECK_JAPANESE:
-        japanese_matches = JAPANESE_PATTERN.findall(text)
-        if japanese_matches:
-            found_chars["Japanese"] = japanese_matches
+def register_lexer(extensions, lexer):
+    """Scan files with the given extensions using lexer"""
+    for ext in extensions:
+        LEXERS[ext.lower()] = lexer
 
-    if CHECK_KOREAN:
-        korean_matches = KOREAN_PATTERN.findall(text)
-        if korean_matches:
-            found_chars["Korean"] = korean_matches
 
-    return found_chars
+register_lexer([".cpp", ".cc", ".c", ".h", ".hpp", ".cxx", ".java"], C_LEXER)
+register_lexer([".js", ".jsx", ".ts", ".tsx"], JS_LEXER)
+register_lexer([".go"], GO_LEXER)
+register_lexer([".rs"], RUST_LEXER)
+register_lexer([".py", ".pyw"], PYTHON_LEXER)
+register_lexer([".sh", ".bash", ".zsh"], SHELL_LEXER)
 
+COMMENT_KINDS = ("comment", "docstring")
+STRING_KINDS = ("string", "docstring")
 
-def main():
-    """Main function"""
-    # Read JSON data from stdin
-    if sys.stdin.isatty():
-        print("[ERROR] No input data received", file=sys.stderr)
-        sys.exit(1)
 
-    try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
-        sys.exit(1)
+def iter_spans(content, kinds, lexer):
+    """Lazily yield the text of each span of the given kinds"""
+    if lexer is None:
+        return
+    for kind, start, end in lexer.spans(content):
+        if kind in kinds:
+            yield content[start:end]
 
-    # Get tool input
-    tool_input = data.get("tool_input", {})
-    file_path = tool_input.get("file_path", "")
-    content = tool_input.get("content", "")
 
-    if not content:
-        # If no content, try to read old_str and new_str (for Edit tool)
-        old_str = tool_input.get("old_str", "")
-        new_str = tool_input.get("new_str", "")
-        content = old_str + "\n" + new_str
+def iter_comments(content, file_ext):
+    """Lazily yield comments (and docstrings) from content"""
+    return iter_spans(content, COMMENT_KINDS, LEXERS.get(file_ext))
 
-    if not content:
-        print("[OK] No content to check", file=sys.stderr)
-        sys.exit(0)
 
-    # Get file extension
-    from pathlib import Path
+def iter_strings(content, file_ext):
+    """Lazily yield string literals from content"""
+    lexer = LEXERS.get(file_ext, FALLBACK_STRING_LEXER)
+    return iter_spans(content, STRING_KINDS, lexer)
+
+
+def extract_comments_from_content(content, file_ext):
+    """Extract comments from content"""
+    return list(iter_comments(content, file_ext))
+
+
+def check_for_non_ascii(text, stop_at_first=False):
+    """Check for non-ASCII characters in text in a single pass
+
+    Returns {script: {"count": n, "sample": "..."}} where sample holds at most
+    SAMPLE_SIZE distinct characters taken from the first SAMPLE_RUNS runs.
+    With stop_at_first the scan ends at the first offending character.
+    """
+    found_chars = {}
+
+    if NON_ASCII_PATTERN is None or text.isascii():
+        return found_chars
+
+    if stop_at_first:
+        match = NON_ASCII_PATTERN.search(text)
+        if match:
+            label = ENABLED_SCRIPTS[match.lastindex - 1]
+            found_chars[label] = {"count": 1, "sample": match.group()[0]}
+        return found_chars
+
+    counts = dict.fromkeys(ENABLED_SCRIPTS, 0)
+    samples = {label: {} for label in ENABLED_SCRIPTS}
+    matches = NON_ASCII_PATTERN.finditer(text)
+
+    # Sample distinct characters from the first runs only, then just count
+    for _, match in zip(range(SAMPLE_RUNS), matches):
+        label = ENABLED_SCRIPTS[match.lastindex - 1]
+        counts[label] += match.end() - match.start()
+        sample = samples[label]
+        if len(sample) < SAMPLE_SIZE:
+            for char in dict.fromkeys(match.group()):
+                sample[char] = None
+                if len(sample) >= SAMPLE_SIZE:
+                    break
+
+    for match in matches:
+        counts[ENABLED_SCRIPTS[match.lastindex - 1]] += match.end() - match.start()
+
+    for label in ENABLED_SCRIPTS:
+        if counts[label]:
+            found_chars[label] = {
+                "count": counts[label],
+                "sample": "".join(samples[label]),
+            }
+    return found_chars
 
-    file_ext = Path(file_path).suffix.lower() if file_path else ""
 
-    # Check content based on check mode
-    found_issues = {}
+def check_spans(spans, stop_at_first=False):
+    """Run check_for_non_ascii over a stream of spans and merge the results"""
+    found_chars = {}
+    for span in spans:
+        for label, info in check_for_non_ascii(span, stop_at_first).items():
+            merged = found_chars.setdefault(label, {"count": 0, "sample": ""})
+            merged["count"] += info["count"]
+            sample = dict.fromkeys(merged["sample"] + info["sample"])
+            merged["sample"] = "".join(sample)[:SAMPLE_SIZE]
+        if found_chars and stop_at_first:
+            break
+    return found_chars
 
+
+def find_non_ascii(content, file_ext, stop_at_first=False):
+    """Check the part of content selected by CHECK_MODE"""
     if CHECK_MODE == "all":
         # Check entire content
-        found_issues = check_for_non_ascii(content)
-    elif CHECK_MODE == "comments":
+        return check_for_non_ascii(content, stop_at_first)
+    if CHECK_MODE == "comments":
         # Check only comments
-        comments = extract_comments_from_content(content, file_ext)
-        all_comments = "\n".join(comments)
-        found_issues = check_for_non_ascii(all_comments)
-    elif CHECK_MODE == "strings":
-        # Check only strings (simplified version)
-        strings = re.findall(r'"[^"]*"|\'[^\']*\'', content)
-        all_strings = "\n".join(strings)
-        found_issues = check_for_non_ascii(all_strings)
+        return check_spans(iter_comments(content, file_ext), stop_at_first)
+    if CHECK_MODE == "strings":
+        # Check only string literals
+        return check_spans(iter_strings(content, file_ext), stop_at_first)
+    return {}
+
+
+def config_files():
+    """Ignore files the verdicts depend on (watched by hook_daemon.py)"""
+    return path_ignore.config_files()
+
+
+def effective_config():
+    """Settings that affect the verdict (keys the dispatcher's verdict cache)"""
+    return {
+        "CHECK_MODE": CHECK_MODE,
+        "BLOCK_ON_DETECTION": BLOCK_ON_DETECTION,
+        "ENABLED_SCRIPTS": ENABLED_SCRIPTS,
+        "ignore": path_ignore.config_stamp(),
+    }
+
+
+def run_hook(data, chunks=None):
+    """Evaluate a parsed hook payload and return (exit_code, decision)
+
+    chunks, when given, yields the added text in pieces (a streamed payload,
+    see main()); it is only read once the path qualifies for the check.
+    """
+    # Get tool input
+    tool_input = data.get("tool_input", {})
+    file_path = tool_input.get("file_path", "")
+    if path_ignore.is_ignored(file_path):
+        print(f"[OK] Ignored path (gitignore/vendor): {file_path}", file=sys.stderr)
+        return 0, None
+    # Get file extension
+    file_ext = os.path.splitext(file_path)[1].lower() if file_path else ""
+
+    # Only the text being added (Write content, Edit/MultiEdit replacements).
+    # Streamed text is checked chunk by chunk when every character counts;
+    # comments and strings need the lexer, so it is joined for them only
+    # when some chunk is not pure ASCII.
+    if chunks is not None and CHECK_MODE == "all":
+        found_issues = check_spans(chunks, BLOCK_ON_DETECTION)
+    else:
+        if chunks is None:
+            content = added_text(tool_input)
+        else:
+            content = collect_text(chunks, lambda text: not text.isascii())
+            if content is None:
+                print(
+                    f"[OK] No non-ASCII characters found in {file_path}",
+                    file=sys.stderr,
+                )
+                return 0, None
+
+        if not content:
+            print("[OK] No content to check", file=sys.stderr)
+            return 0, None
+
+        # Check content based on check mode
+        found_issues = find_non_ascii(content, file_ext, BLOCK_ON_DETECTION)
 
     # Output results
     if found_issues:
         print(f"\n[ERROR] Non-ASCII characters found in {file_path}:", file=sys.stderr)
         print("=" * 60, file=sys.stderr)
 
-        for char_type, chars in found_issues.items():
-            unique_chars = list(set(chars))[:20]  # Show first 20 different characters
-            print(f"  {char_type} characters: {''.join(unique_chars)}", file=sys.stderr)
-            if len(chars) > len(unique_chars):
-                print(f"  (Total {len(chars)} {char_type} characters)", file=sys.stderr)
+        for char_type, info in found_issues.items():
+            print(f"  {char_type} characters: {info['sample']}", file=sys.stderr)
+            if info["count"] > len(info["sample"]):
+                print(f"  (Total {info['count']} {char_type} characters)", file=sys.stderr)
 
         print("=" * 60, file=sys.stderr)
 
@@ -171,17 +405,46 @@ def main():
                 "decision": "block",
                 "reason": f"Non-ASCII characters found: {', '.join(found_issues.keys())}",
             }
-            print(json.dumps(decision, ensure_ascii=False))
-            sys.exit(2)  # Block operation
+            return 2, decision  # Block operation
         else:
             print(
                 "[WARNING] Non-ASCII characters found, but allowing operation to continue",
                 file=sys.stderr,
             )
-            sys.exit(0)
+            return 0, None
     else:
         print(f"[OK] No non-ASCII characters found in {file_path}", file=sys.stderr)
-        sys.exit(0)
+        return 0, None
+
+
+def main():
+    """Main function"""
+    # Read JSON data from stdin
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+
+    started = hook_telemetry.start()
+    try:
+        # Parsed as it arrives: the content is read in chunks, and not at all
+        # for a path the hook skips (see hook_payload.read_payload)
+        payload = read_payload(sys.stdin.buffer)
+        payload.need("tool_input.file_path")
+        data = payload.data
+        chunks = added_chunks(payload)
+        exit_code, decision = run_hook(data, chunks)
+        chunks.close()  # A check may stop reading early
+        payload.rest()
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    hook_telemetry.record(
+        "check_chinese_hook", started, data, payload.bytes_read, exit_code, decision
+    )
+    if decision:
+        print(json.dumps(decision, ensure_ascii=False))
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Claude Code PreToolUse Hook - Run every enabled check in one interpreter
+Parses the payload once, runs each check's run_hook() and merges the results
+into a single block/allow decision
+
+Configuration in settings.json:
+{
+  "matcher": "Edit|Write|MultiEdit",
+  "hooks": [
+    {
+      "type": "command",
+      "command": "HOOK_CHECKS=chinese,filename,show /path/to/hooks/dispatch_hook.py"
+    }
+  ]
+}
+
+Each check keeps its own environment configuration (CHECK_MODE,
+BLOCK_ON_DETECTION, ...) and its own tool matcher.
+
+The payload is parsed as it arrives (hook_payload.read_payload): path
+checks decide from tool_name and file_path, and a large Write content is
+only read by the content checks, in chunks replayed from a spool file.
+
+Verdicts of checks that define effective_config() are cached on disk
+(verdict_cache.py), so a retried Write or Edit skips evaluation. Set
+HOOK_VERDICT_CACHE=false to always evaluate.
+"""
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+
+import hook_telemetry
+from hook_payload import read_payload
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Running from a zipapp bundle (build_bundle.py): hook modules are importable
+BUNDLED = not os.path.isdir(HOOKS_DIR)
+TEMPLATE_HOOKS_DIR = os.path.join(
+    os.path.dirname(HOOKS_DIR), "local_hooks", "templates", "hooks"
+)
+
+# Registered checks: hook file, tools it applies to, where to look for it,
+# and whether run_hook() takes the added text as chunks (content checks)
+CHECKS = {
+    "chinese": {
+        "file": "check_chinese_hook.py",
+        "tools": ["Edit", "Write", "MultiEdit"],
+        "dirs": ["hooks"],
+        "content": True,
+    },
+    "filename": {
+        "file": "filename_ban_hook.py",
+        "tools": ["Write"],
+        "dirs": ["hooks"],
+    },
+    "show": {
+        "file": "no_show_in_python_hook.py",
+        "tools": ["Edit", "Write", "MultiEdit"],
+        "dirs": ["hooks"],
+        "content": True,
+    },
+    "protect_phase": {
+        "file": "protect_phase_file.py",
+        "tools": ["Edit", "Write", "MultiEdit", "NotebookEdit"],
+        "dirs": ["project", "templates"],
+    },
+    "phase": {
+        "file": "check_phase.py",
+        "tools": ["Edit", "Write", "MultiEdit"],
+        "dirs": ["project"],
+    },
+}
+
+# Configuration
+DEFAULT_CHECKS = "chinese,filename,show"
+HOOK_CHECKS = os.environ.get("HOOK_CHECKS", DEFAULT_CHECKS)
+
+
+def get_search_dirs(kinds):
+    """Resolve symbolic search directory names to paths"""
+    project_dir = os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    locations = {
+        "hooks": HOOKS_DIR,
+        "project": os.path.join(project_dir, ".claude", "hooks"),
+        "templates": TEMPLATE_HOOKS_DIR,
+    }
+    if BUNDLED:
+        # Files from hooks/ and the templates are inside the archive itself
+        kinds = [kind for kind in kinds if kind == "project"]
+    return [locations[kind] for kind in kinds]
+
+
+def find_check_file(name):
+    """Return the path of the hook file backing a check, or None"""
+    info = CHECKS[name]
+    for directory in get_search_dirs(info["dirs"]):
+        path = os.path.join(directory, info["file"])
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_module(name, path):
+    """Import a hook file as a private module"""
+    spec = importlib.util.spec_from_file_location(f"_claude_check_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_bundled_module(name):
+    """Import a hook module shipped inside the zipapp bundle, or None"""
+    try:
+        return importlib.import_module(os.path.splitext(CHECKS[name]["file"])[0])
+    except ImportError:
+        return None
+
+
+class MissingCheck:
+    """Stands in for a configured check whose hook file cannot be found
+
+    Skipping it would silently turn the guard off (e.g. after the suite or
+    the project's .claude/hooks moved), so every call it applies to is blocked.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        dirs = get_search_dirs(CHECKS[name]["dirs"])
+        # Where the file is expected: the daemon reloads once it appears there
+        self.__file__ = os.path.join(dirs[0] if dirs else "", CHECKS[name]["file"])
+
+    def run_hook(self, data):
+        reason = (
+            f"Check '{self.name}' is enabled in HOOK_CHECKS but its hook file "
+            f"{CHECKS[self.name]['file']} was not found; reinstall it or remove "
+            "the check from HOOK_CHECKS"
+        )
+        print(f"[ERROR] {reason}", file=sys.stderr)
+        return 2, {"decision": "block", "reason": reason}
+
+
+def parse_check_names(value):
+    """Split a comma-separated HOOK_CHECKS value"""
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def load_checks(names=None):
+    """Load the enabled checks, returning (name, tools, module) tuples"""
+    if names is None:
+        names = parse_check_names(HOOK_CHECKS)
+
+    checks = []
+    for name in names:
+        if name not in CHECKS:
+            print(f"[WARNING] Unknown check skipped: {name}", file=sys.stderr)
+            continue
+        path = find_check_file(name)
+        if path:
+            module = load_module(name, path)
+        elif BUNDLED:
+            module = load_bundled_module(name)
+        else:
+            module = None
+        if module is None:
+            module = MissingCheck(name)
+        checks.append((name, CHECKS[name]["tools"], module))
+    return checks
+
+
+def get_verdict_cache():
+    """Return the verdict cache, or None when disabled (read per call for the daemon)"""
+    if os.environ.get("HOOK_VERDICT_CACHE", "true").lower() != "true":
+        return None
+    import verdict_cache
+
+    return verdict_cache.open_cache()
+
+
+class CachedVerdict(Exception):
+    """Raised when a content check starts reading text with a cached verdict"""
+
+    def __init__(self, hit):
+        super().__init__()
+        self.hit = hit
+
+
+def run_check(name, module, data, cache, content=None):
+    """Run one check, replaying its cached verdict when there is one
+
+    content, for a streamed payload, is the ContentSpool of the added text;
+    content checks read it as chunks and their verdicts are keyed on its
+    digest. That key is only built once the check starts reading, so a
+    check that skips the path never makes the whole text be read.
+    """
+    streamed = content is not None and CHECKS[name].get("content", False)
+    key = None
+    if cache is not None:
+        import verdict_cache
+
+        if streamed:
+
+            def lookup():
+                nonlocal key
+                key = verdict_cache.verdict_key(name, module, data, content.digest())
+                hit = cache.get(key) if key else None
+                if hit:
+                    raise CachedVerdict(hit)
+
+            content.on_read = lookup
+        else:
+            key = verdict_cache.verdict_key(name, module, data)
+            hit = cache.get(key) if key else None
+            if hit:
+                return replay_verdict(name, hit)
+
+    # Capture the diagnostics so a cache hit can replay them
+    stderr = io.StringIO()
+    hit = None
+    try:
+        with contextlib.redirect_stderr(stderr):
+            if streamed:
+                check_code, decision = module.run_hook(data, content)
+            else:
+                check_code, decision = module.run_hook(data)
+    except CachedVerdict as e:
+        hit = e.hit
+    finally:
+        if streamed:
+            content.on_read = None
+        # What the check printed before reading is in the cached output
+        if hit is None:
+            sys.stderr.write(stderr.getvalue())
+    if hit:
+        return replay_verdict(name, hit)
+
+    # Errors (exit 1) are not cached: they may not happen next time
+    if key and check_code in (0, 2):
+        cache.put(key, check_code, decision, stderr.getvalue())
+    return check_code, decision
+
+
+def replay_verdict(name, hit):
+    """Write a cached verdict's diagnostics and return (exit_code, decision)"""
+    check_code, decision, stderr = hit
+    sys.stderr.write(stderr)
+    print(f"[INFO] Check '{name}': cached verdict", file=sys.stderr)
+    return check_code, decision
+
+
+def dispatch(payload, checks, payload_bytes=0):
+    """Run every applicable check and merge the results into one decision
+
+    payload is a parsed dict or a StreamingPayload (hook_payload.read_payload),
+    whose content is read only if a content check gets that far.
+    Malformed streamed input raises json.JSONDecodeError.
+    """
+    if isinstance(payload, dict):
+        data, content = payload, None
+    else:
+        import hook_payload
+
+        payload.need("tool_name", "tool_input.file_path")
+        data = payload.data
+        content = hook_payload.ContentSpool(hook_payload.added_chunks(payload))
+    tool_name = data.get("tool_name", "")
+    exit_code = 0
+    reasons = []
+    cache = get_verdict_cache()
+
+    try:
+        for name, tools, module in checks:
+            if tool_name and tool_name not in tools:
+                continue
+            started = hook_telemetry.start()
+            try:
+                check_code, decision = run_check(name, module, data, cache, content)
+            except json.JSONDecodeError:
+                raise  # The payload itself is broken, not the check
+            except Exception:
+                # A crashing hook is a non-blocking error, same as a separate process
+                import traceback
+
+                print(f"[ERROR] Check '{name}' failed:", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                check_code, decision = 1, None
+            hook_telemetry.record(
+                os.path.splitext(CHECKS[name]["file"])[0],
+                started,
+                data,
+                payload_bytes or getattr(payload, "bytes_read", 0),
+                check_code,
+                decision,
+            )
+
+            exit_code = max(exit_code, check_code)
+            if decision and decision.get("decision") == "block":
+                reasons.append(decision.get("reason", f"Blocked by {name}"))
+    finally:
+        if content is not None:
+            content.close()
+    if content is not None:
+        payload.rest()
+
+    if reasons:
+        return 2, {"decision": "block", "reason": "; ".join(reasons)}
+    return exit_code, None
+
+
+def main():
+    """Main function"""
+    # Read JSON data from stdin
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+
+    started = hook_telemetry.start()
+    try:
+        payload = read_payload(sys.stdin.buffer)
+        exit_code, decision = dispatch(payload, load_checks())
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    hook_telemetry.record(
+        "dispatch_hook", started, payload.data, payload.bytes_read, exit_code, decision
+    )
+    if decision:
+        print(json.dumps(decision, ensure_ascii=False))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
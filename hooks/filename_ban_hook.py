@@ -2,13 +2,23 @@
 """
 Claude Code PreToolUse Hook - Ban poor file naming patterns
 Encourages good naming practices and organized file structure
+The rule tables below are defaults; hook_rules files extend them (rule_packs.py)
 """
 import json
 import os
 import re
 import sys
-from datetime import datetime
-from pathlib import Path
+
+import hook_telemetry
+import path_ignore
+import rule_packs
+import typo_vocabulary
+from hook_payload import read_payload
+
+# Configuration
+# Look tokens missing from COMMON_TYPOS up in the typo_index.py edit-distance index
+# (opt-in: needs `typo_index.py build`, and near misses are not always typos)
+TYPO_FUZZY = os.environ.get("TYPO_FUZZY", "false").lower() == "true"
 
 # Common typos mapping
 COMMON_TYPOS = {
@@ -335,27 +345,324 @@ SPECIAL_DIRS = [
     "docs",
 ]
 
+# Markdown files allowed outside docs/ -> what they are for
+MARKDOWN_FILES = {
+    "CLAUDE.md": "Claude Code configuration",
+    "TODO.md": "Task tracking",
+    "README.md": "Project documentation",
+    "INSTALL.md": "Installation guide",
+    "DESIGN.md": "Architecture and design documentation",
+    "QUALITY.md": "Issue found in implementation",
+}
+ALLOWED_MARKDOWN_FILES = list(MARKDOWN_FILES)
+
+
+# Path helpers on plain strings (same results as pathlib's stem/suffix/parts
+# for hook paths, without importing pathlib on every hook start)
+def split_name(filepath):
+    """Split the final path component into (stem, suffix)"""
+    name = os.path.basename(filepath.rstrip("/"))
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
+
+
+def path_parts(filepath):
+    """Return the non-empty components of a path"""
+    return [part for part in filepath.split("/") if part and part != "."]
+
+
+# Pattern bodies that can be matched as plain strings instead of regexes
+LITERAL_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+
+
+def leading_literal(body):
+    """Return the literal text every match of body must start with"""
+    match = LITERAL_PATTERN.match(body)
+    if not match:
+        return ""
+    literal = match.group(0)
+    if body[match.end() : match.end() + 1] in ("?", "*", "+", "{"):
+        literal = literal[:-1]
+    return literal.lower()
+
+
+def top_level_branches(pattern):
+    """Split a regex on the | characters outside groups and classes"""
+    branches, start, depth, i = [], 0, 0, 0
+    in_class = False
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+            if pattern[i + 1 : i + 2] == "^":
+                i += 1
+            if pattern[i + 1 : i + 2] == "]":
+                i += 1  # A ] right after [ (or [^) is literal
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+# Group references and names change meaning inside the combined regex, and
+# global inline flags are only valid at its very start
+NOT_COMBINABLE = re.compile(
+    r"\\(?:[1-9]|g<)|\(\?P[<=]|\(\?<[A-Za-z_]|\(\?[aiLmsux]+\)"
+)
+
+
+def pattern_tables(bad_patterns, combine=True):
+    """Sort BAD_PATTERNS into PatternIndex's lookup tables (plain data only,
+    so rule_packs.py can cache the result)"""
+    rules = []
+    exact, prefixes, suffixes, guarded = {}, {}, {}, {}
+    complex_parts = []
+    standalone = []
+
+    for category, info in bad_patterns.items():
+        for pattern in info["patterns"]:
+            rule_id = len(rules)
+            rules.append((category, pattern))
+            body = pattern[1:] if pattern.startswith("^") else pattern
+            body = body[:-1] if body.endswith("$") else body
+
+            if LITERAL_PATTERN.fullmatch(body):
+                literal = body.lower()
+                if pattern.startswith("^") and pattern.endswith("$"):
+                    table = exact
+                elif pattern.startswith("^"):
+                    table = prefixes
+                elif pattern.endswith("$"):
+                    table = suffixes
+                else:
+                    table = None
+                if table is not None:
+                    table.setdefault(literal, []).append(rule_id)
+                    continue
+
+            if pattern.startswith("^") and "|" not in pattern:
+                literal = leading_literal(pattern[1:])
+                if literal:
+                    guarded.setdefault(literal, []).append((rule_id, pattern))
+                    continue
+            if not combine or NOT_COMBINABLE.search(pattern):
+                standalone.append((rule_id, pattern))
+                continue
+            # Only a pattern anchored in every branch can skip the scan
+            anchored = all(b.startswith("^") for b in top_level_branches(pattern))
+            lead = "" if anchored else ".*?"
+            complex_parts.append(f"(?:(?={lead}(?P<r{rule_id}>{pattern}))|)")
+
+    return {
+        "rules": rules,
+        "exact": exact,
+        "prefixes": prefixes,
+        "suffixes": suffixes,
+        "guarded": guarded,
+        "standalone": standalone,
+        "combined": "".join(complex_parts) or None,
+    }
+
+
+class PatternIndex:
+    """BAD_PATTERNS compiled once into lookup tables and a single regex
+
+    Anchored literal patterns (^temp$, ^temp_, _temp$) go into dicts keyed by
+    the literal, probed once per distinct literal length. Other ^-anchored
+    patterns are guarded by their leading literal (^test\\d+$ under "test")
+    and only run when the filename starts with it. The rest are combined
+    into one regex of optional named lookaheads, so a single match call
+    reports every pattern that applies, except those using backreferences,
+    named groups or inline flags, which are searched one by one. Regexes
+    are compiled on first use.
+    """
+
+    def __init__(self, bad_patterns):
+        self._load(pattern_tables(bad_patterns))
+
+    @classmethod
+    def from_tables(cls, tables):
+        """Build the index from pattern_tables() output"""
+        index = cls.__new__(cls)
+        index._load(tables)
+        return index
+
+    def _load(self, tables):
+        self.rules = tables["rules"]
+        self.exact = tables["exact"]
+        self.prefixes = tables["prefixes"]
+        self.suffixes = tables["suffixes"]
+        self.guarded = tables["guarded"]
+        self.standalone = tables["standalone"]
+        self.combined_source = tables["combined"]
+        self.combined = None
+        self.compiled = {}
+
+        self.prefix_lengths = sorted({len(k) for k in self.prefixes})
+        self.guarded_lengths = sorted({len(k) for k in self.guarded})
+        self.suffix_lengths = sorted({len(k) for k in self.suffixes})
+
+    def match_ids(self, name):
+        """Return the ids of every rule matching name, in table order"""
+        lowered = name.lower()
+        hits = list(self.exact.get(lowered, ()))
+
+        for length in self.prefix_lengths:
+            if length > len(lowered):
+                break
+            hits.extend(self.prefixes.get(lowered[:length], ()))
+        for length in self.suffix_lengths:
+            if length > len(lowered):
+                break
+            hits.extend(self.suffixes.get(lowered[-length:], ()))
+        for length in self.guarded_lengths:
+            if length > len(lowered):
+                break
+            for rule_id, pattern in self.guarded.get(lowered[:length], ()):
+                if self.search(rule_id, pattern, name):
+                    hits.append(rule_id)
+        for rule_id, pattern in self.standalone:
+            if self.search(rule_id, pattern, name):
+                hits.append(rule_id)
+
+        if self.combined_source is not None:
+            if self.combined is None:
+                self.combined = re.compile(self.combined_source, re.IGNORECASE)
+            match = self.combined.match(name)
+            for group, value in match.groupdict().items():
+                if value is not None:
+                    hits.append(int(group[1:]))
+
+        return sorted(hits)
+
+    def search(self, rule_id, pattern, name):
+        """Search one pattern on its own, compiling it on first use"""
+        compiled = self.compiled.get(rule_id)
+        if compiled is None:
+            compiled = self.compiled[rule_id] = re.compile(pattern, re.IGNORECASE)
+        return compiled.search(name)
+
+
+def compile_rules(rules):
+    """Validate merged filename rules and build their lookup tables"""
+    bad_patterns = {}
+    for category, info in rules.get("bad_patterns", {}).items():
+        where = f"filename.bad_patterns.{category}"
+        bad_patterns[category] = {
+            "patterns": [
+                p for p in info.get("patterns", []) if rule_packs.valid_regex(p, where)
+            ],
+            "reason": info.get("reason", f"{category} pattern detected"),
+            "suggestion": info.get("suggestion", "Use a descriptive name"),
+        }
+    tables = pattern_tables(bad_patterns)
+    if tables["combined"] is not None:
+        try:
+            re.compile(tables["combined"], re.IGNORECASE)
+        except re.error as e:
+            rule_packs.warn(f"Filename patterns searched one by one: {e}")
+            tables = pattern_tables(bad_patterns, combine=False)
+    return {
+        "bad_patterns": bad_patterns,
+        "pattern_tables": tables,
+        "common_typos": {
+            typo.lower(): fix for typo, fix in rules.get("common_typos", {}).items()
+        },
+        "allowed_test_patterns": [
+            p
+            for p in rules.get("allowed_test_patterns", [])
+            if rule_packs.valid_regex(p, "filename.allowed_test_patterns")
+        ],
+        "special_dirs": list(rules.get("special_dirs", [])),
+        "markdown_allowlist": list(rules.get("markdown_allowlist", [])),
+    }
+
+
+# Merge in the user and project rule files (see rule_packs.py); from here on
+# the tables above hold the merged rules
+RULES, RULES_STAMP = rule_packs.load(
+    "filename",
+    {
+        "bad_patterns": BAD_PATTERNS,
+        "common_typos": COMMON_TYPOS,
+        "allowed_test_patterns": ALLOWED_TEST_PATTERNS,
+        "special_dirs": SPECIAL_DIRS,
+        "markdown_allowlist": ALLOWED_MARKDOWN_FILES,
+    },
+    compile_rules,
+    __file__,
+)
+BAD_PATTERNS = RULES["bad_patterns"]
+COMMON_TYPOS = RULES["common_typos"]
+ALLOWED_TEST_PATTERNS = RULES["allowed_test_patterns"]
+SPECIAL_DIRS = RULES["special_dirs"]
+ALLOWED_MARKDOWN_FILES = RULES["markdown_allowlist"]
+BAD_PATTERN_INDEX = PatternIndex.from_tables(RULES["pattern_tables"])
+
+
+def _bad_pattern_result(rule_id):
+    category, pattern = BAD_PATTERN_INDEX.rules[rule_id]
+    info = BAD_PATTERNS[category]
+    return {
+        "matched": True,
+        "pattern": pattern,
+        "category": category,
+        "reason": info["reason"],
+        "suggestion": info["suggestion"],
+    }
+
 
 def check_bad_patterns(filename):
     """Check if filename matches any bad patterns"""
-    name_without_ext = Path(filename).stem
-
-    for category, info in BAD_PATTERNS.items():
-        for pattern in info["patterns"]:
-            if re.search(pattern, name_without_ext, re.IGNORECASE):
-                return {
-                    "matched": True,
-                    "pattern": pattern,
-                    "category": category,
-                    "reason": info["reason"],
-                    "suggestion": info["suggestion"],
-                }
+    rule_ids = BAD_PATTERN_INDEX.match_ids(split_name(filename)[0])
+    if rule_ids:
+        return _bad_pattern_result(rule_ids[0])
     return {"matched": False}
 
 
+def find_bad_patterns(filename):
+    """Return the first matching pattern of every matching category"""
+    results = []
+    seen = set()
+    for rule_id in BAD_PATTERN_INDEX.match_ids(split_name(filename)[0]):
+        category = BAD_PATTERN_INDEX.rules[rule_id][0]
+        if category not in seen:
+            seen.add(category)
+            results.append(_bad_pattern_result(rule_id))
+    return results
+
+
+def fuzzy_correction(token):
+    """Closest vocabulary word for a misspelled token, or None
+
+    Known words are settled here; only the rest open the sqlite index.
+    """
+    if not TYPO_FUZZY or len(token) < typo_vocabulary.MIN_TYPO_LENGTH:
+        return None
+    if not token.isalpha() or typo_vocabulary.is_known(token):
+        return None
+    import typo_index
+
+    return typo_index.suggest(token)
+
+
 def check_typos(filename):
     """Check if filename contains common typos"""
-    name_without_ext = Path(filename).stem.lower()
+    name_without_ext = split_name(filename)[0].lower()
 
     # Split on common separators
     parts = re.split(r"[_\-\.]", name_without_ext)
@@ -363,21 +670,19 @@ def check_typos(filename):
     found_typos = []
     corrections = []
 
+    fixes = {}
     for part in parts:
-        if part in COMMON_TYPOS:
+        correction = COMMON_TYPOS.get(part) or fuzzy_correction(part)
+        if correction:
             found_typos.append(part)
-            corrections.append(COMMON_TYPOS[part])
+            corrections.append(correction)
+            fixes[part] = correction
 
     if found_typos:
         # Rebuild the corrected filename
-        corrected_parts = []
-        for part in parts:
-            if part in COMMON_TYPOS:
-                corrected_parts.append(COMMON_TYPOS[part])
-            else:
-                corrected_parts.append(part)
+        corrected_parts = [fixes.get(part, part) for part in parts]
 
-        corrected_name = "_".join(corrected_parts) + Path(filename).suffix
+        corrected_name = "_".join(corrected_parts) + split_name(filename)[1]
 
         return {
             "matched": True,
@@ -398,21 +703,21 @@ def is_test_file(filepath):
 
 def is_in_special_dir(filepath):
     """Check if file is in a special directory (case-insensitive)"""
-    parts = Path(filepath).parts
+    parts = path_parts(filepath)
     special_dirs_lower = [d.lower() for d in SPECIAL_DIRS]
     return any(part.lower() in special_dirs_lower for part in parts)
 
 
 def is_in_test_dir(filepath):
     """Check if file is in a test directory (tests/test/TESTS/TEST)"""
-    parts = Path(filepath).parts
+    parts = path_parts(filepath)
     test_dir_names = ["tests", "test"]
     return any(part.lower() in test_dir_names for part in parts)
 
 
 def is_context_appropriate(filepath, match_result):
     """Check if the pattern is appropriate for the directory context"""
-    parts = Path(filepath).parts
+    parts = path_parts(filepath)
     filename = os.path.basename(filepath)
     pattern = match_result.get("pattern", "")
 
@@ -452,8 +757,8 @@ def is_context_appropriate(filepath, match_result):
 def suggest_better_name(filepath, match_info):
     """Suggest a better filename based on the bad pattern"""
     filename = os.path.basename(filepath)
-    name_without_ext = Path(filename).stem
-    ext = Path(filename).suffix
+    name_without_ext = split_name(filename)[0]
+    ext = split_name(filename)[1]
 
     # Remove bad prefixes/suffixes
     cleaned_name = name_without_ext
@@ -495,6 +800,8 @@ def suggest_better_name(filepath, match_info):
 
 def generate_backup_path(original_path):
     """Generate a backup path with timestamp"""
+    from datetime import datetime
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = os.path.basename(original_path)
     return f"backup/{timestamp}_{filename}"
@@ -508,22 +815,12 @@ def check_markdown_restrictions(filepath):
     if not filename.lower().endswith(".md"):
         return {"allowed": True}
 
-    # Allowed markdown files
-    ALLOWED_MARKDOWN_FILES = [
-        "CLAUDE.md",
-        "TODO.md",
-        "README.md",
-        "INSTALL.md",
-        "DESIGN.md",
-        "QUALITY.md",
-    ]
-
     # Check if it's an allowed markdown file (case-insensitive)
     if filename.upper() in [f.upper() for f in ALLOWED_MARKDOWN_FILES]:
         return {"allowed": True}
 
     # Check if it's in docs directory
-    parts = Path(filepath).parts
+    parts = path_parts(filepath)
     if "docs" in [part.lower() for part in parts]:
         return {"allowed": True}
 
@@ -535,19 +832,38 @@ def check_markdown_restrictions(filepath):
     }
 
 
-def main():
-    """Main function"""
-    # Read JSON data from stdin
-    if sys.stdin.isatty():
-        print("[ERROR] No input data received", file=sys.stderr)
-        sys.exit(1)
+def config_files():
+    """Rule and ignore files the loaded rules depend on (watched by hook_daemon.py)"""
+    return rule_packs.rule_files() + path_ignore.config_files()
 
-    try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
-        sys.exit(1)
 
+def effective_config():
+    """Settings that affect the verdict (keys the dispatcher's verdict cache)
+
+    The built-in rules are in this file, whose stamp is part of the key
+    already; the rule files applied on top, the typo vocabulary and the
+    repository's mined typo index are added here.
+    """
+    if not TYPO_FUZZY:
+        return {
+            "typo_fuzzy": False,
+            "rules": RULES_STAMP,
+            "ignore": path_ignore.config_stamp(),
+        }
+    import typo_index
+
+    return {
+        "typo_fuzzy": True,
+        "rules": RULES_STAMP,
+        "ignore": path_ignore.config_stamp(),
+        "vocabulary": typo_index.base_fingerprint(),
+        "index": typo_index.index_stamp(typo_index.base_index_path()),
+        "repo_index": typo_index.index_stamp(typo_index.repo_index_path()),
+    }
+
+
+def run_hook(data):
+    """Evaluate a parsed hook payload and return (exit_code, decision)"""
     # Get tool input
     tool_input = data.get("tool_input", {})
     file_path = tool_input.get("file_path", "")
@@ -555,13 +871,16 @@ def main():
 
     if not file_path:
         print("[OK] No file path to check", file=sys.stderr)
-        sys.exit(0)
+        return 0, None
+    if path_ignore.is_ignored(file_path):
+        print(f"[OK] Ignored path (gitignore/vendor): {file_path}", file=sys.stderr)
+        return 0, None
 
     # Only check new file creation (Write tool with new files)
     # Allow editing existing files even with bad names
     if tool_name in ["Edit", "MultiEdit"] or os.path.exists(file_path):
         print(f"[OK] Allowing edit of existing file: {file_path}", file=sys.stderr)
-        sys.exit(0)
+        return 0, None
 
     # Check if in special directory (temp/, backup/ etc)
     if is_in_special_dir(file_path):
@@ -569,12 +888,17 @@ def main():
             f"[OK] File in special directory, relaxed rules: {file_path}",
             file=sys.stderr,
         )
-        sys.exit(0)
+        return 0, None
 
     # Check markdown restrictions first
     markdown_check = check_markdown_restrictions(file_path)
     if not markdown_check["allowed"]:
         filename = os.path.basename(file_path)
+        lines = []
+        for name in ALLOWED_MARKDOWN_FILES:
+            note = MARKDOWN_FILES.get(name)
+            lines.append(f"- {name} ({note})" if note else f"- {name}")
+        markdown_list = "\n".join(lines)
 
         error_message = f"""
 [ERROR] {markdown_check['reason']}: '{filename}'
@@ -582,12 +906,7 @@ def main():
 {markdown_check['suggestion']}
 
 Allowed markdown files:
-- CLAUDE.md (Claude Code configuration)
-- TODO.md (Task tracking)
-- README.md (Project documentation)
-- INSTALL.md (Installation guide)
-- DESIGN.md (Architecture and design documentation)
-- QUALITY.md (Issue found in implementation)
+{markdown_list}
 
 All other documentation should go in the docs/ directory.
 """
@@ -598,8 +917,7 @@ All other documentation should go in the docs/ directory.
             "decision": "block",
             "reason": f"{markdown_check['reason']}. {markdown_check['suggestion']}",
         }
-        print(json.dumps(decision))
-        sys.exit(2)  # Block operation
+        return 2, decision  # Block operation
 
     # Check for bad patterns
     filename = os.path.basename(file_path)
@@ -613,7 +931,7 @@ All other documentation should go in the docs/ directory.
 
         if is_appropriate:
             print(f"[OK] {context_message}: {file_path}", file=sys.stderr)
-            sys.exit(0)
+            return 0, None
 
         better_name = suggest_better_name(file_path, match_result)
 
@@ -660,8 +978,7 @@ Example good names:
             "decision": "block",
             "reason": f"{match_result['reason']}. Try: {better_name} or {suggestion}",
         }
-        print(json.dumps(decision))
-        sys.exit(2)  # Block operation
+        return 2, decision  # Block operation
 
     # Check for typos
     typo_result = check_typos(filename)
@@ -680,8 +997,7 @@ Suggested filename: {typo_result['suggested_name']}
             "decision": "block",
             "reason": f"{typo_result['reason']}. Try: {typo_result['suggested_name']} or temp/{filename}",
         }
-        print(json.dumps(decision))
-        sys.exit(2)  # Block operation
+        return 2, decision  # Block operation
 
     # Check if it's a standard test file in a test directory
     if is_in_test_dir(file_path) and is_test_file(file_path):
@@ -690,7 +1006,32 @@ Suggested filename: {typo_result['suggested_name']}
         )
     else:
         print(f"[OK] Good filename: {file_path}", file=sys.stderr)
-    sys.exit(0)
+    return 0, None
+
+
+def main():
+    """Main function"""
+    # Read JSON data from stdin
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+
+    started = hook_telemetry.start()
+    try:
+        # Only the path is checked: the content is skipped, never decoded
+        payload = read_payload(sys.stdin.buffer)
+        data = payload.rest()
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    exit_code, decision = run_hook(data)
+    hook_telemetry.record(
+        "filename_ban_hook", started, data, payload.bytes_read, exit_code, decision
+    )
+    if decision:
+        print(json.dumps(decision))
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Thin client for format_server.py, used by formatting_hook.sh
+
+Usage: python3 format_client.py FILE...
+
+Sends the files to the format server and prints the ones it could not
+format (one per line) on stdout, for formatting.sh to handle. Exits 1 when
+the server is not reachable, starting it in the background for the next
+edit, so the caller falls back to formatting.sh for every file.
+"""
+import json
+import os
+import socket
+import sys
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuration
+SOCKET_PATH = os.environ.get(
+    "FORMAT_SERVER_SOCKET", os.path.expanduser("~/.claude/format_server.sock")
+)
+SERVER_TIMEOUT = float(os.environ.get("FORMAT_SERVER_TIMEOUT", "30"))
+AUTOSTART = os.environ.get("FORMAT_SERVER_AUTOSTART", "true").lower() == "true"
+
+
+def ask_server(files):
+    """Send the files to the server and return its per-file results"""
+    header = json.dumps({"files": files, "cwd": os.getcwd()}).encode() + b"\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(SERVER_TIMEOUT)
+        sock.connect(SOCKET_PATH)
+        sock.sendall(header)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))["results"]
+
+
+def start_server():
+    """Launch the server in the background for subsequent calls"""
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HOOKS_DIR, "format_server.py"),
+            "--socket",
+            SOCKET_PATH,
+            "--idle-timeout",
+            "3600",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main():
+    """Main function"""
+    files = sys.argv[1:]
+    if not files:
+        return
+
+    try:
+        results = ask_server(files)
+    except (OSError, ValueError, KeyError):
+        if AUTOSTART:
+            start_server()
+        sys.exit(1)
+
+    for path in files:
+        info = results.get(path, {"status": "unsupported"})
+        status, formatter = info["status"], info.get("formatter", "")
+        if status == "formatted":
+            print(f"Formatting {path}... [OK] {formatter}", file=sys.stderr)
+        elif status == "unchanged":
+            print(f"Formatting {path}... [OK] {formatter} (unchanged)", file=sys.stderr)
+        elif status == "error":
+            print(
+                f"Formatting {path}... [ERROR] {formatter}: {info.get('message', '')}",
+                file=sys.stderr,
+            )
+        else:
+            # Let formatting.sh handle it
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Long-lived formatting server for formatting_hook.sh
+
+Keeps the slow-starting formatters warm so a PostToolUse format costs a
+socket round trip instead of a fresh interpreter:
+
+  .py                                     black, imported in-process
+  .js .jsx .ts .tsx .md .yaml .yml        prettier, in pooled node workers
+
+Other file types (and these, when the formatter is not installed) come back
+as "unsupported" and formatting_hook.sh formats them with formatting.sh.
+Formatters are configured as in formatting.sh: black with --line-length 88
+plus the project's pyproject.toml, prettier with the project's config
+(markdown with --prose-wrap always). Files are only rewritten when the
+formatted output differs.
+
+Protocol: one JSON line {"files": [...], "cwd": "..."} (or {"command":
+"stop"|"ping"}); the reply is {"results": {path: {"status", "formatter",
+"message"}}} with status formatted, unchanged, unsupported or error.
+
+Usage: python3 format_server.py [--socket PATH] [--idle-timeout SECONDS]
+       python3 format_server.py --stop | --status
+"""
+import argparse
+import contextlib
+import json
+import os
+import queue
+import select
+import shutil
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HOOKS_DIR)
+
+from server_support import file_stamp, send_command, socket_is_live  # noqa: E402
+
+DEFAULT_SOCKET = os.path.expanduser("~/.claude/format_server.sock")
+SOCKET_PATH = os.environ.get("FORMAT_SERVER_SOCKET", DEFAULT_SOCKET)
+PRETTIER_WORKERS = int(os.environ.get("FORMAT_SERVER_PRETTIER_WORKERS", "2"))
+PRETTIER_TIMEOUT = 30
+
+BLACK_EXTENSIONS = {".py"}
+# Extension -> extra prettier options (mirrors the formatting.sh flags)
+PRETTIER_EXTENSIONS = {
+    ".js": {},
+    ".jsx": {},
+    ".ts": {},
+    ".tsx": {},
+    ".md": {"proseWrap": "always"},
+    ".yaml": {},
+    ".yml": {},
+}
+
+# Node worker: formats newline-delimited JSON requests with the prettier
+# resolvable from the project (falling back to the global install)
+PRETTIER_WORKER = r"""
+const readline = require("readline");
+const fs = require("fs");
+const path = require("path");
+const cache = new Map();
+
+function loadPrettier(cwd) {
+  const resolved = require.resolve("prettier", {
+    paths: [cwd, process.env.PRETTIER_GLOBAL_ROOT || ""],
+  });
+  if (!cache.has(resolved)) cache.set(resolved, require(resolved));
+  return cache.get(resolved);
+}
+
+async function handle(req) {
+  const prettier = loadPrettier(req.cwd);
+  const ignorePath = path.join(req.cwd, ".prettierignore");
+  const info = await prettier.getFileInfo(req.filepath, {
+    ignorePath: fs.existsSync(ignorePath) ? ignorePath : undefined,
+  });
+  if (info.ignored) return { ignored: true };
+  const config = (await prettier.resolveConfig(req.filepath)) || {};
+  const source = fs.readFileSync(req.filepath, "utf8");
+  const formatted = await prettier.format(source, {
+    ...config,
+    ...req.options,
+    filepath: req.filepath,
+  });
+  if (formatted === source) return { changed: false };
+  fs.writeFileSync(req.filepath, formatted);
+  return { changed: true };
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on("line", async (line) => {
+  let reply;
+  try {
+    reply = await handle(JSON.parse(line));
+  } catch (e) {
+    reply = {
+      error: String((e && e.message) || e),
+      missing: Boolean(e && e.code === "MODULE_NOT_FOUND"),
+    };
+  }
+  process.stdout.write(JSON.stringify(reply) + "\n");
+});
+"""
+
+
+def result(status, formatter="", message=""):
+    return {"status": status, "formatter": formatter, "message": message}
+
+
+class BlackBackend:
+    """black imported once and called in-process"""
+
+    name = "black"
+
+    def __init__(self):
+        try:
+            import black
+        except ImportError:
+            black = None
+        self.black = black
+        self.modes = {}  # pyproject.toml path -> (stamp, mode)
+
+    def mode_for(self, path):
+        """Build a black Mode from the project's pyproject.toml (cached)"""
+        black = self.black
+        pyproject = black.find_pyproject_toml((os.path.dirname(path),))
+        stamp = file_stamp(pyproject) if pyproject else None
+        cached = self.modes.get(pyproject)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        config = black.parse_pyproject_toml(pyproject) if pyproject else {}
+        mode = black.Mode(
+            target_versions={
+                black.TargetVersion[v.upper()] for v in config.get("target_version", [])
+            },
+            line_length=88,  # formatting.sh passes --line-length 88
+            string_normalization=not config.get("skip_string_normalization", False),
+            magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+            preview=config.get("preview", False),
+        )
+        self.modes[pyproject] = (stamp, mode)
+        return mode
+
+    def format(self, path, cwd):
+        black = self.black
+        if black is None:
+            return result("unsupported", self.name, "black not installed")
+
+        from pathlib import Path
+
+        # Same entry point as the CLI: keeps encoding and newlines, and only
+        # writes when the output differs
+        changed = black.format_file_in_place(
+            Path(path),
+            fast=False,
+            mode=self.mode_for(path),
+            write_back=black.WriteBack.YES,
+        )
+        if not changed:
+            return result("unchanged", self.name)
+        return result("formatted", self.name)
+
+
+class PrettierBackend:
+    """A pool of node processes with prettier loaded"""
+
+    name = "prettier"
+
+    def __init__(self, size):
+        self.node = shutil.which("node")
+        self.global_root = self.find_global_root() if self.node else ""
+        self.size = size
+        self.workers = queue.Queue()
+        self.started = 0
+        self.lock = threading.Lock()
+        self.available = bool(self.node)
+
+    @staticmethod
+    def find_global_root():
+        try:
+            out = subprocess.run(
+                ["npm", "root", "-g"], capture_output=True, text=True, timeout=10
+            )
+            return out.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    def start_worker(self):
+        env = dict(os.environ, PRETTIER_GLOBAL_ROOT=self.global_root)
+        return subprocess.Popen(
+            [self.node, "-e", PRETTIER_WORKER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+        )
+
+    def checkout(self):
+        """Take an idle worker, starting one while the pool is not full"""
+        with self.lock:
+            if self.workers.empty() and self.started < self.size:
+                self.started += 1
+                return self.start_worker()
+        return self.workers.get(timeout=PRETTIER_TIMEOUT)
+
+    def checkin(self, worker):
+        if worker.poll() is None:
+            self.workers.put(worker)
+        else:
+            with self.lock:
+                self.started -= 1
+
+    def discard(self, worker):
+        """Kill a hung worker; checkout() starts a fresh one in its place"""
+        worker.kill()
+        worker.wait()
+        with self.lock:
+            self.started -= 1
+
+    @staticmethod
+    def read_reply(worker):
+        """The worker's reply line, or None when none arrives in time"""
+        ready, _, _ = select.select([worker.stdout], [], [], PRETTIER_TIMEOUT)
+        if not ready:
+            return None
+        return worker.stdout.readline()
+
+    def format(self, path, cwd):
+        if not self.available:
+            return result("unsupported", self.name, "node not installed")
+
+        options = PRETTIER_EXTENSIONS[os.path.splitext(path)[1].lower()]
+        request = {"filepath": path, "cwd": cwd, "options": options}
+        worker = self.checkout()
+        try:
+            worker.stdin.write(json.dumps(request) + "\n")
+            worker.stdin.flush()
+            line = self.read_reply(worker)
+        except OSError:
+            line = ""
+        if line is None:
+            self.discard(worker)
+            message = f"prettier worker timed out after {PRETTIER_TIMEOUT}s"
+            return result("error", self.name, message)
+        self.checkin(worker)
+
+        if not line:
+            return result("unsupported", self.name, "prettier worker exited")
+        reply = json.loads(line)
+        if reply.get("missing"):
+            return result("unsupported", self.name, "prettier not installed")
+        if "error" in reply:
+            return result("error", self.name, reply["error"])
+        if reply.get("ignored") or not reply.get("changed"):
+            return result("unchanged", self.name)
+        return result("formatted", self.name)
+
+    def close(self):
+        while not self.workers.empty():
+            worker = self.workers.get()
+            worker.stdin.close()
+            worker.wait()
+
+
+class FormatServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        super().__init__(socket_path, FormatRequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.running = True
+        self.last_request = time.monotonic()
+        self.own_stamp = file_stamp(os.path.abspath(__file__))
+        self.black = BlackBackend()
+        self.prettier = PrettierBackend(PRETTIER_WORKERS)
+
+    def backend_for(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in BLACK_EXTENSIONS:
+            return self.black
+        if ext in PRETTIER_EXTENSIONS:
+            return self.prettier
+        return None
+
+    def format_file(self, path, cwd):
+        """Format one file, returning its result record"""
+        path = os.path.join(cwd, path)
+        if not os.path.isfile(path):
+            return result("error", message="no such file")
+        backend = self.backend_for(path)
+        if backend is None:
+            return result("unsupported", message="no in-process formatter")
+        try:
+            return backend.format(path, cwd)
+        except Exception as e:
+            return result("error", backend.name, f"{type(e).__name__}: {e}")
+
+
+class FormatRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.last_request = time.monotonic()
+        header = json.loads(self.rfile.readline() or b"{}")
+
+        command = header.get("command")
+        if command == "stop":
+            self.server.running = False
+            response = {"results": {}}
+        elif command == "ping":
+            response = {"results": {}}
+        else:
+            cwd = header.get("cwd") or os.getcwd()
+            response = {
+                "results": {
+                    path: self.server.format_file(path, cwd)
+                    for path in header.get("files", [])
+                }
+            }
+        self.wfile.write(json.dumps(response).encode())
+
+
+def serve(socket_path, idle_timeout=0):
+    """Run the server until stopped, idle for too long, or its source changes"""
+    if os.path.exists(socket_path):
+        if socket_is_live(socket_path):
+            print(f"[ERROR] Server already running on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+
+    server = FormatServer(socket_path)
+    server.timeout = 1.0
+    print(f"[OK] Format server listening on {socket_path}", file=sys.stderr)
+
+    restart = False
+    try:
+        while server.running:
+            server.handle_request()
+            if idle_timeout and time.monotonic() - server.last_request > idle_timeout:
+                print("[INFO] Idle timeout reached, exiting", file=sys.stderr)
+                break
+            if file_stamp(os.path.abspath(__file__)) != server.own_stamp:
+                print("[INFO] format_server.py changed, restarting", file=sys.stderr)
+                restart = True
+                break
+    finally:
+        server.server_close()
+        server.prettier.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+
+    if restart:
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve black/prettier formatting over a Unix socket"
+    )
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Socket path")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=float(os.environ.get("FORMAT_SERVER_IDLE_TIMEOUT", "0")),
+        help="Exit after this many idle seconds (0 = never)",
+    )
+    parser.add_argument("--stop", action="store_true", help="Stop a running server")
+    parser.add_argument(
+        "--status", action="store_true", help="Report whether the server is running"
+    )
+    args = parser.parse_args()
+
+    if args.stop or args.status:
+        try:
+            send_command(args.socket, "stop" if args.stop else "ping")
+        except OSError:
+            print(f"[INFO] No server running on {args.socket}", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"[OK] Server {'stopped' if args.stop else 'running'} on {args.socket}",
+            file=sys.stderr,
+        )
+        return
+
+    serve(args.socket, args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,121 @@ command_exists() {
     command -v "$1" >/dev/null 2>&1
 }
 
+# Content-hash skip cache: one marker file per (formatter, formatter binary,
+# config files, content) that is known to be formatted already, so a clean
+# file costs one hash instead of a formatter run
+FORMAT_CACHE="${FORMAT_CACHE:-true}"
+FORMAT_CACHE_DIR="${FORMAT_CACHE_DIR:-${CLAUDE_PROJECT_DIR:-$PWD}/.claude/format_cache}"
+FORMAT_CACHE_MAX_ENTRIES="${FORMAT_CACHE_MAX_ENTRIES:-2000}"
+FORMAT_CACHE_EVICT_EVERY="${FORMAT_CACHE_EVICT_EVERY:-50}"
+# Files formatters read their settings from (package.json: its "prettier" key)
+FORMAT_CONFIG_FILES=".clang-format _clang-format \
+pyproject.toml setup.cfg tox.ini \
+package.json .prettierrc .prettierrc.json .prettierrc.json5 .prettierrc.yaml .prettierrc.yml .prettierrc.toml \
+.prettierrc.js .prettierrc.cjs .prettierrc.mjs .prettierrc.ts \
+prettier.config.js prettier.config.cjs prettier.config.mjs prettier.config.ts .prettierignore \
+.editorconfig rustfmt.toml .rustfmt.toml"
+cached_count=0
+config_dir=""
+config_stamp=""
+
+hash_stdin() {
+    if command_exists sha256sum; then
+        sha256sum | cut -d' ' -f1
+    else
+        shasum -a 256 | cut -d' ' -f1
+    fi
+}
+
+# Size and mtime of files (GNU stat, then BSD stat)
+file_stamps() {
+    stat -c '%n %s %Y' "$@" 2>/dev/null || stat -f '%N %z %m' "$@" 2>/dev/null
+}
+
+# Formatter formatting.sh would use for a file (empty if none is installed)
+formatter_for() {
+    case "$1" in
+        *.cpp|*.cc|*.c|*.h|*.hpp|*.cxx) command_exists clang-format && echo clang-format ;;
+        *.py) command_exists black && echo black ;;
+        *.js|*.jsx|*.ts|*.tsx|*.yaml|*.yml) command_exists prettier && echo prettier ;;
+        *.json)
+            if command_exists jq; then echo jq
+            elif command_exists prettier; then echo prettier
+            fi ;;
+        *.md) command_exists prettier && echo prettier-prose ;;
+        *.sh|*.bash) command_exists shfmt && echo shfmt ;;
+        *.go) command_exists gofmt && echo gofmt ;;
+        *.rs) command_exists rustfmt && echo rustfmt ;;
+        *.xml) command_exists xmllint && echo xmllint ;;
+    esac
+}
+
+# Stamps of the config files a formatter may read for a file in directory
+# $1: every FORMAT_CONFIG_FILES name found there or in a parent directory
+config_stamps() {
+    local dir=$1 existing=() f
+    while :; do
+        for f in $FORMAT_CONFIG_FILES; do [ -f "$dir/$f" ] && existing+=("$dir/$f"); done
+        [ "$dir" = "/" ] && break
+        dir=${dir%/*}
+        dir=${dir:-/}
+    done
+    echo "config:${#existing[@]}"
+    [ ${#existing[@]} -gt 0 ] && file_stamps "${existing[@]}"
+}
+
+# Cache key of a file's current content for a formatter
+cache_key() {
+    local formatter=$1 file=$2 binary dir
+    binary=$(command -v "${formatter%-prose}")
+    case "$file" in
+        /*) dir=${file%/*} ;;
+        */*) dir=$PWD/${file%/*} ;;
+        *) dir=$PWD ;;
+    esac
+    dir=${dir:-/}
+    if [ "$dir" != "$config_dir" ]; then
+        # Config files are stat'ed once per directory and run
+        config_dir=$dir
+        config_stamp=$(config_stamps "$dir")
+    fi
+    {
+        echo "$formatter $(file_stamps "$binary")"
+        echo "$config_stamp"
+        cat "$file"
+    } | hash_stdin
+}
+
+# Markers are touched on every hit, so eviction by mtime drops the least
+# recently used ones. The directory is only listed every
+# FORMAT_CACHE_EVICT_EVERY stores (counted in .stores), not on every format.
+cache_store() {
+    local key=$1 stores=0
+    mkdir -p "$FORMAT_CACHE_DIR" 2>/dev/null || return
+    : > "$FORMAT_CACHE_DIR/$key"
+    read -r stores 2>/dev/null < "$FORMAT_CACHE_DIR/.stores"
+    stores=$(( ${stores:-0} + 1 ))
+    if [ "$stores" -lt "$FORMAT_CACHE_EVICT_EVERY" ]; then
+        echo "$stores" > "$FORMAT_CACHE_DIR/.stores"
+        return
+    fi
+    echo 0 > "$FORMAT_CACHE_DIR/.stores"
+    if [ "$(ls "$FORMAT_CACHE_DIR" | wc -l)" -gt "$FORMAT_CACHE_MAX_ENTRIES" ]; then
+        (cd "$FORMAT_CACHE_DIR" && ls -t | tail -n +$((FORMAT_CACHE_MAX_ENTRIES + 1)) | xargs rm -f)
+    fi
+}
+
+# Replace file with formatted output only when it differs, so unchanged
+# files keep their mtime (watchers and build caches are not invalidated)
+replace_if_changed() {
+    local file=$1 formatted=$2
+    if cmp -s "$file" "$formatted"; then
+        rm -f "$formatted"
+    else
+        cat "$formatted" > "$file" && rm -f "$formatted"
+    fi
+}
+
 # Process each file
 for file in $CLAUDE_FILE_PATHS; do
     if [ ! -f "$file" ]; then
@@ -25,6 +140,19 @@ for file in $CLAUDE_FILE_PATHS; do
     fi
     
     echo -n "Formatting $file... "
+
+    formatter=""
+    [ "$FORMAT_CACHE" = "true" ] && formatter=$(formatter_for "$file")
+    if [ -n "$formatter" ]; then
+        key=$(cache_key "$formatter" "$file")
+        if [ -f "$FORMAT_CACHE_DIR/$key" ]; then
+            touch "$FORMAT_CACHE_DIR/$key"  # Recently used: kept by eviction
+            echo -e "${GREEN}[OK] already formatted (cached)${NC}"
+            ((cached_count++))
+            continue
+        fi
+    fi
+    before_count=$formatted_count
     
     case "$file" in
         *.cpp|*.cc|*.c|*.h|*.hpp|*.cxx)
@@ -84,7 +212,7 @@ for file in $CLAUDE_FILE_PATHS; do
         *.json)
             # JSON files - use jq if available
             if command_exists jq; then
-                jq . "$file" > "$file.tmp" 2>/dev/null && mv "$file.tmp" "$file"
+                jq . "$file" > "$file.tmp" 2>/dev/null && replace_if_changed "$file" "$file.tmp" || { rm -f "$file.tmp"; false; }
                 if [ $? -eq 0 ]; then
                     echo -e "${GREEN}[OK] JSON${NC}"
                     ((formatted_count++))
@@ -189,7 +317,7 @@ for file in $CLAUDE_FILE_PATHS; do
         *.xml)
             # XML files - use xmllint
             if command_exists xmllint; then
-                xmllint --format "$file" --output "$file" 2>/dev/null
+                xmllint --format "$file" --output "$file.tmp" 2>/dev/null && replace_if_changed "$file" "$file.tmp" || { rm -f "$file.tmp"; false; }
                 if [ $? -eq 0 ]; then
                     echo -e "${GREEN}[OK] XML${NC}"
                     ((formatted_count++))
@@ -206,11 +334,19 @@ for file in $CLAUDE_FILE_PATHS; do
             echo -e "${YELLOW}[WARNING] No formatter configured${NC}"
             ;;
     esac
+
+    # Remember the formatted content
+    if [ -n "$formatter" ] && [ "$formatted_count" -gt "$before_count" ]; then
+        cache_store "$(cache_key "$formatter" "$file")"
+    fi
 done
 
 # Summary
 echo ""
 echo -e "${GREEN}Formatting complete:${NC} $formatted_count files formatted successfully"
+if [ $cached_count -gt 0 ]; then
+    echo -e "${GREEN}Skipped:${NC} $cached_count files already formatted (cache)"
+fi
 if [ $error_count -gt 0 ]; then
     echo -e "${RED}Errors:${NC} $error_count files failed to format"
 fi
\ No newline at end of file
@@ -5,6 +5,49 @@
 # Get the directory where this script is located
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 
+# Optional latency telemetry (HOOK_TELEMETRY=true, see hook_telemetry.py)
+TELEMETRY="${HOOK_TELEMETRY:-false}"
+
+# Wall clock in seconds with sub-second resolution; bash < 5 (stock macOS)
+# has no EPOCHREALTIME and `date +%s` only counts whole seconds
+now() {
+    if [ -n "$EPOCHREALTIME" ]; then
+        echo "$EPOCHREALTIME"
+    else
+        python3 -c 'import time; print(time.time())'
+    fi
+}
+
+[ "$TELEMETRY" = "true" ] && started=$(now)
+
+# Exit with a status, logging the call first when telemetry is on
+finish() {
+    if [ "$TELEMETRY" = "true" ]; then
+        local wall_ms cpu_ms times_file tool_name=""
+        wall_ms=$(awk -v a="$started" -v b="$(now)" 'BEGIN { printf "%.3f", (b - a) * 1000 }')
+        # `times` (user/system time of this shell, then of its children) must
+        # run in this shell, not in a command substitution
+        times_file=$(mktemp)
+        times > "$times_file"
+        cpu_ms=$(awk '{ for (i = 1; i <= NF; i++) { split($i, t, "m"); sub("s", "", t[2]); s += t[1] * 60 + t[2] } } END { printf "%.3f", s * 1000 }' "$times_file")
+        rm -f "$times_file"
+        if command -v jq >/dev/null 2>&1; then
+            tool_name=$(echo "$json_data" | jq -r '.tool_name // empty')
+        fi
+        python3 "$SCRIPT_DIR/hook_telemetry.py" record --hook formatting_hook \
+            --tool "$tool_name" --bytes "${#json_data}" \
+            --wall-ms "$wall_ms" --cpu-ms "$cpu_ms" --exit "$1"
+    fi
+    exit "$1"
+}
+
+# Run formatting.sh on CLAUDE_FILE_PATHS (exec unless its time is logged)
+run_formatting() {
+    [ "$TELEMETRY" = "true" ] || exec "$SCRIPT_DIR/formatting.sh"
+    "$SCRIPT_DIR/formatting.sh"
+    finish $?
+}
+
 # Read JSON from stdin
 if [ -t 0 ]; then
     # No stdin data, check environment variable
@@ -26,12 +69,21 @@ else
         file_path=$(echo "$json_data" | grep -o '"file_path"[[:space:]]*:[[:space:]]*"[^"]*"' | cut -d'"' -f4)
     fi
     
+    if [ -n "$file_path" ] && [ "${FORMAT_SERVER:-false}" = "true" ]; then
+        # Try the long-lived format server first; it prints the files it
+        # could not handle, and fails when unreachable (use formatting.sh)
+        if remaining=$(python3 "$SCRIPT_DIR/format_client.py" "$file_path"); then
+            [ -z "$remaining" ] && finish 0
+            file_path="$remaining"
+        fi
+    fi
+
     if [ -n "$file_path" ]; then
         # Set environment variable and run formatting script
         export CLAUDE_FILE_PATHS="$file_path"
-        exec "$SCRIPT_DIR/formatting.sh"
+        run_formatting
     else
         echo "No file path found in JSON" >&2
-        exit 0
+        finish 0
     fi
 fi
\ No newline at end of file
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Claude Code PreToolUse Hook - Thin client for hook_daemon.py
+Forwards the payload to the hook daemon and replays its output; falls back
+to running dispatch_hook.py in-process when the daemon is not reachable
+
+Configuration in settings.json:
+{
+  "matcher": "Edit|Write|MultiEdit",
+  "hooks": [
+    {
+      "type": "command",
+      "command": "HOOK_CHECKS=chinese,filename,show /path/to/hooks/hook_client.py"
+    }
+  ]
+}
+"""
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuration
+SOCKET_PATH = os.environ.get(
+    "HOOK_DAEMON_SOCKET", os.path.expanduser("~/.claude/hook_daemon.sock")
+)
+DAEMON_TIMEOUT = float(os.environ.get("HOOK_DAEMON_TIMEOUT", "5"))
+AUTOSTART = os.environ.get("HOOK_DAEMON_AUTOSTART", "true").lower() == "true"
+
+# Environment keys that select hook configuration (mirrors hook_daemon.py)
+CONFIG_ENV_PREFIXES = ("CHECK_", "BLOCK_", "HOOK_", "CLAUDE_", "TYPO_")
+
+READ_SIZE = 1 << 20  # Bytes forwarded at a time
+# Bytes of the forwarded payload kept in memory for the fallback, then on disk
+COPY_SPOOL_SIZE = 4 << 20
+
+
+def ask_daemon(stream, copy):
+    """Forward the payload to the daemon as it is read; return its response
+
+    What was sent is also written to copy, so the payload can still be
+    evaluated in-process if the daemon fails halfway.
+    """
+    env = {k: v for k, v in os.environ.items() if k.startswith(CONFIG_ENV_PREFIXES)}
+    header = json.dumps({"env": env, "cwd": os.getcwd()}).encode() + b"\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(DAEMON_TIMEOUT)
+        sock.connect(SOCKET_PATH)
+        sock.sendall(header)
+        while True:
+            data = stream.read(READ_SIZE)
+            if not data:
+                break
+            copy.write(data)
+            sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def start_daemon():
+    """Launch the daemon in the background for subsequent calls"""
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HOOKS_DIR, "hook_daemon.py"),
+            "--socket",
+            SOCKET_PATH,
+            "--idle-timeout",
+            "3600",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def run_in_process(stream):
+    """Evaluate the payload with dispatch_hook.py in this interpreter"""
+    sys.path.insert(0, HOOKS_DIR)
+    import dispatch_hook
+
+    try:
+        payload = dispatch_hook.read_payload(stream)
+        exit_code, decision = dispatch_hook.dispatch(
+            payload, dispatch_hook.load_checks()
+        )
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if decision:
+        print(json.dumps(decision, ensure_ascii=False))
+    sys.exit(exit_code)
+
+
+def main():
+    """Main function"""
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+
+    with tempfile.SpooledTemporaryFile(COPY_SPOOL_SIZE) as copy:
+        try:
+            response = ask_daemon(sys.stdin.buffer, copy)
+        except (OSError, ValueError):
+            if AUTOSTART:
+                start_daemon()
+            # Whatever was forwarded, followed by the rest of stdin
+            shutil.copyfileobj(sys.stdin.buffer, copy)
+            copy.seek(0)
+            run_in_process(copy)
+            return
+
+    sys.stderr.write(response["stderr"])
+    sys.stdout.write(response["stdout"])
+    sys.exit(response["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Long-lived hook server for Claude Code PreToolUse checks
+Keeps the hook modules (and their compiled patterns) loaded in memory and
+evaluates payloads sent by hook_client.py over a Unix domain socket
+
+Usage: python3 hook_daemon.py [--socket PATH] [--idle-timeout SECONDS]
+       python3 hook_daemon.py --stop
+
+Request:  one JSON header line {"env": {...}, "cwd": "..."} followed by the
+          raw hook payload, then the client shuts down its write side
+Response: {"exit_code": int, "stdout": str, "stderr": str}
+"""
+import argparse
+import collections.abc
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import time
+import traceback
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HOOKS_DIR)
+
+import dispatch_hook  # noqa: E402
+from server_support import file_stamp, send_command, socket_is_live  # noqa: E402
+
+DEFAULT_SOCKET = os.path.expanduser("~/.claude/hook_daemon.sock")
+SOCKET_PATH = os.environ.get("HOOK_DAEMON_SOCKET", DEFAULT_SOCKET)
+
+# Environment keys that select hook configuration (mirrors hook_client.py)
+CONFIG_ENV_PREFIXES = ("CHECK_", "BLOCK_", "HOOK_", "CLAUDE_", "TYPO_")
+
+# Loaded check sets kept at once; the least recently used one is dropped
+MAX_CONTEXTS = int(os.environ.get("HOOK_DAEMON_MAX_CONTEXTS", "8"))
+
+# Helper modules imported by the checks and the dispatcher; reloaded with them
+SHARED_MODULES = (
+    "hook_payload",
+    "verdict_cache",
+    "hook_telemetry",
+    "path_ignore",
+    "rule_packs",
+    "typo_index",
+    "typo_vocabulary",
+)
+
+
+@contextlib.contextmanager
+def patched_environ(env):
+    """Temporarily replace the hook configuration variables in os.environ"""
+    saved = {k: v for k, v in os.environ.items() if k.startswith(CONFIG_ENV_PREFIXES)}
+    for key in saved:
+        del os.environ[key]
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key in [k for k in os.environ if k.startswith(CONFIG_ENV_PREFIXES)]:
+            del os.environ[key]
+        os.environ.update(saved)
+
+
+class RecordingEnviron(collections.abc.MutableMapping):
+    """os.environ stand-in noting which variables are read
+
+    listed is set when the variables are iterated, i.e. any of them may
+    matter.
+    """
+
+    def __init__(self, environ):
+        self.environ = environ
+        self.read = set()
+        self.listed = False
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return self.environ[key]
+
+    def __setitem__(self, key, value):
+        self.environ[key] = value
+
+    def __delitem__(self, key):
+        del self.environ[key]
+
+    def __iter__(self):
+        self.listed = True
+        return iter(self.environ)
+
+    def __len__(self):
+        return len(self.environ)
+
+
+@contextlib.contextmanager
+def recorded_environ():
+    """Record the variables read through os.environ (and os.getenv)"""
+    recording = RecordingEnviron(os.environ)
+    os.environ = recording
+    try:
+        yield recording
+    finally:
+        os.environ = recording.environ
+
+
+class CheckContext:
+    """Loaded checks for one distinct hook configuration
+
+    env_keys names the forwarded variables read while loading (None: any
+    may matter); only those select a context, so per-session CLAUDE_*
+    values the checks ignore do not load the checks again.
+    """
+
+    def __init__(self, env):
+        with patched_environ(env), recorded_environ() as recording:
+            names = dispatch_hook.parse_check_names(
+                env.get("HOOK_CHECKS", dispatch_hook.DEFAULT_CHECKS)
+            )
+            self.checks = dispatch_hook.load_checks(names)
+
+            # Config files depend on the client's CLAUDE_PROJECT_DIR (and cwd)
+            paths = [
+                sys.modules[n].__file__ for n in SHARED_MODULES if n in sys.modules
+            ]
+            for _, _, module in self.checks:
+                paths.append(module.__file__)
+                if hasattr(module, "config_files"):
+                    paths.extend(module.config_files())
+        self.watched = {path: file_stamp(path) for path in paths}
+        if recording.listed:
+            self.env_keys = None
+        else:
+            self.env_keys = {
+                k for k in recording.read if k.startswith(CONFIG_ENV_PREFIXES)
+            }
+            self.env_keys.add("HOOK_CHECKS")
+
+    def is_stale(self):
+        """Check whether any hook source or config file changed since loading"""
+        return any(file_stamp(p) != stamp for p, stamp in self.watched.items())
+
+
+class HookServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path):
+        super().__init__(socket_path, HookRequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.contexts = collections.OrderedDict()  # Least recently used first
+        # Variables that select a context: union of the contexts' env_keys
+        self.key_vars = {"HOOK_CHECKS"}
+        self.running = True
+        self.last_request = time.monotonic()
+        self.dispatcher_stamp = file_stamp(dispatch_hook.__file__)
+        self.own_stamp = file_stamp(os.path.abspath(__file__))
+
+    def context_key(self, env):
+        """Key of the context serving env"""
+        if self.key_vars is None:
+            return tuple(sorted(env.items()))
+        return tuple((k, env.get(k)) for k in sorted(self.key_vars))
+
+    def get_context(self, env):
+        """Return loaded checks for env, reloading when sources changed"""
+        global dispatch_hook
+
+        stamp = file_stamp(dispatch_hook.__file__)
+        if stamp != self.dispatcher_stamp:
+            import importlib
+
+            dispatch_hook = importlib.reload(dispatch_hook)
+            self.dispatcher_stamp = stamp
+            self.contexts.clear()
+            print("[INFO] dispatch_hook.py changed, reloaded", file=sys.stderr)
+
+        key = self.context_key(env)
+        context = self.contexts.get(key)
+        if context is None or context.is_stale():
+            if context is not None:
+                # Re-import shared helpers along with the checks using them
+                for name in SHARED_MODULES:
+                    sys.modules.pop(name, None)
+            context = CheckContext(env)
+            if self.key_vars is not None and (
+                context.env_keys is None or not context.env_keys <= self.key_vars
+            ):
+                # Keys of the loaded contexts lack the new variables
+                if context.env_keys is None:
+                    self.key_vars = None
+                else:
+                    self.key_vars |= context.env_keys
+                self.contexts.clear()
+                key = self.context_key(env)
+            self.contexts[key] = context
+        self.contexts.move_to_end(key)
+        while len(self.contexts) > MAX_CONTEXTS:
+            self.contexts.popitem(last=False)
+        return context
+
+    def evaluate(self, header, stream):
+        """Run the checks for one request and capture their output
+
+        The payload is parsed from the socket as it arrives, like
+        dispatch_hook.py does from stdin.
+        """
+        env = header.get("env", {})
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = 0
+
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            cwd = os.getcwd()
+            try:
+                os.chdir(header.get("cwd") or cwd)
+                context = self.get_context(env)
+                with patched_environ(env):
+                    import hook_payload
+
+                    payload = hook_payload.read_payload(stream)
+                    exit_code, decision = dispatch_hook.dispatch(
+                        payload, context.checks
+                    )
+                if decision:
+                    print(json.dumps(decision, ensure_ascii=False))
+            except json.JSONDecodeError as e:
+                print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+                exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os.chdir(cwd)
+
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.last_request = time.monotonic()
+        header = json.loads(self.rfile.readline() or b"{}")
+
+        command = header.get("command")
+        if command == "stop":
+            self.server.running = False
+            response = {"exit_code": 0, "stdout": "", "stderr": "stopping\n"}
+        elif command == "ping":
+            response = {"exit_code": 0, "stdout": "", "stderr": "pong\n"}
+        else:
+            response = self.server.evaluate(header, self.rfile)
+
+        self.wfile.write(json.dumps(response).encode())
+
+
+def serve(socket_path, idle_timeout=0):
+    """Run the daemon until stopped, idle for too long, or its source changes"""
+    if os.path.exists(socket_path):
+        if socket_is_live(socket_path):
+            print(f"[ERROR] Daemon already running on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+
+    server = HookServer(socket_path)
+    server.timeout = 1.0
+    print(f"[OK] Hook daemon listening on {socket_path}", file=sys.stderr)
+
+    restart = False
+    try:
+        while server.running:
+            server.handle_request()
+            if idle_timeout and time.monotonic() - server.last_request > idle_timeout:
+                print("[INFO] Idle timeout reached, exiting", file=sys.stderr)
+                break
+            if file_stamp(os.path.abspath(__file__)) != server.own_stamp:
+                print("[INFO] hook_daemon.py changed, restarting", file=sys.stderr)
+                restart = True
+                break
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+
+    if restart:
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve Claude Code PreToolUse checks over a Unix socket"
+    )
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Socket path")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=float(os.environ.get("HOOK_DAEMON_IDLE_TIMEOUT", "0")),
+        help="Exit after this many idle seconds (0 = never)",
+    )
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    parser.add_argument(
+        "--status", action="store_true", help="Report whether the daemon is running"
+    )
+    args = parser.parse_args()
+
+    if args.stop or args.status:
+        try:
+            send_command(args.socket, "stop" if args.stop else "ping")
+        except OSError:
+            print(f"[INFO] No daemon running on {args.socket}", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"[OK] Daemon {'stopped' if args.stop else 'running'} on {args.socket}",
+            file=sys.stderr,
+        )
+        return
+
+    serve(args.socket, args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+Shared helpers for reading Claude Code PreToolUse payloads
+
+Content hooks only need to look at the text a tool call adds: the whole
+content for Write, and for Edit/MultiEdit the replacement text minus the
+lines it shares with the text being replaced.
+
+read_payload() parses a payload incrementally from a binary stream and
+stops at tool_input.content, the only member that grows with the file
+being written. Path checks decide from the members around it without
+decoding it (rest() only scans for its end), and content checks read it
+as decoded chunks (added_chunks(), collect_text()) instead of holding the
+raw bytes, the decoded payload and their own copies at once. Chunks that
+must be read again (by a later check, or once a check finds it needs the
+full text) are spooled to a temporary file (ContentSpool), not kept in
+memory.
+"""
+import json
+
+READ_SIZE = 1 << 20  # Bytes read from the stream at a time
+SPOOL_SIZE = 4 << 20  # Bytes a ContentSpool keeps in memory before using disk
+OVERLAP = 256  # Characters of the previous chunk collect_text() re-tests
+WHITESPACE = frozenset(b" \t\n\r")
+TOKEN_END = frozenset(b" \t\n\r,]}")
+# The streamed member: tool_input.content
+STREAMED = ("tool_input", "content")
+
+
+def edit_added_text(edit):
+    """Return the lines an Edit (or one MultiEdit edit) adds
+
+    Lines shared at the start and end of old and new text are unchanged
+    context and are trimmed. Both Edit key spellings are accepted.
+    """
+    old = edit.get("old_string") or edit.get("old_str") or ""
+    new = edit.get("new_string") or edit.get("new_str") or ""
+    if not old or not new:
+        return new
+
+    old_lines = old.split("\n")
+    new_lines = new.split("\n")
+    limit = min(len(old_lines), len(new_lines))
+
+    start = 0
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old_lines[-1 - end] == new_lines[-1 - end]:
+        end += 1
+
+    return "\n".join(new_lines[start : len(new_lines) - end])
+
+
+def added_text(tool_input):
+    """Return the text a Write, Edit or MultiEdit payload adds to the file"""
+    if tool_input.get("content"):
+        return tool_input["content"]
+
+    if "edits" in tool_input:
+        parts = (edit_added_text(edit) for edit in tool_input.get("edits") or [])
+        return "\n".join(part for part in parts if part)
+
+    return edit_added_text(tool_input)
+
+
+class StreamingPayload:
+    """A hook payload parsed from a binary stream as far as needed
+
+    data holds every member read so far: all of them, except that parsing
+    stops at the start of tool_input.content and continues after it once
+    the content has been read (content_chunks()) or skipped (rest()).
+    tool_name and file_path normally come before the content; use need()
+    when a check must see a member that might come after it.
+    Malformed input raises json.JSONDecodeError, possibly only while the
+    content or the members after it are read.
+    """
+
+    def __init__(self, stream, read_size=READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.buf = b""
+        self.pos = 0
+        self.bytes_read = 0
+        self.data = {}
+        self.pending = False  # Stopped at the content string
+        self.buffered = None  # Content chunks read ahead by need()
+        # Objects left open at the content: [object, path, after_a_member]
+        self.frames = []
+        if self._skip_ws() != ord("{"):
+            self._error("Expecting '{'")
+        self.pos += 1
+        if self._object(self.data, ()):
+            self._finish()
+
+    @property
+    def has_content(self):
+        """True while tool_input.content is still to be read"""
+        return self.pending or self.buffered is not None
+
+    def need(self, *names):
+        """Make sure the named members ("tool_input.file_path") are in data
+
+        When one is missing, it may follow the content: the content is then
+        read ahead into memory and content_chunks() replays it.
+        """
+        if not self.pending:
+            return
+        for name in names:
+            obj = self.data
+            for key in name.split("."):
+                if not isinstance(obj, dict) or key not in obj:
+                    self.buffered = list(self.content_chunks())
+                    return
+                obj = obj[key]
+
+    def content_chunks(self):
+        """Yield tool_input.content as decoded str chunks, then parse the rest"""
+        if self.buffered is not None:
+            chunks, self.buffered = self.buffered, None
+            yield from chunks
+            return
+        if not self.pending:
+            return
+        segments = self._raw_string()
+        try:
+            for segment in segments:
+                if segment:
+                    yield self._decode(segment)
+        except GeneratorExit:
+            self._skip_content(segments)  # Closed early: skip the rest of it
+            raise
+        self._skip_content(segments)
+
+    def rest(self):
+        """Skip the content without decoding it; return the other members"""
+        self.buffered = None
+        if self.pending:
+            self._skip_content(self._raw_string())
+        return self.data
+
+    def load(self):
+        """The whole payload, content included, as json.loads() returns it"""
+        if self.has_content:
+            content = "".join(self.content_chunks())
+            self.data["tool_input"]["content"] = content
+        return self.data
+
+    # Parsing
+
+    def _error(self, message):
+        offset = self.bytes_read - len(self.buf) + self.pos
+        raise json.JSONDecodeError(message, "", offset)
+
+    def _fill(self):
+        """Read more input; False at the end of the stream"""
+        data = self.stream.read(self.read_size)
+        if not data:
+            return False
+        self.bytes_read += len(data)
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def _skip_ws(self):
+        """The next byte that is not whitespace (not consumed), -1 at the end"""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return -1
+
+    def _skip_content(self, segments):
+        """Read the content string to its end, then parse what follows it"""
+        for _ in segments:
+            pass
+        self.pending = False
+        self._resume()
+
+    def _finish(self):
+        if self._skip_ws() != -1:
+            self._error("Extra data")
+
+    def _resume(self):
+        """Continue parsing the objects left open at the content"""
+        while self.frames:
+            if not self._members(self.frames[-1]):
+                return
+            self.frames.pop()
+        self._finish()
+
+    def _object(self, obj, path):
+        """Parse the members after '{'; False when stopped at the content"""
+        frame = [obj, path, False]
+        self.frames.append(frame)
+        if not self._members(frame):
+            return False
+        self.frames.pop()
+        return True
+
+    def _members(self, frame):
+        obj, path = frame[0], frame[1]
+        while True:
+            c = self._skip_ws()
+            if c == ord("}"):
+                self.pos += 1
+                return True
+            if frame[2]:
+                if c != ord(","):
+                    self._error("Expecting ',' delimiter")
+                self.pos += 1
+                c = self._skip_ws()
+            if c != ord('"'):
+                self._error("Expecting property name enclosed in double quotes")
+            self.pos += 1
+            key = self._decode(b"".join(self._raw_string()))
+            if self._skip_ws() != ord(":"):
+                self._error("Expecting ':' delimiter")
+            self.pos += 1
+            c = self._skip_ws()
+            frame[2] = True
+            member = None if path is None else path + (key,)
+            if member == STREAMED and c == ord('"'):
+                self.pos += 1
+                self.pending = True
+                return False
+            if member == STREAMED[: len(member or ())] and c == ord("{"):
+                self.pos += 1
+                obj[key] = {}
+                if not self._object(obj[key], member):
+                    return False
+            else:
+                obj[key] = self._value()
+
+    def _value(self):
+        """Parse any value in full (nothing inside it is streamed)"""
+        c = self._skip_ws()
+        if c == ord('"'):
+            self.pos += 1
+            return self._decode(b"".join(self._raw_string()))
+        if c == ord("{"):
+            self.pos += 1
+            obj = {}
+            self._members([obj, None, False])
+            return obj
+        if c == ord("["):
+            self.pos += 1
+            items = []
+            if self._skip_ws() == ord("]"):
+                self.pos += 1
+                return items
+            while True:
+                items.append(self._value())
+                c = self._skip_ws()
+                self.pos += 1
+                if c == ord("]"):
+                    return items
+                if c != ord(","):
+                    self.pos -= 1
+                    self._error("Expecting ',' delimiter")
+        if c == -1:
+            self._error("Expecting value")
+        # A number or a literal: let json decode the token
+        end = self.pos
+        while True:
+            buf = self.buf
+            while end < len(buf) and buf[end] not in TOKEN_END:
+                end += 1
+            scanned = end - self.pos
+            if end < len(buf) or not self._fill():
+                break
+            end = self.pos + scanned
+        token = self.buf[self.pos : end]
+        try:
+            value = json.loads(token)
+        except json.JSONDecodeError:
+            self._error("Expecting value")
+        self.pos = end
+        return value
+
+    def _raw_string(self):
+        """Yield the raw bytes of a string up to its closing quote
+
+        Pieces never end inside an escape, a surrogate pair or a UTF-8
+        sequence, so each one decodes on its own.
+        """
+        while True:
+            buf, pos = self.buf, self.pos
+            end = buf.find(b'"', pos)
+            if end > pos and buf[end - 1] == 0x5C:
+                # Maybe escaped: mask escaped backslashes and quotes, look again
+                masked = buf[pos:].replace(b"\\\\", b"__").replace(b'\\"', b"__")
+                end = masked.find(b'"')
+                if end != -1:
+                    end += pos
+            if end != -1:
+                self.pos = end + 1
+                yield buf[pos:end]
+                return
+            cut = safe_cut(buf, pos)
+            self.pos = cut
+            yield buf[pos:cut]
+            if not self._fill():
+                self._error("Unterminated string")
+
+    def _decode(self, raw):
+        try:
+            if b"\\" not in raw:
+                return raw.decode("utf-8", "surrogatepass")  # As json.loads()
+            return json.loads(b'"' + raw + b'"')
+        except UnicodeDecodeError as e:
+            self._error(f"Invalid UTF-8 in string: {e.reason}")
+        except json.JSONDecodeError as e:
+            self._error(e.msg)
+
+
+def safe_cut(buf, start):
+    """Index in buf (from start) where a string piece can end and decode alone"""
+    cut = len(buf)
+    # Back off an incomplete UTF-8 sequence
+    back = cut
+    while back > start and cut - back < 3 and buf[back - 1] & 0xC0 == 0x80:
+        back -= 1
+    if back > start and buf[back - 1] >= 0xC0:
+        cut = back - 1
+    # Back off an escape that may be incomplete: stop before the first
+    # backslash run among the last 12 bytes (two \uXXXX escapes)
+    first = buf.find(b"\\", max(start, cut - 12), cut)
+    if first != -1:
+        cut = escape_start(buf, start, first)
+        # Keep a high surrogate escape with the low one that follows it
+        if (
+            cut - start >= 6
+            and buf[cut - 6 : cut - 4] == b"\\u"
+            and buf[cut - 4] in b"dD"
+            and buf[cut - 3] in b"89abAB"
+        ):
+            run = escape_start(buf, start, cut - 6)
+            if (cut - 6 - run) % 2 == 0:  # An odd run: the last \ escapes u
+                cut = run
+    return cut
+
+
+def escape_start(buf, start, index):
+    """Start of the run of backslashes that buf[index] is part of"""
+    while index > start and buf[index - 1] == 0x5C:
+        index -= 1
+    return index
+
+
+def read_payload(stream):
+    """Start parsing a payload from a binary stream (see StreamingPayload)"""
+    return StreamingPayload(stream)
+
+
+def added_chunks(payload):
+    """Yield the text a StreamingPayload adds, streaming Write content"""
+    empty = True
+    chunks = payload.content_chunks()
+    try:
+        for chunk in chunks:
+            empty = False
+            yield chunk
+    finally:
+        chunks.close()  # Closed early: the payload skips the rest of it
+    if not empty:
+        return
+    # No Write content (or an empty one): the Edit/MultiEdit fields decide
+    text = added_text(payload.data.get("tool_input") or {})
+    if text:
+        yield text
+
+
+class ContentSpool:
+    """Text chunks read once from a source and replayed to every reader
+
+    The first reader pulls the chunks from the source; each is written to
+    a SpooledTemporaryFile (in memory up to SPOOL_SIZE bytes, then on disk)
+    as it passes, so later readers get the same chunks without the text
+    ever being held whole. A reader that stops early leaves the rest in the
+    source for the next one. on_read, when set, is called once as the next
+    reader takes its first chunk.
+    """
+
+    def __init__(self, chunks):
+        # Deferred: only a payload that content checks read needs a spool
+        import hashlib
+        import tempfile
+
+        self.source = iter(chunks)
+        self.file = tempfile.SpooledTemporaryFile(SPOOL_SIZE)
+        self.spans = []  # (offset, length) of each spooled chunk
+        self.size = 0
+        self.complete = False
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.on_read = None
+
+    def __iter__(self):
+        on_read, self.on_read = self.on_read, None
+        if on_read:
+            on_read()
+        index = 0
+        while True:
+            if index < len(self.spans):
+                offset, length = self.spans[index]
+                self.file.seek(offset)
+                yield self.file.read(length).decode("utf-8", "surrogatepass")
+            elif self.complete:
+                return
+            else:
+                chunk = self._pull()
+                if chunk is None:
+                    return
+                yield chunk
+            index += 1
+
+    def _pull(self):
+        """Read and spool the next chunk of the source; None at its end"""
+        chunk = next(self.source, None)
+        if chunk is None:
+            self.complete = True
+            return None
+        raw = chunk.encode("utf-8", "surrogatepass")
+        self.file.seek(self.size)
+        self.file.write(raw)
+        self.spans.append((self.size, len(raw)))
+        self.size += len(raw)
+        self.hash.update(raw)
+        return chunk
+
+    def digest(self):
+        """Digest of the whole text (reads the rest of the source)"""
+        while not self.complete:
+            self._pull()
+        return self.hash.hexdigest()
+
+    def close(self):
+        """Drop the spool and close the source (a payload then skips the rest)"""
+        close = getattr(self.source, "close", None)
+        if close:
+            close()
+        self.file.close()
+
+
+def collect_text(chunks, matches):
+    """Join text chunks if matches() holds for any of them
+
+    Returns None when there was text but matches() rejected every chunk,
+    so a check can pass a large payload without building the whole string.
+    Until a chunk matches, chunks are only spooled to disk (ContentSpool).
+    Each chunk is tested with the end of the previous one prepended, which
+    finds patterns up to OVERLAP characters long across chunk boundaries.
+    """
+    spool = chunks if isinstance(chunks, ContentSpool) else ContentSpool(chunks)
+    try:
+        empty = True
+        tail = ""
+        for chunk in spool:
+            empty = False
+            if matches(tail + chunk):
+                return "".join(spool)
+            tail = chunk[-OVERLAP:]
+        return "" if empty else None
+    finally:
+        if spool is not chunks:
+            spool.close()
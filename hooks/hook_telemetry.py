@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Per-hook latency telemetry
+
+With HOOK_TELEMETRY=true every hook appends one compact JSON line per call
+to ~/.claude/hook_telemetry.jsonl (HOOK_TELEMETRY_LOG):
+
+  {"ts": ..., "hook": "check_chinese_hook", "tool": "Write", "bytes": 1834,
+   "wall_ms": 0.41, "cpu_ms": 0.40, "exit": 2, "decision": "block"}
+
+wall_ms and cpu_ms cover the hook's own work, from reading the payload to
+its decision (formatting_hook.sh: the whole script, formatters included).
+The log is rotated to <log>.1 once it exceeds HOOK_TELEMETRY_MAX_BYTES
+(default 1 MiB), so at most about twice that is kept on disk.
+
+Usage: python3 hook_telemetry.py stats [--log PATH] [--by hook|tool|both]
+       python3 hook_telemetry.py record --hook NAME ... (for shell hooks)
+"""
+import json
+import os
+import sys
+import time
+
+DEFAULT_LOG = os.path.expanduser("~/.claude/hook_telemetry.jsonl")
+DEFAULT_MAX_BYTES = 1 << 20
+PERCENTILES = (50, 95, 99)
+
+
+def enabled():
+    """Read per call, so hook_daemon.py follows each client's environment"""
+    return os.environ.get("HOOK_TELEMETRY", "false").lower() == "true"
+
+
+def log_path():
+    return os.environ.get("HOOK_TELEMETRY_LOG") or DEFAULT_LOG
+
+
+def start():
+    """Mark the start of a hook call: (wall, cpu) clocks"""
+    return time.perf_counter(), time.process_time()
+
+
+def decision_label(exit_code, decision):
+    if decision and decision.get("decision") == "block":
+        return "block"
+    return {0: "allow", 2: "block"}.get(exit_code, "error")
+
+
+def append_record(record):
+    """Append one JSON line, rotating the log when it is over the size cap"""
+    path = log_path()
+    max_bytes = int(os.environ.get("HOOK_TELEMETRY_MAX_BYTES", DEFAULT_MAX_BYTES))
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    try:
+        try:
+            if os.stat(path).st_size + len(line) > max_bytes:
+                os.replace(path, path + ".1")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One O_APPEND write per record keeps concurrent hooks from interleaving
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Telemetry must never break a hook
+
+
+def record(hook, started, data, payload_bytes, exit_code, decision):
+    """Log one hook call started at start(); a no-op unless enabled"""
+    if not enabled():
+        return
+    wall, cpu = started
+    append_record(
+        {
+            "ts": round(time.time(), 3),
+            "hook": hook,
+            "tool": (data or {}).get("tool_name", ""),
+            "bytes": payload_bytes,
+            "wall_ms": round((time.perf_counter() - wall) * 1000, 3),
+            "cpu_ms": round((time.process_time() - cpu) * 1000, 3),
+            "exit": exit_code,
+            "decision": decision_label(exit_code, decision),
+        }
+    )
+
+
+def read_records(path):
+    """Yield the records of a log and its rotated predecessor, oldest first"""
+    for name in (path + ".1", path):
+        try:
+            with open(name, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Torn line from a crash mid-write
+        except FileNotFoundError:
+            continue
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(records, by):
+    """Group wall/cpu times by the requested keys: {key: (walls, cpus)}"""
+    groups = {}
+    for rec in records:
+        if by == "hook":
+            key = rec.get("hook", "")
+        elif by == "tool":
+            key = rec.get("tool") or "-"
+        else:
+            key = f"{rec.get('hook', '')} / {rec.get('tool') or '-'}"
+        walls, cpus = groups.setdefault(key, ([], []))
+        walls.append(rec.get("wall_ms", 0.0))
+        cpus.append(rec.get("cpu_ms", 0.0))
+    return groups
+
+
+def print_stats(groups, title):
+    header = f"{title:<40} {'calls':>7}"
+    header += "".join(f" {f'p{p}':>9}" for p in PERCENTILES)
+    header += f" {'cpu p50':>9}"
+    print(header)
+    print("-" * len(header))
+    for key, (walls, cpus) in sorted(groups.items()):
+        walls.sort()
+        cpus.sort()
+        row = f"{key:<40} {len(walls):>7}"
+        row += "".join(f" {percentile(walls, p):>9.2f}" for p in PERCENTILES)
+        row += f" {percentile(cpus, 50):>9.2f}"
+        print(row)
+
+
+def run_stats(args):
+    records = list(read_records(args.log))
+    if not records:
+        print(f"[INFO] No telemetry in {args.log} (set HOOK_TELEMETRY=true)")
+        return 1
+    print(f"Wall time in ms over {len(records)} hook calls\n")
+    for by in ("hook", "tool") if args.by == "both" else (args.by,):
+        print_stats(summarize(records, by), by)
+        print()
+    return 0
+
+
+def run_record(args):
+    """Record a call measured by a shell hook"""
+    append_record(
+        {
+            "ts": round(time.time(), 3),
+            "hook": args.hook,
+            "tool": args.tool,
+            "bytes": args.bytes,
+            "wall_ms": round(args.wall_ms, 3),
+            "cpu_ms": round(args.cpu_ms, 3),
+            "exit": args.exit,
+            "decision": decision_label(args.exit, None),
+        }
+    )
+    return 0
+
+
+def main():
+    # Deferred: every hook imports this module, only the command line parses
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hook latency telemetry")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats = commands.add_parser("stats", help="Report p50/p95/p99 wall time")
+    stats.add_argument("--log", default=log_path(), help="Telemetry log path")
+    stats.add_argument(
+        "--by",
+        choices=("hook", "tool", "both"),
+        default="both",
+        help="Group by hook, by tool, or report both tables (default)",
+    )
+
+    rec = commands.add_parser("record", help="Append a record (for shell hooks)")
+    rec.add_argument("--hook", required=True)
+    rec.add_argument("--tool", default="")
+    rec.add_argument("--bytes", type=int, default=0)
+    rec.add_argument("--wall-ms", type=float, required=True)
+    rec.add_argument("--cpu-ms", type=float, default=0.0)
+    rec.add_argument("--exit", type=int, default=0)
+
+    args = parser.parse_args()
+    sys.exit(run_stats(args) if args.command == "stats" else run_record(args))
+
+
+if __name__ == "__main__":
+    main()
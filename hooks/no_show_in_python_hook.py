@@ -1,181 +1,408 @@
 #!/usr/bin/env python3
 """
-Claude Code PreToolUse Hook - Prevent .show() in Python files
-Blocks any Python file containing .show() calls to avoid blocking execution
+Claude Code PreToolUse Hook - Prevent blocking calls in Python files
+Blocks .show() and other calls that wait for a window, key press or user
+input (see BLOCKING_CALLS), since they stall unattended runs
+hook_rules files can add or remove BLOCKING_CALLS entries (rule_packs.py)
 """
+import ast
 import json
 import os
 import re
 import sys
-from pathlib import Path
+import tokenize
+
+import hook_telemetry
+import path_ignore
+import rule_packs
+from hook_payload import added_chunks, added_text, collect_text, read_payload
 
 # Configuration via environment variables
 BLOCK_ON_DETECTION = os.environ.get("BLOCK_ON_DETECTION", "true").lower() == "true"
 CHECK_TESTS_ONLY = (
     os.environ.get("CHECK_TESTS_ONLY", "false").lower() == "true"
 )  # Default: check ALL Python files
+# Comma-separated BLOCKING_CALLS entries to allow, e.g. "input"
+CHECK_ALLOWED_CALLS = os.environ.get("CHECK_ALLOWED_CALLS", "")
+
+# Calls that block execution -> why. "*.name" matches a method of any object;
+# dotted names match calls spelled that way or imported under another alias
+BLOCKING_CALLS = {
+    "*.show": "opens a window and waits for it to close",
+    "plt.pause": "runs the GUI event loop",
+    "matplotlib.pyplot.pause": "runs the GUI event loop",
+    "cv2.imshow": "opens a window",
+    "cv2.waitKey": "waits for a key press",
+    "input": "waits for user input",
+    "webbrowser.open": "opens a browser",
+    "code.interact": "starts an interactive console",
+}
+# Entries that get the savefig() suggestion
+PLOT_CALLS = {"*.show", "plt.pause", "matplotlib.pyplot.pause"}
+
+
+def compile_rules(rules):
+    """Validate merged rules: every call name needs a string reason"""
+    blocking_calls = {}
+    for name, reason in rules.get("blocking_calls", {}).items():
+        if isinstance(reason, str):
+            blocking_calls[name] = reason
+        else:
+            rule_packs.warn(f"Ignoring show.blocking_calls.{name}: expected a reason")
+    return {
+        "blocking_calls": blocking_calls,
+        "plot_calls": [name for name in rules.get("plot_calls", []) if name],
+    }
+
+
+# Merge in the user and project rule files (see rule_packs.py)
+RULES, RULES_STAMP = rule_packs.load(
+    "show",
+    {"blocking_calls": BLOCKING_CALLS, "plot_calls": sorted(PLOT_CALLS)},
+    compile_rules,
+    __file__,
+)
+BLOCKING_CALLS = RULES["blocking_calls"]
+PLOT_CALLS = set(RULES["plot_calls"])
+
+
+def build_call_index(blocking_calls, allowed):
+    """Split the table into method names and dotted call names"""
+    methods, names = {}, {}
+    for pattern in blocking_calls:
+        if pattern in allowed:
+            continue
+        if pattern.startswith("*."):
+            methods[pattern[2:]] = pattern
+        else:
+            names[pattern] = pattern
+    return methods, names
+
 
-# Pattern to detect .show() calls
-SHOW_PATTERN = re.compile(
-    r"\.show\s*\(", re.MULTILINE  # Matches .show( with optional whitespace
+BLOCKING_METHODS, BLOCKING_NAMES = build_call_index(
+    BLOCKING_CALLS, {name.strip() for name in CHECK_ALLOWED_CALLS.split(",")}
 )
 
-# Common matplotlib/plotting related .show() patterns for better error messages
-SPECIFIC_PATTERNS = [
-    (r"plt\.show\s*\(", "plt.show()"),
-    (r"fig\.show\s*\(", "fig.show()"),
-    (r"\.plot\(\)\.show\s*\(", ".plot().show()"),
-    (r"ax\.show\s*\(", "ax.show()"),
-]
 
+def candidate_words(methods, names):
+    """Call names that may be blocking and the modules they come from
 
-def is_test_file(file_path):
-    """Check if file is a test file"""
-    if not file_path:
-        return False
+    These drive the pre-filter (has_candidate()). A call renamed on import
+    ("from webbrowser import open as wopen") does not spell the banned name,
+    so the modules of dotted entries are candidates too.
+    """
+    calls = {name.rsplit(".", 1)[-1] for name in [*methods, *names]}
+    modules = {name.split(".")[0] for name in names if "." in name}
+    return calls, modules
 
-    path = Path(file_path)
-    path_str = str(path).lower()
 
-    # Check if 'test' appears in the path or filename
-    return "test" in path_str
+def candidate_pattern(methods, names):
+    """Regex for call names that may be blocking, plus imports of their modules"""
+    calls, modules = candidate_words(methods, names)
+    parts = []
+    if calls:
+        parts.append(r"\b(?:%s)\s*\(" % "|".join(map(re.escape, sorted(calls))))
+    if modules:
+        parts.append(
+            r"\b(?:from|import)\s+(?:%s)\b" % "|".join(map(re.escape, sorted(modules)))
+        )
+    return re.compile("|".join(parts) or r"(?!)")
 
 
-def find_show_calls(content):
-    """Find all .show() calls in content"""
-    matches = SHOW_PATTERN.findall(content)
+CANDIDATE_PATTERN = candidate_pattern(BLOCKING_METHODS, BLOCKING_NAMES)
+CANDIDATE_WORDS = sorted(
+    set().union(*candidate_words(BLOCKING_METHODS, BLOCKING_NAMES))
+)
+# Line breaks as the compiler counts them (ast line numbers)
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
 
-    # Find specific patterns for better error messages
-    found_patterns = []
-    for pattern, name in SPECIFIC_PATTERNS:
-        if re.search(pattern, content):
-            found_patterns.append(name)
 
-    return matches, found_patterns
+def has_candidate(content):
+    """Whether content may contain a blocking call
 
+    Cheap pre-filter: content without any candidate is not parsed at all.
+    re cannot skip ahead to a \\b-prefixed alternation and tries it at every
+    position, so the regex only runs once a plain substring search found one
+    of the names.
+    """
+    if not any(word in content for word in CANDIDATE_WORDS):
+        return False
+    return CANDIDATE_PATTERN.search(content) is not None
 
-def get_line_numbers(content, pattern):
-    """Get line numbers where pattern appears"""
-    lines = content.split("\n")
-    line_numbers = []
 
-    for i, line in enumerate(lines, 1):
-        if re.search(pattern, line):
-            line_numbers.append(i)
+def config_files():
+    """Rule and ignore files the loaded rules depend on (watched by hook_daemon.py)"""
+    return rule_packs.rule_files() + path_ignore.config_files()
 
-    return line_numbers
 
+def effective_config():
+    """Settings that affect the verdict (keys the dispatcher's verdict cache)"""
+    return {
+        "BLOCK_ON_DETECTION": BLOCK_ON_DETECTION,
+        "CHECK_TESTS_ONLY": CHECK_TESTS_ONLY,
+        "CHECK_ALLOWED_CALLS": sorted([*BLOCKING_METHODS, *BLOCKING_NAMES]),
+        "rules": RULES_STAMP,
+        "ignore": path_ignore.config_stamp(),
+    }
 
-def main():
-    """Main function"""
-    # Read JSON data from stdin
-    if sys.stdin.isatty():
-        print("[ERROR] No input data received", file=sys.stderr)
-        sys.exit(1)
 
+def is_test_file(file_path):
+    """Check if file is a test file"""
+    if not file_path:
+        return False
+
+    path_str = os.path.normpath(file_path).lower()
+
+    # Check if 'test' appears in the path or filename
+    return "test" in path_str
+
+
+def match_call(dotted, aliases=None):
+    """Return the BLOCKING_CALLS entry matched by a dotted call name, or None
+
+    dotted is e.g. "plt.show", "input" or "*.show" for a method called on an
+    expression; aliases maps imported names to their full module path.
+    """
+    head, _, attr = dotted.rpartition(".")
+    if head and attr in BLOCKING_METHODS:
+        return BLOCKING_METHODS[attr]
+    if dotted in BLOCKING_NAMES:
+        return BLOCKING_NAMES[dotted]
+    if aliases:
+        first, _, rest = dotted.partition(".")
+        if first in aliases:
+            resolved = aliases[first] + ("." + rest if rest else "")
+            return BLOCKING_NAMES.get(resolved)
+    return None
+
+
+def dotted_name(node):
+    """Return "a.b.c" for a Name/Attribute chain, with * for other bases"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    parts.append(node.id if isinstance(node, ast.Name) else "*")
+    return ".".join(reversed(parts))
+
+
+def find_calls_ast(tree, lines):
+    """Find blocking calls in a parsed module as (line, col, entry) tuples"""
+    aliases = {}
+    calls = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+        elif isinstance(node, ast.Call):
+            calls.append(node)
+
+    found = []
+    for node in calls:
+        entry = match_call(dotted_name(node.func), aliases)
+        if entry:
+            # col_offset counts UTF-8 bytes
+            line = lines[node.lineno - 1].encode()
+            col = len(line[: node.col_offset].decode(errors="ignore"))
+            found.append((node.lineno, col + 1, entry))
+    return sorted(found)
+
+
+def find_calls_tokenize(content):
+    """Find blocking calls token by token, for fragments that do not parse
+
+    Leading whitespace is stripped from every line so indented fragments
+    tokenize without indentation errors. Strings and comments are single
+    tokens, so text inside them is never mistaken for a call.
+    """
+    # Split like the compiler: str.splitlines() also breaks at \x0c or
+    # \u2028, which would shift the reported rows
+    lines = [line + "\n" for line in LINE_BREAK.split(content)]
+    indents = [len(line) - len(line.lstrip(" \t")) for line in lines]
+    readline = iter([line.lstrip(" \t") for line in lines]).__next__
+    skipped = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT)
+
+    found = []
+    chain, start, previous = [], None, None
     try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
-        sys.exit(1)
+        for token in tokenize.generate_tokens(readline):
+            if token.type in skipped:
+                continue
+            if token.type == tokenize.NAME:
+                if previous == "." and chain:
+                    chain.append(token.string)
+                elif previous == ".":
+                    # Method called on an expression, e.g. df.plot().show()
+                    chain, start = ["*", token.string], token.start
+                elif previous in ("def", "class"):
+                    chain = []
+                else:
+                    chain, start = [token.string], token.start
+            elif token.string == "(" and chain:
+                entry = match_call(".".join(chain))
+                if entry:
+                    row, col = start
+                    found.append((row, col + indents[row - 1] + 1, entry))
+                chain = []
+            elif token.string != ".":
+                chain = []
+            previous = token.string
+    except (tokenize.TokenError, SyntaxError):
+        pass  # Unterminated fragment: keep what was found so far
+    return found
+
+
+def find_blocking_calls(content):
+    """Find blocking calls in Python source as sorted (line, col, entry) tuples
+
+    Parses the content once with ast; Edit fragments that do not parse fall
+    back to a single tokenize pass.
+    """
+    if not has_candidate(content):
+        return []
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return find_calls_tokenize(content)
+    return find_calls_ast(tree, LINE_BREAK.split(content))
 
+
+def run_hook(data, chunks=None):
+    """Evaluate a parsed hook payload and return (exit_code, decision)
+
+    chunks, when given, yields the added text in pieces (a streamed payload,
+    see main()); it is only read once the path qualifies for the check.
+    """
     # Get tool input
     tool_input = data.get("tool_input", {})
     file_path = tool_input.get("file_path", "")
-    content = tool_input.get("content", "")
-
-    # For Edit operations, check both old and new strings
-    if not content:
-        old_str = tool_input.get("old_string", "") or tool_input.get("old_str", "")
-        new_str = tool_input.get("new_string", "") or tool_input.get("new_str", "")
-        content = old_str + "\n" + new_str
-
-    # For MultiEdit operations
-    if not content and "edits" in tool_input:
-        edits = tool_input.get("edits", [])
-        content_parts = []
-        for edit in edits:
-            content_parts.append(edit.get("old_string", ""))
-            content_parts.append(edit.get("new_string", ""))
-        content = "\n".join(content_parts)
-
-    if not content:
-        print("[OK] No content to check", file=sys.stderr)
-        sys.exit(0)
+    if path_ignore.is_ignored(file_path):
+        print(f"[OK] Ignored path (gitignore/vendor): {file_path}", file=sys.stderr)
+        return 0, None
 
     # Check if it's a Python file
     if not file_path.endswith(".py"):
         print(f"[OK] Not a Python file: {file_path}", file=sys.stderr)
-        sys.exit(0)
+        return 0, None
 
     # If CHECK_TESTS_ONLY is true, only check test files
     if CHECK_TESTS_ONLY and not is_test_file(file_path):
         print(f"[OK] Not a test file, skipping: {file_path}", file=sys.stderr)
-        sys.exit(0)
+        return 0, None
 
-    # Find .show() calls
-    matches, specific_patterns = find_show_calls(content)
+    # Only the text being added; removing a .show() call is fine. Streamed
+    # text is joined for ast only when some chunk names a blocking call.
+    if chunks is None:
+        content = added_text(tool_input)
+    else:
+        content = collect_text(chunks, has_candidate)
+        if content is None:
+            print(f"[OK] No blocking calls found in {file_path}", file=sys.stderr)
+            return 0, None
 
-    if matches:
-        # Get line numbers for better error reporting
-        line_numbers = get_line_numbers(content, SHOW_PATTERN)
+    if not content:
+        print("[OK] No content to check", file=sys.stderr)
+        return 0, None
+
+    # Find blocking calls
+    found = find_blocking_calls(content)
+
+    if found:
+        entries = sorted({entry for _, _, entry in found})
+        only_show = entries == ["*.show"]
+        label = ".show()" if only_show else "Blocking call"
 
         print(
-            f"\n[ERROR] .show() detected in Python file: {file_path}", file=sys.stderr
+            f"\n[ERROR] {label} detected in Python file: {file_path}", file=sys.stderr
         )
         print("=" * 60, file=sys.stderr)
 
-        if line_numbers:
+        print("Found blocking calls (line:col of the added text):", file=sys.stderr)
+        for line, col, entry in found[:10]:
             print(
-                f"Found .show() calls on line(s): {', '.join(map(str, line_numbers[:10]))}",
+                f"  {line}:{col} {entry.lstrip('*')}() {BLOCKING_CALLS[entry]}",
                 file=sys.stderr,
             )
-            if len(line_numbers) > 10:
+        if len(found) > 10:
+            print(f"  ... and {len(found) - 10} more locations", file=sys.stderr)
+
+        plot_calls = PLOT_CALLS.intersection(entries)
+        if plot_calls:
+            print("\nSuggestion: Save plots to files instead:", file=sys.stderr)
+            print("  Replace: plt.show()", file=sys.stderr)
+            print("  With:    plt.savefig('output.png')", file=sys.stderr)
+            print("           plt.close()", file=sys.stderr)
+            print("\nOr use:", file=sys.stderr)
+            print("  fig.savefig('figure.png')", file=sys.stderr)
+            print("  matplotlib.pyplot.close('all')", file=sys.stderr)
+
+            if is_test_file(file_path):
+                print("\nFor tests, consider using:", file=sys.stderr)
+                print("  plt.savefig(f'test_output_{test_name}.png')", file=sys.stderr)
                 print(
-                    f"  ... and {len(line_numbers) - 10} more locations",
+                    "  assert os.path.exists(f'test_output_{test_name}.png')",
                     file=sys.stderr,
                 )
 
-        if specific_patterns:
-            print(
-                f"\nDetected patterns: {', '.join(specific_patterns)}", file=sys.stderr
-            )
-
-        print("\nSuggestion: Save plots to files instead:", file=sys.stderr)
-        print("  Replace: plt.show()", file=sys.stderr)
-        print("  With:    plt.savefig('output.png')", file=sys.stderr)
-        print("           plt.close()", file=sys.stderr)
-        print("\nOr use:", file=sys.stderr)
-        print("  fig.savefig('figure.png')", file=sys.stderr)
-        print("  matplotlib.pyplot.close('all')", file=sys.stderr)
-
-        if is_test_file(file_path):
-            print("\nFor tests, consider using:", file=sys.stderr)
-            print("  plt.savefig(f'test_output_{test_name}.png')", file=sys.stderr)
-            print(
-                "  assert os.path.exists(f'test_output_{test_name}.png')",
-                file=sys.stderr,
-            )
-
         print("=" * 60, file=sys.stderr)
 
         if BLOCK_ON_DETECTION:
+            if only_show:
+                reason = ".show() calls found in Python file - use savefig() instead"
+            else:
+                names = ", ".join(entry.lstrip("*") + "()" for entry in entries)
+                reason = (
+                    f"Blocking calls found in Python file: {names} - "
+                    "they stall unattended runs"
+                )
+                if plot_calls:
+                    reason += " (use savefig() for plots)"
             # Return JSON format decision
-            decision = {
-                "decision": "block",
-                "reason": f".show() calls found in Python file - use savefig() instead",
-            }
-            print(json.dumps(decision, ensure_ascii=False))
-            sys.exit(2)  # Block operation
+            decision = {"decision": "block", "reason": reason}
+            return 2, decision  # Block operation
         else:
             print(
-                "[WARNING] .show() calls found, but allowing operation to continue",
+                f"[WARNING] {label} calls found, but allowing operation to continue",
                 file=sys.stderr,
             )
-            sys.exit(0)
+            return 0, None
     else:
-        print(f"[OK] No .show() calls found in {file_path}", file=sys.stderr)
-        sys.exit(0)
+        print(f"[OK] No blocking calls found in {file_path}", file=sys.stderr)
+        return 0, None
+
+
+def main():
+    """Main function"""
+    # Read JSON data from stdin
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+
+    started = hook_telemetry.start()
+    try:
+        # Parsed as it arrives: the content is read in chunks, and not at all
+        # for a path the hook skips (see hook_payload.read_payload)
+        payload = read_payload(sys.stdin.buffer)
+        payload.need("tool_input.file_path")
+        data = payload.data
+        chunks = added_chunks(payload)
+        exit_code, decision = run_hook(data, chunks)
+        chunks.close()  # A check may stop reading early
+        payload.rest()
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    hook_telemetry.record(
+        "no_show_in_python_hook", started, data, payload.bytes_read, exit_code, decision
+    )
+    if decision:
+        print(json.dumps(decision, ensure_ascii=False))
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
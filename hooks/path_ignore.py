@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+gitignore- and vendor-aware path exclusion shared by the hooks
+
+Hooks see every path Claude writes to, including installed dependencies,
+build output, generated code and vendored third-party copies. Those hold
+the largest payloads and cause most false positives, and no naming or
+content rule is meant for them, so each hook asks is_ignored(file_path)
+first and allows an ignored path right away.
+
+A path inside the project (CLAUDE_PROJECT_DIR, else the working directory)
+is matched against, from lowest to highest precedence:
+
+  DEFAULT_PATTERNS        dependency, build and generated files
+  .git/info/exclude
+  .gitignore              the project's, then those of the directories on
+                          the way to the path (deeper files win)
+  .claude/hook_ignore     suite-specific; `!pattern` re-checks a path that
+                          the files above exclude
+
+All use gitignore syntax: * ? [...] and **, a leading or inner / anchors the
+pattern to the file's directory, a trailing / matches directories only, !
+negates, the last matching pattern wins, and nothing below an excluded
+directory can be re-included. Paths outside the project are never ignored.
+
+Each file's patterns are compiled into one regex (alternatives in reverse
+order, so the first alternative matching is the file's last matching
+pattern) and cached by the file's (mtime, size): a long-lived process such
+as hook_daemon.py recompiles a file only after it changes.
+
+Configuration:
+  HOOK_IGNORE=false     check every path
+
+Usage: python3 path_ignore.py PATH...   (prints the ignored ones)
+"""
+import os
+import re
+import sys
+
+IGNORE_NAME = ".gitignore"
+SUITE_IGNORE = os.path.join(".claude", "hook_ignore")
+GIT_EXCLUDE = os.path.join(".git", "info", "exclude")
+
+DEFAULT_PATTERNS = (
+    "node_modules/",
+    "bower_components/",
+    "vendor/",
+    "third_party/",
+    "build/",
+    "dist/",
+    ".venv/",
+    "venv/",
+    "__pycache__/",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.pb.cc",
+    "*.pb.h",
+    "*.min.js",
+    "*.min.css",
+)
+
+# Compiled pattern files: path -> ((mtime_ns, size), PatternSet or None)
+_pattern_files = {}
+
+
+def enabled():
+    return os.environ.get("HOOK_IGNORE", "true").lower() == "true"
+
+
+def project_dir():
+    return os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+
+
+def glob_regex(pattern):
+    """Translate a gitignore glob (without anchors or negation) into a regex"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")  # Zero or more directories
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)  # A ] right after [ is literal
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                inner = pattern[i + 1 : end].replace("\\", "\\\\")
+                if inner[0] in "!^":
+                    inner = "^" + inner[1:]
+                out.append(f"[{inner}]")
+                i = end + 1
+                continue
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def translate(line):
+    """Return (regex, negated, dir_only) for one gitignore line, or None"""
+    line = line.rstrip("\r\n")
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but at the end anchors the pattern to its directory
+    prefix = "" if "/" in line else "(?:.*/)?"
+    return prefix + glob_regex(line.lstrip("/")), negated, dir_only
+
+
+class PatternSet:
+    """The patterns of one ignore file, compiled into two regexes
+
+    match() returns True (ignored), False (re-included by a ! pattern) or
+    None (no pattern applies) for a path relative to the file's directory.
+    """
+
+    def __init__(self, lines):
+        rules = [rule for rule in map(translate, lines) if rule is not None]
+        rules.reverse()  # The last matching pattern wins
+        self.dirs = self._compile(rules)
+        self.files = self._compile([rule for rule in rules if not rule[2]])
+
+    @staticmethod
+    def _compile(rules):
+        if not rules:
+            return None
+        pattern = re.compile("|".join(f"({regex})" for regex, _, _ in rules))
+        return pattern, [not negated for _, negated, _ in rules]
+
+    def match(self, relpath, is_dir):
+        compiled = self.dirs if is_dir else self.files
+        if compiled is None:
+            return None
+        pattern, ignored = compiled
+        m = pattern.fullmatch(relpath)
+        return None if m is None else ignored[m.lastindex - 1]
+
+
+_default_set = None
+
+
+def default_patterns():
+    """DEFAULT_PATTERNS, compiled on first use"""
+    global _default_set
+    if _default_set is None:
+        _default_set = PatternSet(DEFAULT_PATTERNS)
+    return _default_set
+
+
+def load_patterns(path):
+    """Compiled patterns of an ignore file, or None when it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        _pattern_files.pop(path, None)
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _pattern_files.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                patterns = PatternSet(f)
+        except (OSError, re.error) as e:
+            print(f"[WARNING] Ignoring {path}: {e}", file=sys.stderr)
+            patterns = None
+        cached = _pattern_files[path] = (stamp, patterns)
+    return cached[1]
+
+
+class IgnoreMatcher:
+    """Decides which paths under one project root are ignored
+
+    Pattern files are looked up once per matcher; create a new matcher (or
+    use is_ignored()) to see later changes to them.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.loaded = {}
+
+    def patterns(self, relpath):
+        if relpath not in self.loaded:
+            self.loaded[relpath] = load_patterns(os.path.join(self.root, relpath))
+        return self.loaded[relpath]
+
+    def decide(self, relpath, is_dir):
+        """True/False from the highest-precedence file with an opinion, or None"""
+        result = self._match(self.patterns(SUITE_IGNORE), relpath, is_dir)
+        if result is not None:
+            return result
+        parts = relpath.split("/")
+        for depth in range(len(parts) - 1, -1, -1):
+            base = "/".join(parts[:depth])
+            patterns = self.patterns(f"{base}/{IGNORE_NAME}" if base else IGNORE_NAME)
+            result = self._match(patterns, "/".join(parts[depth:]), is_dir)
+            if result is not None:
+                return result
+        result = self._match(self.patterns(GIT_EXCLUDE), relpath, is_dir)
+        if result is not None:
+            return result
+        return default_patterns().match(relpath, is_dir)
+
+    @staticmethod
+    def _match(patterns, relpath, is_dir):
+        return None if patterns is None else patterns.match(relpath, is_dir)
+
+    def relative(self, path):
+        """path relative to the root with / separators, or None outside it"""
+        relpath = os.path.relpath(os.path.abspath(path), self.root)
+        if relpath in (".", "..") or relpath.startswith(".." + os.sep):
+            return None
+        return relpath.replace(os.sep, "/")
+
+    def ignored(self, relpath, is_dir=False):
+        """True when relpath (relative to the root) or a parent is ignored"""
+        parts = relpath.split("/")
+        for depth in range(1, len(parts)):
+            if self.decide("/".join(parts[:depth]), True):
+                return True
+        return bool(self.decide(relpath, is_dir))
+
+
+def is_ignored(path, root=None):
+    """True when hooks should not check path (see the module docstring)"""
+    if not path or not enabled():
+        return False
+    matcher = IgnoreMatcher(root or project_dir())
+    relpath = matcher.relative(path)
+    return relpath is not None and matcher.ignored(relpath)
+
+
+def config_files(root=None):
+    """The project-level ignore files (watched by hook_daemon.py)"""
+    root = root or project_dir()
+    names = (IGNORE_NAME, GIT_EXCLUDE, SUITE_IGNORE)
+    return [os.path.join(root, name) for name in names]
+
+
+def config_stamp(root=None):
+    """Stamps of the project-level ignore files (part of verdict cache keys)"""
+    stamps = []
+    for path in config_files(root):
+        try:
+            st = os.stat(path)
+            stamps.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+
+def path_stamp(path, root=None):
+    """Stamps of every ignore file that can decide path (verdict cache keys)
+
+    config_stamp() plus one stamp per directory from the project root down
+    to path's directory, for the .gitignore files nested there.
+    """
+    root = os.path.abspath(root or project_dir())
+    stamps = config_stamp(root)
+    if not path:
+        return stamps
+    relpath = IgnoreMatcher(root).relative(path)
+    if relpath is None:
+        return stamps
+    parts = relpath.split("/")[:-1]
+    for depth in range(1, len(parts) + 1):
+        ignore_file = os.path.join(root, *parts[:depth], IGNORE_NAME)
+        try:
+            st = os.stat(ignore_file)
+            stamps.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths or paths[0] in ("-h", "--help"):
+        print("Usage: python3 path_ignore.py PATH...", file=sys.stderr)
+        sys.exit(1)
+    for path in paths:
+        if is_ignored(path):
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
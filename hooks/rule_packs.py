@@ -0,0 +1,216 @@
+"""
+Rule packs: hook rule tables extended by user and project rule files
+
+filename_ban_hook.py and no_show_in_python_hook.py ship their rules as
+Python literals. Those are the defaults; rule files layered on top let a
+team add (or drop) rules without editing the hooks:
+
+  ~/.claude/hook_rules.json, ~/.claude/hook_rules.toml
+  <project>/.claude/hook_rules.json, <project>/.claude/hook_rules.toml
+
+applied in that order. Each file has one table per check ("filename",
+"show"). Tables merge key by key, lists are extended, other values are
+replaced, and false removes an entry:
+
+  [filename.bad_patterns.vendored]
+  patterns = ["^vendored_", "_vendored$"]
+  reason = "Vendored copy in the source tree"
+  suggestion = "Add the dependency to the package manifest instead"
+
+  [filename.common_typos]
+  recieve = "receive"
+
+  [filename]
+  markdown_allowlist = ["CHANGELOG.md"]
+
+  [show.blocking_calls]
+  "pygame.event.wait" = "waits for a window event"
+  input = false
+
+Merging and compiling (regex validation, lookup tables) runs only when a
+rule file changed: the compiled tables are marshalled to
+HOOK_RULE_CACHE_DIR keyed by every rule file's (mtime, size) and the hook
+source's stamp, so a large rule set costs one file read per hook process.
+With no rule files the defaults are compiled in memory as before.
+
+Configuration:
+  HOOK_RULES=false          ignore rule files, use the built-in rules only
+  HOOK_RULE_CACHE_DIR=...   compiled rule cache (default ~/.claude/rule_cache)
+"""
+import json
+import marshal
+import os
+import re
+import sys
+import zlib
+
+RULES_NAME = "hook_rules"
+RULES_EXTENSIONS = (".json", ".toml")
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.claude/rule_cache")
+CACHE_VERSION = 1
+
+# Warnings raised while compiling; stored with the cache and replayed on hits
+_warnings = []
+
+
+def enabled():
+    return os.environ.get("HOOK_RULES", "true").lower() == "true"
+
+
+def cache_dir():
+    return os.environ.get("HOOK_RULE_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def project_dir():
+    return os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+
+
+def rule_files():
+    """Every rule file location, in the order they are applied"""
+    if not enabled():
+        return []
+    dirs = [os.path.expanduser("~/.claude"), os.path.join(project_dir(), ".claude")]
+    return [
+        os.path.join(directory, RULES_NAME + ext)
+        for directory in dirs
+        for ext in RULES_EXTENSIONS
+    ]
+
+
+def source_stamp(path):
+    """(mtime_ns, size) of a hook source, or of the zipapp that contains it"""
+    while path:
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+    return None
+
+
+def warn(message):
+    """Report a rule problem (also replayed whenever the cached rules load)"""
+    _warnings.append(message)
+    print(f"[WARNING] {message}", file=sys.stderr)
+
+
+def valid_regex(pattern, where):
+    """True when pattern compiles; warns and returns False otherwise"""
+    try:
+        re.compile(pattern)
+        return True
+    except (re.error, TypeError) as e:
+        warn(f"Ignoring invalid pattern {pattern!r} in {where}: {e}")
+        return False
+
+
+def read_rules(path):
+    """Parse one rule file into a dict, or None (with a warning) on errors"""
+    try:
+        if path.endswith(".toml"):
+            try:
+                import tomllib
+            except ImportError:
+                warn(f"Skipping {path}: TOML rule files need Python 3.11+")
+                return None
+            with open(path, "rb") as f:
+                rules = tomllib.load(f)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                rules = json.load(f)
+    except (OSError, ValueError) as e:
+        warn(f"Skipping rule file {path}: {e}")
+        return None
+    if not isinstance(rules, dict):
+        warn(f"Skipping rule file {path}: expected a table at the top level")
+        return None
+    return rules
+
+
+def merge(base, override):
+    """Layer override onto base (see the module docstring for the rules)"""
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for key, value in override.items():
+            if value is False:
+                merged.pop(key, None)
+            elif key in merged:
+                merged[key] = merge(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+    if isinstance(base, list) and isinstance(override, list):
+        return base + [item for item in override if item not in base]
+    return override
+
+
+def cache_path(section, paths):
+    digest = zlib.crc32(repr([section, paths]).encode("utf-8", "surrogatepass"))
+    return os.path.join(cache_dir(), f"{section}-{digest:08x}.marshal")
+
+
+def read_cache(path, key):
+    try:
+        with open(path, "rb") as f:
+            cached_key, warnings, rules = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if cached_key != key:
+        return None
+    for message in warnings:
+        print(f"[WARNING] {message}", file=sys.stderr)
+    return rules
+
+
+def write_cache(path, key, warnings, rules):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump((key, tuple(warnings), rules), f)
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        pass  # Uncached rules still apply; they are compiled again next time
+
+
+def load(section, defaults, compile_rules, source_file):
+    """Return (rules, stamp) for one check
+
+    compile_rules turns the merged tables into plain data (dicts, lists,
+    tuples, sets, strings, numbers) that marshal can store. stamp lists the
+    rule files applied, for effective_config(); it is None when only the
+    defaults apply.
+    """
+    stamps = []
+    for path in rule_files():
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stamps.append((path, (st.st_mtime_ns, st.st_size)))
+    if not stamps:
+        return compile_rules(defaults), None
+
+    key = (CACHE_VERSION, sys.hexversion, section, source_stamp(source_file), *stamps)
+    path = cache_path(section, [p for p, _ in stamps])
+    rules = read_cache(path, key)
+    if rules is not None:
+        return rules, [[p, *s] for p, s in stamps]
+
+    del _warnings[:]
+    merged = defaults
+    for rule_file, _ in stamps:
+        parsed = read_rules(rule_file)
+        if parsed is None:
+            continue
+        table = parsed.get(section, {})
+        if not isinstance(table, dict):
+            warn(f"Ignoring [{section}] in {rule_file}: expected a table")
+            continue
+        merged = merge(merged, table)
+    rules = compile_rules(merged)
+    write_cache(path, key, _warnings, rules)
+    return rules, [[p, *s] for p, s in stamps]
@@ -0,0 +1,37 @@
+"""
+Helpers shared by the long-lived servers (hook_daemon.py, format_server.py)
+
+Kept apart from the servers themselves so that importing them does not load
+a server's dependencies: format_server.py must not pull in the check suite.
+"""
+import json
+import os
+import socket
+
+
+def file_stamp(path):
+    """Return a cheap change marker for a file"""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def socket_is_live(socket_path):
+    """Check whether a server is already answering on socket_path"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+
+def send_command(socket_path, command):
+    """Send a control command to a running server"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({"command": command}).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        return sock.makefile("rb").read()
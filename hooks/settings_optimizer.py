@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Report and consolidate hook registrations across Claude Code settings
+
+Claude Code merges the hooks of ~/.claude/settings.json and the project's
+.claude/settings.json and .claude/settings.local.json, and spawns one
+process per distinct command whose matcher matches the tool. Re-running a
+deployer, or registering the phase hooks in a project while the global
+dispatch already runs protect_phase, spawns more processes than needed.
+
+The report lists the processes spawned per event and tool with an
+estimated latency: a start-up cost per kind of command (script, zipapp
+bundle, daemon client, shell) plus the hook's own p50 from the
+hook_telemetry.py log when there is one. It flags checks that run in more
+than one process and proposes the smallest equivalent registrations:
+
+- PreToolUse checks known to dispatch_hook.py are merged into one dispatch
+  command per set of tools (more than one only when their CHECK_MODE,
+  BLOCK_ON_DETECTION, ... settings conflict)
+- project registrations of a check the user settings already run with the
+  same configuration are dropped
+- hooks deployed into the project's own .claude/ directory are never folded
+  into a dispatch command: they keep running from the project, whatever
+  happens to this checkout
+- identical entries registered twice in a file are dropped
+
+Commands it does not recognize (other hooks, shell pipelines, entries with
+a timeout) are kept as they are. --write applies the proposal and keeps a
+.bak copy of every file it rewrites.
+
+Usage: python3 settings_optimizer.py [--project DIR] [--user-settings FILE]
+                                     [--telemetry-log FILE] [--write]
+"""
+import argparse
+import json
+import os
+import re
+import shlex
+import shutil
+import sys
+
+import build_bundle
+import dispatch_hook
+import hook_telemetry
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_USER_SETTINGS = os.path.expanduser("~/.claude/settings.json")
+
+# Tools reported for events with matchers, in the order matchers are written
+TOOLS = [
+    "Edit",
+    "Write",
+    "MultiEdit",
+    "NotebookEdit",
+    "Bash",
+    "Read",
+    "Glob",
+    "Grep",
+    "WebFetch",
+    "WebSearch",
+    "Task",
+]
+TOOL_EVENTS = ("PreToolUse", "PostToolUse")
+
+# Estimated process start-up in ms per kind of command, before the hook's work
+STARTUP_MS = {"script": 40.0, "bundle": 25.0, "client": 12.0, "shell": 5.0}
+OTHER_STARTUP_MS = 40.0
+
+# Environment each check reads; variables no check lists may affect every check
+CHECK_ENV = {
+    "chinese": {
+        "CHECK_MODE",
+        "BLOCK_ON_DETECTION",
+        "CHECK_CHINESE",
+        "CHECK_JAPANESE",
+        "CHECK_KOREAN",
+    },
+    "filename": {"TYPO_FUZZY", "TYPO_INDEX_PATH"},
+    "show": {"BLOCK_ON_DETECTION", "CHECK_TESTS_ONLY", "CHECK_ALLOWED_CALLS"},
+}
+CHECK_VARS = set().union(*CHECK_ENV.values())
+
+# Hook module name -> check name
+MODULE_CHECKS = {
+    os.path.splitext(info["file"])[0]: name
+    for name, info in dispatch_hook.CHECKS.items()
+}
+DISPATCH_MODULES = ("dispatch_hook", "hook_client")
+
+ENV_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+SHELL_SYNTAX = re.compile(r"[;&|<>`$()]")
+
+
+def parse_command(command):
+    """Split a hook command into environment, runner, kind, hook and checks
+
+    checks is None for commands that cannot be safely rewritten.
+    """
+    info = {
+        "env": {},
+        "runner": [],
+        "kind": None,
+        "hook": None,
+        "checks": None,
+        "script": None,
+    }
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return info
+    if SHELL_SYNTAX.search(command):
+        return info
+    while tokens and ENV_ASSIGNMENT.match(tokens[0]):
+        key, value = tokens.pop(0).split("=", 1)
+        info["env"][key] = value
+    info["runner"] = tokens
+
+    script = next((t for t in tokens if t.endswith((".py", ".pyz", ".sh"))), None)
+    if script is None:
+        return info
+    info["script"] = script
+    name, ext = os.path.splitext(os.path.basename(script))
+    args = tokens[tokens.index(script) + 1 :]
+    if ext == ".sh":
+        info.update(kind="shell", hook=name)
+        return info
+    if ext == ".pyz":
+        entry = args.pop(0) if args else ""
+        name = build_bundle.ENTRY_POINTS.get(entry, entry)
+        info["kind"] = "bundle"
+    else:
+        info["kind"] = "client" if name == "hook_client" else "script"
+    info["hook"] = "dispatch_hook" if name in DISPATCH_MODULES else name
+    if args:
+        return info  # Hooks take no arguments: leave unknown ones alone
+
+    if name in DISPATCH_MODULES:
+        checks = dispatch_hook.parse_check_names(
+            info["env"].get("HOOK_CHECKS", dispatch_hook.DEFAULT_CHECKS)
+        )
+        if all(check in dispatch_hook.CHECKS for check in checks):
+            info["checks"] = checks
+    elif name in MODULE_CHECKS:
+        info["checks"] = [MODULE_CHECKS[name]]
+    return info
+
+
+def project_local(script, project_dir):
+    """Whether a hook script lives in the project (relative paths run from it)"""
+    if not script or not project_dir:
+        return False
+    if not os.path.isabs(script):
+        return True
+    root = os.path.realpath(project_dir)
+    return os.path.realpath(script).startswith(root + os.sep)
+
+
+def registrations(source, settings, project_dir=None):
+    """Yield one record per command hook registered in a settings dict
+
+    local marks project files registered by the project's own settings.
+    """
+    for event, groups in (settings.get("hooks") or {}).items():
+        for group in groups or []:
+            matcher = group.get("matcher", "")
+            for entry in group.get("hooks") or []:
+                if entry.get("type") != "command":
+                    continue
+                info = parse_command(entry.get("command", ""))
+                if set(entry) - {"type", "command"}:
+                    info["checks"] = None  # Keep entries with a timeout etc.
+                yield {
+                    "source": source,
+                    "event": event,
+                    "matcher": matcher,
+                    "command": entry.get("command", ""),
+                    "local": source != "user"
+                    and project_local(info["script"], project_dir),
+                    **info,
+                }
+
+
+def matcher_tools(event, matcher):
+    """Tools a matcher applies to; events without tools report "-" """
+    if event not in TOOL_EVENTS:
+        return ["-"]
+    if matcher in ("", "*"):
+        return list(TOOLS)
+    try:
+        return [tool for tool in TOOLS if re.fullmatch(matcher, tool)]
+    except re.error:
+        return [tool for tool in TOOLS if tool == matcher]
+
+
+def applicable_checks(reg, tool):
+    """Checks a registration actually runs for a tool (dispatch skips the rest)"""
+    if reg["checks"] is None:
+        return None
+    return [
+        check
+        for check in reg["checks"]
+        if tool == "-" or tool in dispatch_hook.CHECKS[check]["tools"]
+    ]
+
+
+def spawn_table(regs):
+    """{(event, tool): {command: registration}}; identical commands run once"""
+    table = {}
+    for reg in regs:
+        for tool in matcher_tools(reg["event"], reg["matcher"]):
+            table.setdefault((reg["event"], tool), {}).setdefault(reg["command"], reg)
+    return table
+
+
+def telemetry_p50(path):
+    """Hook name -> p50 wall time in ms of its own work, from the telemetry log"""
+    if not path:
+        return {}
+    groups = hook_telemetry.summarize(hook_telemetry.read_records(path), "hook")
+    return {
+        hook: hook_telemetry.percentile(sorted(walls), 50)
+        for hook, (walls, _) in groups.items()
+    }
+
+
+def estimate_ms(reg, own_ms):
+    return STARTUP_MS.get(reg["kind"], OTHER_STARTUP_MS) + own_ms.get(reg["hook"], 0.0)
+
+
+def relevant_env(check, env):
+    """The part of a command's environment that configures one check"""
+    return {
+        key: value
+        for key, value in env.items()
+        if key != "HOOK_CHECKS"
+        and (key in CHECK_ENV.get(check, ()) or key not in CHECK_VARS)
+    }
+
+
+def tool_checks(tool):
+    """Every check dispatch_hook.py runs for a tool"""
+    return {
+        name for name, info in dispatch_hook.CHECKS.items() if tool in info["tools"]
+    }
+
+
+def merge_checks(items):
+    """Group (check, env) pairs into as few shared environments as possible"""
+    groups = []
+    for item in items:
+        for group in groups:
+            candidate = group + [item]
+            env = {k: v for _, check_env in candidate for k, v in check_env.items()}
+            if all(relevant_env(c, env) == e for c, e in candidate):
+                group.append(item)
+                break
+        else:
+            groups.append([item])
+    return groups
+
+
+def merge_tools(per_tool):
+    """Cover {tool: checks} with few (checks, tools) commands
+
+    A command running `checks` for a tool runs only the ones dispatch allows
+    for it, so tools can share a command when that leaves each its own set.
+    """
+    commands = []
+    for tool in TOOLS:
+        if tool not in per_tool:
+            continue
+        for command in commands:
+            checks = command[0] | per_tool[tool]
+            tools = command[1] + [tool]
+            if all(checks & tool_checks(t) == per_tool[t] for t in tools):
+                command[0], command[1] = checks, tools
+                break
+        else:
+            commands.append([set(per_tool[tool]), [tool]])
+    return commands
+
+
+def command_for(checks, tools, env_by_check, regs):
+    """Command running checks for tools, reusing a registered one if possible"""
+    for reg in regs:
+        if reg["checks"] is not None and all(
+            set(reg["checks"]) & tool_checks(t) == checks & tool_checks(t)
+            for t in tools
+        ):
+            if all(relevant_env(c, reg["env"]) == env_by_check[c] for c in checks):
+                return reg["command"]
+
+    runner = next(
+        (reg["runner"] for reg in regs if reg["hook"] == "dispatch_hook"),
+        ["python3", os.path.join(HOOKS_DIR, "dispatch_hook.py")],
+    )
+    env = {k: v for check in checks for k, v in env_by_check[check].items()}
+    parts = [f"{key}={shlex.quote(value)}" for key, value in sorted(env.items())]
+    ordered = [check for check in dispatch_hook.CHECKS if check in checks]
+    parts.append(f"HOOK_CHECKS={','.join(ordered)}")
+    return " ".join(parts + [shlex.join(runner)])
+
+
+def optimize_file(settings, regs, covered):
+    """Return the settings rewritten to the smallest equivalent registrations
+
+    covered holds (tool, check, env) run by files read earlier and is
+    extended with the ones this file still runs.
+    """
+    pre = [r for r in regs if r["event"] == "PreToolUse" and r["checks"] is not None]
+    needed = {}  # (check, env) -> tools
+    own = set()
+    kept_local = set()
+    # Project-local hooks first: kept as registered unless already covered
+    for reg in sorted(pre, key=lambda r: not r["local"]):
+        runs = {
+            (tool, check, tuple(sorted(relevant_env(check, reg["env"]).items())))
+            for tool in matcher_tools(reg["event"], reg["matcher"])
+            for check in applicable_checks(reg, tool)
+        }
+        if reg["local"]:
+            if runs - covered - own:
+                kept_local.add(reg["command"])
+                own |= runs
+            continue
+        for tool, check, env in runs - covered - own:
+            own.add((tool, check, env))
+            needed.setdefault((check, env), set()).add(tool)
+    covered |= own
+    recognized = {r["command"] for r in pre} - kept_local
+    pre = [r for r in pre if not r["local"]]
+
+    new_groups = {}  # matcher -> commands
+    for group in merge_checks([(check, dict(env)) for check, env in needed]):
+        env_by_check = dict(group)
+        per_tool = {}
+        for check, env in group:
+            for tool in needed[(check, tuple(sorted(env.items())))]:
+                per_tool.setdefault(tool, set()).add(check)
+        for checks, tools in merge_tools(per_tool):
+            command = command_for(checks, tools, env_by_check, pre)
+            new_groups.setdefault("|".join(tools), []).append(command)
+
+    # Keep everything else, minus identical entries repeated in the file
+    hooks = {}
+    seen = set()
+    for event, groups in (settings.get("hooks") or {}).items():
+        kept = []
+        for group in groups or []:
+            entries = []
+            for entry in group.get("hooks") or []:
+                if event == "PreToolUse" and entry.get("command") in recognized:
+                    if not set(entry) - {"type", "command"}:
+                        continue
+                entry_key = json.dumps(entry, sort_keys=True)
+                key = (event, group.get("matcher", ""), entry_key)
+                if key not in seen:
+                    seen.add(key)
+                    entries.append(entry)
+            if entries:
+                kept.append({**group, "hooks": entries})
+        if event == "PreToolUse":
+            kept += [
+                {
+                    "matcher": matcher,
+                    "hooks": [{"type": "command", "command": c} for c in commands],
+                }
+                for matcher, commands in new_groups.items()
+            ]
+        if kept:
+            hooks[event] = kept
+    if event_count(hooks) == event_count(settings.get("hooks") or {}):
+        return settings
+    return {**settings, "hooks": hooks}
+
+
+def event_count(hooks):
+    """(processes over all events and tools, hook entries) of a hooks dict"""
+    regs = list(registrations("", {"hooks": hooks}))
+    return sum(len(cmds) for cmds in spawn_table(regs).values()), len(regs)
+
+
+def load_sources(user_settings, project_dir):
+    """[(source, path, settings)] for the settings files that exist"""
+    paths = [("user", user_settings)]
+    if project_dir:
+        base = os.path.join(project_dir, ".claude")
+        paths += [
+            ("project", os.path.join(base, "settings.json")),
+            ("local", os.path.join(base, "settings.local.json")),
+        ]
+    sources, seen = [], set()
+    for source, path in paths:
+        real = os.path.realpath(path)
+        if real in seen or not os.path.isfile(path):
+            continue
+        seen.add(real)
+        with open(path, "r", encoding="utf-8") as f:
+            sources.append((source, path, json.load(f)))
+    return sources
+
+
+def print_table(table, own_ms):
+    print(f"{'event':<13} {'tool':<13} {'procs':>5} {'est. ms':>8}  runs")
+    for (event, tool), commands in sorted(table.items()):
+        counts = {}
+        for reg in commands.values():
+            for name in applicable_checks(reg, tool) or [reg["hook"] or "?"]:
+                counts[name] = counts.get(name, 0) + 1
+        runs = ", ".join(f"{n} x{c}" if c > 1 else n for n, c in counts.items())
+        total = sum(estimate_ms(reg, own_ms) for reg in commands.values())
+        print(f"{event:<13} {tool:<13} {len(commands):>5} {total:>8.1f}  {runs}")
+
+
+def duplicate_warnings(regs, table):
+    """Messages for entries registered twice and checks run by several processes"""
+    messages = []
+    counts = {}
+    for reg in regs:
+        key = (reg["source"], reg["event"], reg["matcher"], reg["command"])
+        counts[key] = counts.get(key, 0) + 1
+    for (source, event, _, command), count in counts.items():
+        if count > 1:
+            messages.append(f"{source} {event}: '{command}' registered {count} times")
+    for (event, tool), commands in sorted(table.items()):
+        runs = {}
+        for reg in commands.values():
+            for check in applicable_checks(reg, tool) or []:
+                runs[check] = runs.get(check, 0) + 1
+        for check, count in runs.items():
+            if count > 1:
+                messages.append(f"{event} {tool}: {check} runs in {count} processes")
+    return messages
+
+
+def write_settings(path, settings):
+    """Back up and atomically replace a settings file"""
+    shutil.copy2(path, path + ".bak")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--project",
+        default=os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd(),
+        help="Project whose .claude/settings*.json are read (default: cwd)",
+    )
+    parser.add_argument(
+        "--user-settings", default=DEFAULT_USER_SETTINGS, help="User settings file"
+    )
+    parser.add_argument(
+        "--telemetry-log",
+        default=hook_telemetry.log_path(),
+        help="hook_telemetry.py log used for per-hook latency",
+    )
+    parser.add_argument(
+        "--write", action="store_true", help="Rewrite the settings files in place"
+    )
+    args = parser.parse_args()
+
+    try:
+        sources = load_sources(args.user_settings, args.project)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Cannot read settings: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not sources:
+        print("[INFO] No settings files found")
+        return
+
+    own_ms = telemetry_p50(args.telemetry_log)
+    regs = []
+    print("Settings read:")
+    for source, path, settings in sources:
+        file_regs = list(registrations(source, settings, args.project))
+        regs += file_regs
+        print(f"  {source:<8} {path} ({len(file_regs)} hook commands)")
+    print()
+    table = spawn_table(regs)
+    print_table(table, own_ms)
+    for message in duplicate_warnings(regs, table):
+        print(f"[WARNING] {message}")
+
+    covered = set()
+    proposed, changed = [], []
+    for source, path, settings in sources:
+        file_regs = list(registrations(source, settings, args.project))
+        new = optimize_file(settings, file_regs, covered)
+        proposed.append((source, path, new))
+        if new is not settings:
+            changed.append((path, new))
+    if not changed:
+        print("\n[OK] Hook registrations are already minimal")
+        return
+
+    new_regs = [r for s, _, new in proposed for r in registrations(s, new)]
+    new_table = spawn_table(new_regs)
+    print("\nProposed registrations:")
+    print_table(new_table, own_ms)
+    before = sum(len(c) for c in table.values())
+    after = sum(len(c) for c in new_table.values())
+    print(f"\nProcesses over all events and tools: {before} -> {after}")
+    for path, new in changed:
+        if args.write:
+            write_settings(path, new)
+            print(f"Rewrote {path} (backup: {path}.bak)")
+        else:
+            print(f"Would rewrite {path}")
+    if not args.write:
+        print("Run with --write to apply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Edit-distance index for fuzzy typo detection in file names
+
+filename_ban_hook.py flags the misspellings listed in COMMON_TYPOS. For
+every other file name token this index finds the closest correctly
+spelled word, SymSpell style: each vocabulary word is stored under all
+the strings obtained by deleting up to MAX_DISTANCE characters, so a
+lookup generates the token's own deletions and probes them in a single
+query instead of comparing against every word. Candidates are confirmed
+with the optimal string alignment distance (a swap of two adjacent
+letters counts as one edit).
+
+The index is precomputed into sqlite files by an explicit build step, so a
+hook process only ever opens it:
+
+  ~/.claude/typo_index.sqlite        typo_vocabulary.WORDS
+                                     (python3 typo_index.py build); not
+                                     used while missing or older than
+                                     the list
+  <repo>/.claude/typo_index.sqlite   identifiers mined from the repository
+                                     (python3 typo_index.py mine <repo>),
+                                     used whenever it exists
+
+A token is only reported when it is at least MIN_TYPO_LENGTH letters, is not a
+known word (or a plural/-ed/-ing form of one), starts with the same letter
+as the suggestion, does not merely add or drop letters at either end of
+it (tokenize/tokenizer) or inflect the same stem (wrapped/wrapper) and has
+a single best suggestion. A token of up to 9 letters may differ by 1 edit,
+a longer one by 2; below SHORT_SUBSTITUTION letters that edit may not be
+a plain substitution (those/these).
+
+Configuration (read by filename_ban_hook.py):
+  TYPO_FUZZY=true            also look tokens up in the index (default: only
+                             COMMON_TYPOS)
+  TYPO_INDEX_PATH=...        vocabulary index (default ~/.claude/typo_index.sqlite)
+
+Usage: python3 typo_index.py build
+       python3 typo_index.py mine /path/to/repo [--min-count 2]
+       python3 typo_index.py lookup WORD... [--repo DIR]
+"""
+import argparse
+import collections
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+
+import typo_vocabulary
+
+DEFAULT_PATH = os.path.expanduser("~/.claude/typo_index.sqlite")
+REPO_INDEX = os.path.join(".claude", "typo_index.sqlite")
+# Bump when the schema or the deletion scheme changes
+INDEX_VERSION = 1
+MAX_DISTANCE = 2
+# Tokens shorter than this are not corrected by a single-letter substitution
+SHORT_SUBSTITUTION = 7
+
+# Identifier mining limits
+MINE_EXTENSIONS = set(
+    ".py .js .ts .jsx .tsx .java .go .rs .c .h .cc .cpp .hpp .cs .rb .php .swift"
+    " .kt .scala .m .jl .r .sh .md .rst .txt".split()
+)
+MINE_MAX_FILES = 5000
+MINE_MAX_BYTES = 512 * 1024
+IDENTIFIER = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+WORD_PART = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE words (word TEXT PRIMARY KEY, count INTEGER NOT NULL);
+CREATE TABLE deletes (key TEXT PRIMARY KEY, words TEXT NOT NULL);
+"""
+
+
+def deletions(word, distance):
+    """Every string made by deleting up to distance characters, word included"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {
+            w[:i] + w[i + 1 :] for w in frontier if len(w) > 1 for i in range(len(w))
+        }
+        found |= frontier
+    return found
+
+
+def osa_distance(a, b):
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps)"""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+def allowed_distance(token):
+    return 1 if len(token) < 10 else MAX_DISTANCE
+
+
+def is_affix_variant(token, word):
+    """True when one contains the other (tokenize/tokenizer, heapq/heap) or
+    both inflect the same stem (wrapped/wrapper)
+
+    Such pairs are usually distinct words, not typos of each other.
+    """
+    if token in word or word in token:
+        return True
+    forms = set(typo_vocabulary.word_forms(token))
+    return not forms.isdisjoint(typo_vocabulary.word_forms(word))
+
+
+def is_substitution(token, word):
+    """True when the two differ in exactly one position (quite/quote)"""
+    return len(token) == len(word) and sum(a != b for a, b in zip(token, word)) == 1
+
+
+def vocabulary_fingerprint(counts):
+    """Cheap checksum of a word list, compared on every open of the index"""
+    text = " ".join(f"{word}:{counts[word]}" for word in sorted(counts))
+    return f"{INDEX_VERSION}:{MAX_DISTANCE}:{zlib.crc32(text.encode()):08x}"
+
+
+def build_index(path, counts):
+    """Write an index of {word: count} to path (atomically)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    buckets = collections.defaultdict(list)
+    for word in counts:
+        for key in deletions(word, MAX_DISTANCE):
+            buckets[key].append(word)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        db = sqlite3.connect(tmp)
+        db.executescript(SCHEMA)
+        db.executemany("INSERT INTO words VALUES (?, ?)", counts.items())
+        db.executemany(
+            "INSERT INTO deletes VALUES (?, ?)",
+            ((key, " ".join(words)) for key, words in buckets.items()),
+        )
+        db.execute(
+            "INSERT INTO meta VALUES ('fingerprint', ?)",
+            (vocabulary_fingerprint(counts),),
+        )
+        db.commit()
+        db.close()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path
+
+
+class TypoIndex:
+    """Read-only view of one index file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def fingerprint(self):
+        row = self.db.execute(
+            "SELECT value FROM meta WHERE key = 'fingerprint'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def known(self, words):
+        """The subset of words present in the index"""
+        words = list(words)
+        marks = ",".join("?" * len(words))
+        rows = self.db.execute(
+            f"SELECT word FROM words WHERE word IN ({marks})", words
+        ).fetchall()
+        return {word for (word,) in rows}
+
+    def candidates(self, token, distance):
+        """{word: count} for words sharing a deletion with the token"""
+        keys = list(deletions(token, distance))
+        marks = ",".join("?" * len(keys))
+        words = set()
+        for (joined,) in self.db.execute(
+            f"SELECT words FROM deletes WHERE key IN ({marks})", keys
+        ):
+            words.update(joined.split())
+        if not words:
+            return {}
+        marks = ",".join("?" * len(words))
+        return dict(
+            self.db.execute(
+                f"SELECT word, count FROM words WHERE word IN ({marks})", list(words)
+            ).fetchall()
+        )
+
+
+# Open indexes by path and stamp, shared by every call in this process
+_indexes = {}
+
+
+def open_index(path):
+    """Open an index, reopening it after it was rebuilt; None if missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_ino, st.st_mtime_ns)
+    cached = _indexes.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            cached = _indexes[path] = (stamp, TypoIndex(path))
+        except sqlite3.Error:
+            return None
+    return cached[1]
+
+
+def vocabulary_counts():
+    return dict.fromkeys(typo_vocabulary.WORDS, 1)
+
+
+_base_fingerprint = []
+
+
+def base_fingerprint():
+    """Fingerprint of typo_vocabulary.WORDS, computed once per process"""
+    if not _base_fingerprint:
+        _base_fingerprint.append(vocabulary_fingerprint(vocabulary_counts()))
+    return _base_fingerprint[0]
+
+
+def base_index_path():
+    return os.environ.get("TYPO_INDEX_PATH") or DEFAULT_PATH
+
+
+def base_index():
+    """The vocabulary index, or None until `build` has written a current one
+
+    Building takes far longer than a hook call, so it is never done here.
+    """
+    path = base_index_path()
+    index = open_index(path)
+    try:
+        if index is not None and index.fingerprint() == base_fingerprint():
+            return index
+    except sqlite3.Error:
+        pass
+    state = "missing" if index is None else "out of date"
+    print(
+        f"[WARNING] Typo index {path} is {state}, fuzzy typo check skipped "
+        "(run: python3 typo_index.py build)",
+        file=sys.stderr,
+    )
+    return None
+
+
+def repo_index_path(root=None):
+    root = root or os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    return os.path.join(root, REPO_INDEX)
+
+
+def indexes(root=None):
+    """Indexes to consult: the vocabulary and, if mined, the repository"""
+    found = [base_index()]
+    found.append(open_index(repo_index_path(root)))
+    return [index for index in found if index is not None]
+
+
+def index_stamp(path):
+    """Stamp of an index file (part of the verdict cache key)"""
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def is_known(token, found_indexes):
+    if typo_vocabulary.is_known(token):
+        return True
+    forms = set(typo_vocabulary.word_forms(token))
+    return any(index.known(forms) for index in found_indexes)
+
+
+def suggest(token, found_indexes=None):
+    """The single closest known word for a misspelled token, or None"""
+    token = token.lower()
+    if len(token) < typo_vocabulary.MIN_TYPO_LENGTH or not token.isalpha():
+        return None
+    if typo_vocabulary.is_known(token):
+        return None
+    if found_indexes is None:
+        found_indexes = indexes()
+    if not found_indexes or is_known(token, found_indexes):
+        return None
+
+    distance = allowed_distance(token)
+    counts = {}
+    for index in found_indexes:
+        for word, count in index.candidates(token, distance).items():
+            counts[word] = counts.get(word, 0) + count
+
+    best = []
+    for word, count in counts.items():
+        if word[0] != token[0] or is_affix_variant(token, word):
+            continue
+        # Short words one letter apart are too often both real (those/these)
+        if len(token) < SHORT_SUBSTITUTION and is_substitution(token, word):
+            continue
+        d = osa_distance(token, word)
+        if d <= distance:
+            best.append((d, -count, word))
+    if not best:
+        return None
+    best.sort()
+    if len(best) > 1 and best[0][:2] == best[1][:2]:
+        return None  # Ambiguous: no single best correction
+    return best[0][2]
+
+
+def identifier_words(text):
+    """Lowercase words inside the identifiers of a text (snake and camel case)"""
+    for identifier in IDENTIFIER.findall(text):
+        for part in identifier.split("_"):
+            for word in WORD_PART.findall(part):
+                if len(word) >= typo_vocabulary.MIN_WORD_LENGTH:
+                    yield word.lower()
+
+
+def repo_files(root):
+    """Source files of a repository: git ls-files, else a directory walk"""
+    import subprocess
+
+    try:
+        out = subprocess.run(
+            ["git", "-C", root, "ls-files", "-z"],
+            capture_output=True,
+            check=True,
+        ).stdout
+        paths = [os.path.join(root, p) for p in os.fsdecode(out).split("\0") if p]
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            paths.extend(os.path.join(dirpath, f) for f in filenames)
+    return [p for p in paths if os.path.splitext(p)[1].lower() in MINE_EXTENSIONS]
+
+
+def mine_identifiers(root, min_count=2):
+    """{word: count} of identifier words used at least min_count times"""
+    counts = collections.Counter()
+    for path in repo_files(root)[:MINE_MAX_FILES]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                counts.update(identifier_words(f.read(MINE_MAX_BYTES)))
+        except OSError:
+            continue
+    return {word: n for word, n in counts.items() if n >= min_count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typo index for file names")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="Build the vocabulary index")
+    mine = commands.add_parser("mine", help="Index a repository's identifiers")
+    mine.add_argument("repo", help="Repository root")
+    mine.add_argument(
+        "--min-count",
+        type=int,
+        default=2,
+        help="Ignore words used fewer times (default 2, keeps one-off typos out)",
+    )
+    lookup = commands.add_parser("lookup", help="Suggest corrections")
+    lookup.add_argument("words", nargs="+")
+    lookup.add_argument("--repo", help="Also use this repository's index")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        path = build_index(base_index_path(), vocabulary_counts())
+        print(
+            f"Indexed {len(typo_vocabulary.WORDS)} words into {path} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+    elif args.command == "mine":
+        start = time.perf_counter()
+        counts = mine_identifiers(args.repo, args.min_count)
+        path = build_index(repo_index_path(args.repo), counts)
+        print(
+            f"Indexed {len(counts)} identifier words into {path} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+    else:
+        found = indexes(args.repo)
+        for word in args.words:
+            start = time.perf_counter()
+            correction = suggest(word, found)
+            elapsed = (time.perf_counter() - start) * 1e6
+            print(f"{word} -> {correction or '-'} ({elapsed:.0f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Vocabulary of correctly spelled programming words for typo_index.py
+
+Words that commonly appear in file names: software components, data and
+scientific computing terms, and everyday English. Tokens found here are
+never reported as typos; tokens close to one of them (and not found
+themselves) are. Identifiers mined from a repository extend this list
+per project (python3 typo_index.py mine /path/to/repo).
+
+Plurals and -ed/-ing/-er forms of these words are recognized without
+listing them. This module has no imports so the filename hook can check
+tokens against it before opening any index.
+"""
+
+MIN_WORD_LENGTH = 3
+# Shorter tokens (api, cli, db, ...) are never reported as typos
+MIN_TYPO_LENGTH = 5
+SUFFIXES = ("ing", "ers", "ies", "ed", "er", "es", "s")
+
+WORDS = frozenset(
+    """
+    abort about above absolute abstract accent accept access account
+    accumulate accuracy action activate active activity actor adapter adaptive
+    add address adjust admin advanced after again against agent aggregate
+    aggregator algebra algorithm alias align alive allocate allocator allow
+    almost alone along alpha already also alter always among analyse analysis
+    analytics analyze analyzer anchor angle animation annotate annotation
+    anomaly another answer apple apply approval approve approximate
+    approximation architecture archive area arena argument arguments around
+    array arrow article artifact ascii aspect assemble assembly assert
+    assertion asset assets assign assignment assistant async asynchronous
+    atomic attach attachment attention attribute audio audit authenticate
+    authentication author authorization authorize auto autocomplete automatic
+    automation available average away axios axis
+    back backend background backup badge balance balancer bandwidth banner
+    barrier base baseline basic basis batch bayesian beacon become before
+    begin behavior behaviour below benchmark beta better between billing
+    binary binding bitmap black blank blob block blog board body boolean boost
+    boot bootstrap border bottom bound boundary bracket branch breadcrumb
+    bridge broadcast broken broker browser bucket buffer build builder built
+    bulk bundle business button bytes
+    cache calculate calculator calendar callback camera campaign cancel
+    candidate cannot canvas capacity capture card cart cascade catalog
+    catalogue category caught cause cell center centre certificate chain
+    challenge change channel chapter char character chart chat check checker
+    checkout checkpoint checksum child chunk cipher circle circuit class
+    classic classification classifier classify clause clean cleaner cleanup
+    clear click client clipboard clock clone close closure cloud cluster
+    clustering code codec coefficient collapse collect collection collector
+    colon color colour column combine command comment commit common
+    communication compact compare comparison compat compatibility compile
+    compiler complete completion complex component compose composer composite
+    compress compression compressor computation compute concat concurrent
+    condition config configuration configure confirm conflict conform connect
+    connection connector console const constant constants constraint construct
+    construction constructor consumer contact container content context
+    continue contract control controller convenience convenient convention
+    convergence conversion convert converter convolution cookie coordinate
+    coordinator copy core corpus correct correction cost could count counter
+    country coupon course coverage create creator credential credit criteria
+    cron crop cross crypto csv currency cursor curve custom customer cycle
+    daemon daily dashboard data database dataframe dataloader dataset date
+    datetime deadline debug decide decimal decision declaration decode decoder
+    decomposition decorator decrypt default defect define definition delay
+    delete delivery delta demand dense dependency deploy deployment deprecated
+    depth derivative describe description descriptor deserialize design
+    desktop destination detail detect detection detector device diagnostic
+    diagnostics diagram dialog dictionary diff difference digest digit
+    dimension direct direction directory disable discount discovery disk
+    dispatch dispatcher display distance distribute distributed distribution
+    divide division docker document documentation domain double download draft
+    drag draw drawer driver drop dropdown dump duplicate duration dynamic
+    each early edge edit editor effect eigen eigenvalue eigenvector element
+    email embed embedding emit emitter empty enable encode encoder encrypt
+    encryption endpoint energy engine enhanced entity entry enum enumerate
+    environment equal equation error errors estimate estimator evaluate
+    evaluation evaluator event events every example exception exchange exclude
+    execute execution executor exercise exist exit exits expand expected
+    experiment expire explain explorer exponent export expression extend
+    extension external extract extractor
+    factor factorization factory fail failure fallback favourite feature
+    features feedback fetch fetcher field figure file filename filter final
+    finance find finder finish finite first fixture fixtures flag flash
+    flatten float flow flush focus fold folder follow font footer force
+    forecast foreign fork form formal format formatter former forward fourier
+    frame framework free frequency front frontend function functional
+    functions future
+    gallery game gateway gauge general generate generation generator generic
+    geometry gesture global glossary goal gradient graph graphics grid group
+    guard guess guest guide
+    handle handler hardware hash header heading health heap height helper
+    helpers hidden hierarchy highlight histogram history home hook hooks host
+    hotkey hover html http https
+    icon icons identifier identify identity idle ignore image images implement
+    implementation import importer include income increment indent index
+    indexer indicator infer inference info information init initial initialise
+    initialize initializer inject injector inline inner input insert inspect
+    inspector install installer instance instruction integer integral
+    integrate integration integrator intent interact interaction interactive
+    interface intermediate internal interpolate interpolation interpreter
+    intersection interval inventory invert invoice item items iterate
+    iteration iterative iterator
+    java javascript job join journal json jump
+    keep kernel keyboard keyword kind krylov
+    label lambda lanczos landing language large last latency later latest
+    latter launch launcher layer layout lazy leader learn learning least
+    legacy legend length level lexer library licence license lifecycle light
+    limit limiter line linear link linker list listener literal live load
+    loader local locale locate location lock logger logging logic login logout
+    longer lookup loop loss
+    machine macro mail main maintenance manage management manager manifest
+    manual map mapper mapping margin mark marker market markup mask master
+    match matcher material math matrix matter maximum measure medal media
+    median member memory menu merge mesh message meta metadata method metric
+    metrics micro middleware migrate migration minimum mirror miss mixin
+    mobile mock modal mode model models modified modify module modules modulo
+    modulus monitor monitoring month motion mount mouse move multigrid
+    multiple multiply mutation mutex
+    name namespace native navbar navigate navigation navigator nested network
+    neural never newer newton node noise nonlinear normal normalise normalize
+    notebook notes notice notification notify null number numeric numerical
+    object observable observer offset older online open operation operator
+    optimise optimize optimizer option optional options orchestrator order
+    ordering organization origin other outline output overlap overlay
+    overridden override owner
+    package packed packet padding page pager paginate pagination paint pair
+    palette panel parallel param parameter parameters parent parse parser
+    partial partition password patch path pattern pause payload payment peer
+    pending performance period permission persist persistence persistent phase
+    phone photo phrase pipeline pixel placeholder plain plan planner platform
+    player plot plugin point pointer policy poll polygon polynomial pool popup
+    port portal position post posterior precedence preconditioner predict
+    prediction predictor preference prefix preload prepare preprocess
+    preprocessing preprocessor present presenter preset prevent preview
+    previous price primary primitive print printer prior priority private
+    probability probe problem process processor produce producer product
+    profile profiler program progress project projection promise prompt
+    properly property proto protocol prototype provide provider proxy public
+    publish publisher pull purchase push
+    quadrature quality quantity query queue quick quiet quite quota quote
+    radius random range rank rate rating raw reader readme realtime reason
+    receipt receive receiver recent recipe record recorder recover recovery
+    rectangle recursive redirect reduce reducer reference refresh regard
+    region register registry regression regular relation relationship relay
+    release reload remote remove render renderer repeat replace replay reply
+    report reporter repository request require reset resize resolve resolver
+    resource response rest restore result results resume retry return review
+    reward rich right role root rotate route router routes routine row rule
+    rules runner runtime
+    safe sample sampler sampling sandbox save scale scan scanner scene
+    scheduler schema scheme scope score screen script scroll search second
+    secret section secure security seed segment select selection selector send
+    sender sensor sequence serial serialise serialize serializer series server
+    service session setting settings setup seven shader shape share shared
+    sharp shelf shell shift shipping short shortcut show sidebar signal
+    signature signup simple simply simulate simulation simulator since single
+    sink size sketch skip slice slide slider slot small snapshot socket
+    solution solve solver sort source space span sparse spawn spec special
+    spectral spectrum speed spinner split sprite stack stage standard start
+    state statement static statistic statistics status step stock storage
+    store strategy stream string strong structural structure stub student
+    style styles subject submit subscribe subscriber subscription suffix
+    suggest suggestion summary super supplier support surface switch symbol
+    sync synchronize syntax system
+    table tabs take taken target task teacher team telemetry temperature
+    template tenant tensor terminal test tester text texture theme there these
+    those thread three threshold thumbnail ticket tilde tile time timeline
+    timeout timer timestamp title toast toggle token tokenizer tool toolbar
+    tools tooltip topic total trace track tracker tracking trade trail trailer
+    train trainer training transaction transfer transform transformer
+    transition translate translation transport tree trend trick trigger
+    tutorial type types typing
+    under unique unit universal until update upload upstream usage user
+    username users util utility utils
+    valid validate validation validator value values variable variant vector
+    vendor verify version video view viewer viewport virtual visible
+    visualization visualize volume vote
+    waiter wallet warning watch watcher water weather webhook weight where
+    which while white whole widget width window wizard word work worker
+    workflow workspace world would wrapper write writer
+    yaml year
+    zone zoom
+    """.split()
+)
+
+
+def word_forms(token):
+    """The token and the words it could be an inflected form of"""
+    yield token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_WORD_LENGTH:
+            stem = token[: -len(suffix)]
+            yield stem
+            yield stem + "e"  # parsing -> parse
+            if suffix == "ies":
+                yield stem + "y"  # entries -> entry
+            if len(stem) > 1 and stem[-1] == stem[-2]:
+                yield stem[:-1]  # mapped -> map
+
+
+def is_known(token):
+    """True when the token or the word it inflects is in WORDS"""
+    return any(form in WORDS for form in word_forms(token))
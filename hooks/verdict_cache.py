@@ -0,0 +1,175 @@
+"""
+On-disk verdict cache for PreToolUse checks
+
+Agents often retry the same Write or Edit. dispatch_hook.py looks each
+check's verdict up here before running it. Hits replay the stored exit
+code, decision and diagnostics without evaluating anything.
+
+Only checks that define effective_config() are cached. The key covers:
+
+- the check name
+- its source file's stamp (so editing a hook invalidates its verdicts)
+- effective_config()
+- the working directory
+- whether the target file exists
+- the tool name and the full tool_input (path and content); for a
+  streamed payload, whose tool_input lacks the content, the digest of the
+  added text instead
+- the stamps of the ignore files that can exclude the path, nested
+  .gitignore files included (path_ignore.path_stamp())
+
+Entries live in one sqlite file and the least recently used beyond
+HOOK_VERDICT_CACHE_MAX are evicted.
+
+Configuration:
+  HOOK_VERDICT_CACHE=false        disable the cache
+  HOOK_VERDICT_CACHE_PATH=...     sqlite file (default ~/.claude/verdict_cache.sqlite)
+  HOOK_VERDICT_CACHE_MAX=5000     entries kept
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import path_ignore
+
+DEFAULT_PATH = os.path.expanduser("~/.claude/verdict_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    exit_code INTEGER NOT NULL,
+    decision TEXT,
+    stderr TEXT NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+def source_stamp(path):
+    """(mtime_ns, size) of a hook source, or of the bundle that contains it"""
+    while path:
+        try:
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent  # Inside a zipapp: stamp the archive
+    return None
+
+
+def verdict_key(name, module, data, content_digest=None):
+    """Return the cache key for running a check on a payload, or None"""
+    if not hasattr(module, "effective_config"):
+        return None
+    tool_input = data.get("tool_input") or {}
+    file_path = tool_input.get("file_path") or ""
+    payload = json.dumps(
+        [
+            name,
+            source_stamp(module.__file__),
+            module.effective_config(),
+            os.getcwd(),
+            bool(file_path) and os.path.exists(file_path),
+            data.get("tool_name", ""),
+            tool_input,
+            path_ignore.path_stamp(file_path) if path_ignore.enabled() else None,
+            content_digest,
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    digest = hashlib.blake2b(payload.encode("utf-8", "surrogatepass"), digest_size=16)
+    return digest.hexdigest()
+
+
+class VerdictCache:
+    """sqlite-backed verdict store with size-bounded LRU eviction
+
+    Any sqlite error disables the cache for the rest of the process; a
+    broken cache must never block or fail a hook.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.db = None
+        self.disabled = False
+
+    def connect(self):
+        if self.db is None and not self.disabled:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.db = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute("PRAGMA synchronous=OFF")
+                self.db.execute(SCHEMA)
+            except (OSError, sqlite3.Error):
+                self.disabled = True
+                self.db = None
+        return self.db
+
+    def get(self, key):
+        """Return (exit_code, decision, stderr) for key, or None"""
+        db = self.connect()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT exit_code, decision, stderr FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE verdicts SET used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            self.disabled, self.db = True, None
+            return None
+        exit_code, decision, stderr = row
+        return exit_code, json.loads(decision) if decision else None, stderr
+
+    def put(self, key, exit_code, decision, stderr):
+        """Store a verdict and evict the least recently used overflow"""
+        db = self.connect()
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    exit_code,
+                    json.dumps(decision, ensure_ascii=False) if decision else None,
+                    stderr,
+                    time.time(),
+                ),
+            )
+            (count,) = db.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+            if count > self.max_entries:
+                db.execute(
+                    "DELETE FROM verdicts WHERE key IN "
+                    "(SELECT key FROM verdicts ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+        except sqlite3.Error:
+            self.disabled, self.db = True, None
+
+
+# Open caches by path, shared by every dispatch in this process (hook_daemon)
+CACHES = {}
+
+
+def open_cache():
+    """Return the cache configured by the current environment"""
+    path = os.environ.get("HOOK_VERDICT_CACHE_PATH") or DEFAULT_PATH
+    cache = CACHES.get(path)
+    if cache is None:
+        max_entries = int(
+            os.environ.get("HOOK_VERDICT_CACHE_MAX", str(DEFAULT_MAX_ENTRIES))
+        )
+        cache = CACHES[path] = VerdictCache(path, max_entries)
+    return cache
@@ -2,19 +2,109 @@
 """
 Deploy 5-phase TDD workflow to target project
 
-Usage: python3 phase_manager.py --target /path/to/project [--force]
+Usage: python3 phase_manager.py --target /path/to/project [--force] [--bundle]
+       python3 phase_manager.py --targets-from repos.txt [--target 'src/*']
+                                [--jobs 8] [--summary results.json]
+
+With several targets (repeated --target, globs, or --targets-from with one
+path or glob per line) the projects are deployed by a bounded thread pool.
+Each target's log is printed as one block when it finishes, followed by a
+one-line status; --summary writes a JSON record per target ("-" for stdout).
+Re-running is safe: an existing current_phase is never reset unless
+--reset-phase. Redeploys are incremental: .claude/.template_manifest.json
+records what was written, so only templates that changed are rewritten
+(atomically), and files edited in the project are kept unless --force.
 """
 
 import argparse
+import concurrent.futures
+import glob
+import hashlib
+import io
 import json
 import os
-import shutil
+import stat
+import sys
+import threading
+import time
 from pathlib import Path
 
+# Hooks packed into .claude/hooks/phase_hooks.pyz by --bundle (entry -> module)
+BUNDLE_ENTRY_POINTS = {
+    "check_phase": "check_phase",
+    "protect_phase_file": "protect_phase_file",
+}
+BUNDLE_NAME = "phase_hooks.pyz"
+# Hash and stat of every template file written, relative to .claude/
+MANIFEST_NAME = ".template_manifest.json"
+# Serializes the sys.path change and import of build_bundle across threads
+BUILD_BUNDLE_LOCK = threading.Lock()
+# Phases and the files each one allows, read by check_phase.py
+POLICY_NAME = "phase_policy.json"
+# Last phase set through phase.py, checked by phase_watch.py
+PHASE_RECORD_NAME = ".phase_record"
+# Helper modules from the repository's hooks/ directory used by the phase hooks
+SHARED_HOOK_MODULES = ["hook_telemetry", "hook_payload"]
+# Per-target file counts kept by PhaseDeployer (and reported by --summary)
+STAT_FIELDS = ("copied", "unchanged", "skipped")
+
+
+def atomic_write(path, data, mode=0o644):
+    """Write data to path via a temporary file and rename"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def load_manifest(claude_dir):
+    """Return {relative path: entry} from the deployed manifest, or {}"""
+    try:
+        with open(claude_dir / MANIFEST_NAME, "r") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(claude_dir, files):
+    data = json.dumps({"version": 1, "files": files}, indent=2, sort_keys=True)
+    atomic_write(claude_dir / MANIFEST_NAME, data.encode() + b"\n")
+
+
+def manifest_entry(path, digest):
+    st = path.stat()
+    return {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def deployed_digest(path, entry):
+    """sha256 of a deployed file, or None if missing
+
+    When size and mtime still match the manifest the recorded hash is
+    trusted, so an unchanged fleet is checked with stat calls only.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if entry and (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+        return entry["sha256"]
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
 
 class PhaseDeployer:
-    def __init__(self, source_dir=None):
-        """Initialize deployer with source template directory"""
+    def __init__(self, source_dir=None, out=None):
+        """Initialize deployer with source template directory
+
+        Messages go to out (default stdout); fleet deployments give each
+        target its own buffer so concurrent logs do not interleave.
+        """
+        self.out = out if out is not None else sys.stdout
+        self.stats = dict.fromkeys(STAT_FIELDS, 0)
         if source_dir:
             self.source_dir = Path(source_dir)
         else:
@@ -26,6 +116,9 @@ class PhaseDeployer:
                 # Fallback to local_hooks/templates (common case when script is in temp/)
                 self.source_dir = script_parent.parent / "local_hooks" / "templates"
 
+    def log(self, *args):
+        print(*args, file=self.out)
+
     def validate_target(self, target_dir):
         """Validate target directory exists and is writable"""
         target_path = Path(target_dir)
@@ -49,49 +142,104 @@ class PhaseDeployer:
 
         return claude_dir, commands_dir, hooks_dir
 
-    def copy_templates(self, target_dir, force=False):
-        """Copy all template files to target directory"""
-        claude_dir, commands_dir, hooks_dir = self.create_directory_structure(
-            target_dir
-        )
+    def template_files(self, target_dir):
+        """Yield (source, path relative to .claude, rendered bytes, always)
 
-        # Copy hook templates
-        hooks_source = self.source_dir / "hooks"
-        for hook_file in hooks_source.glob("*.py"):
-            target_file = hooks_dir / hook_file.name
-            if target_file.exists() and not force:
-                print(
-                    f"Warning: {target_file} already exists, use --force to overwrite"
-                )
-                continue
-            shutil.copy2(hook_file, target_file)
-            print(f"Copied {hook_file.name} to {target_file}")
+        always marks files refreshed even when modified locally.
+        """
+        for hook_file in sorted((self.source_dir / "hooks").glob("*.py")):
+            yield hook_file, f"hooks/{hook_file.name}", hook_file.read_bytes(), False
+
+        # Shared helpers are always refreshed: they must match the hooks
+        for module in SHARED_HOOK_MODULES:
+            helper = self.repo_hooks_dir() / f"{module}.py"
+            if helper.exists():
+                yield helper, f"hooks/{helper.name}", helper.read_bytes(), True
 
-        # Copy command templates and replace {root} placeholder
-        commands_source = self.source_dir / "commands"
+        # The phase policy read by check_phase.py
+        policy_source = self.source_dir / POLICY_NAME
+        yield policy_source, POLICY_NAME, policy_source.read_bytes(), False
+
+        # Command templates with the {root} placeholder replaced
         target_root = str(Path(target_dir).resolve())
+        for command_file in sorted((self.source_dir / "commands").glob("*.md")):
+            content = command_file.read_text().replace("{root}", target_root)
+            yield command_file, f"commands/{command_file.name}", content.encode(), False
 
-        for command_file in commands_source.glob("*.md"):
-            target_file = commands_dir / command_file.name
-            if target_file.exists() and not force:
-                print(
-                    f"Warning: {target_file} already exists, use --force to overwrite"
+    def copy_templates(self, target_dir, force=False):
+        """Sync all template files into target, rewriting only what changed
+
+        The manifest records the hash and stat of every file written. A
+        deployed file whose content already matches its template is left
+        alone (no write, no mtime change); one still matching the manifest
+        was not touched locally and is upgraded; anything else was edited in
+        the project and is kept unless force.
+        """
+        claude_dir, _, _ = self.create_directory_structure(target_dir)
+        manifest = load_manifest(claude_dir)
+        new_manifest = {}
+
+        for source, rel, data, always in self.template_files(target_dir):
+            target_file = claude_dir / rel
+            entry = manifest.get(rel)
+            digest = hashlib.sha256(data).hexdigest()
+            current = deployed_digest(target_file, entry)
+
+            if current == digest:
+                self.stats["unchanged"] += 1
+            elif current is not None and not (force or always) and (
+                entry is None or current != entry["sha256"]
+            ):
+                self.log(
+                    f"Warning: {target_file} was modified locally, "
+                    "use --force to overwrite"
                 )
+                self.stats["skipped"] += 1
+                if entry is not None:
+                    new_manifest[rel] = entry
                 continue
+            else:
+                atomic_write(target_file, data, stat.S_IMODE(source.stat().st_mode))
+                verb = "Copied" if current is None else "Updated"
+                self.log(f"{verb} {source.name} to {target_file}")
+                self.stats["copied"] += 1
+            new_manifest[rel] = manifest_entry(target_file, digest)
+
+        save_manifest(claude_dir, new_manifest)
+        if self.stats["unchanged"]:
+            self.log(f"{self.stats['unchanged']} template files already up to date")
+        return claude_dir
 
-            # Read template and replace {root} placeholder
-            with open(command_file, "r") as f:
-                content = f.read()
-            content = content.replace("{root}", target_root)
-
-            # Write to target
-            with open(target_file, "w") as f:
-                f.write(content)
-            print(f"Copied {command_file.name} to {target_file}")
+    def repo_hooks_dir(self):
+        """The repository's hooks/ directory (build_bundle.py, shared helpers)"""
+        return self.source_dir.parent.parent / "hooks"
+
+    def build_hook_bundle(self, target_dir):
+        """Pack the deployed hooks into one precompiled zipapp"""
+        with BUILD_BUNDLE_LOCK:
+            if str(self.repo_hooks_dir()) not in sys.path:
+                sys.path.insert(0, str(self.repo_hooks_dir()))
+            import build_bundle
+
+        hooks_dir = Path(target_dir) / ".claude" / "hooks"
+        sources = {
+            module: str(hooks_dir / f"{module}.py")
+            for module in [*BUNDLE_ENTRY_POINTS.values(), *SHARED_HOOK_MODULES]
+            if (hooks_dir / f"{module}.py").exists()
+        }
+        bundle_path = build_bundle.write_bundle(
+            sources, str(hooks_dir / BUNDLE_NAME), BUNDLE_ENTRY_POINTS
+        )
+        self.log(f"Built {bundle_path}")
+        return bundle_path
 
-        return claude_dir
+    def hook_command(self, target_root, hook, bundle=False):
+        """Return the settings command that runs one deployed hook"""
+        if bundle:
+            return f"python3 -I -S {target_root}/.claude/hooks/{BUNDLE_NAME} {hook}"
+        return f"python3 {target_root}/.claude/hooks/{hook}.py"
 
-    def update_settings_local(self, target_dir):
+    def update_settings_local(self, target_dir, bundle=False):
         """Update or create settings.local.json with hook configuration"""
         settings_file = Path(target_dir) / ".claude" / "settings.local.json"
         target_root = str(Path(target_dir).resolve())
@@ -105,11 +253,15 @@ class PhaseDeployer:
                         "hooks": [
                             {
                                 "type": "command",
-                                "command": f"python3 {target_root}/.claude/hooks/check_phase.py",
+                                "command": self.hook_command(
+                                    target_root, "check_phase", bundle
+                                ),
                             },
                             {
                                 "type": "command",
-                                "command": f"python3 {target_root}/.claude/hooks/protect_phase_file.py",
+                                "command": self.hook_command(
+                                    target_root, "protect_phase_file", bundle
+                                ),
                             },
                         ],
                     }
@@ -118,34 +270,58 @@ class PhaseDeployer:
         }
 
         # Read existing settings if present
+        existing_text = None
         if settings_file.exists():
-            with open(settings_file, "r") as f:
-                existing_config = json.load(f)
+            existing_text = settings_file.read_text()
+            existing_config = json.loads(existing_text)
         else:
             existing_config = {}
 
-        # Merge configurations
-        existing_config.update(hooks_config)
-
-        # Write updated settings
-        with open(settings_file, "w") as f:
-            json.dump(existing_config, f, indent=2)
-
-        print(f"Updated {settings_file}")
+        # Merge: replace earlier registrations of the phase hooks, keep the rest
+        ours = {
+            self.hook_command(target_root, hook, use_bundle)
+            for hook in BUNDLE_ENTRY_POINTS
+            for use_bundle in (False, True)
+        }
+        hooks = existing_config.setdefault("hooks", {})
+        groups = []
+        for group in hooks.get("PreToolUse", []):
+            entries = [
+                h for h in group.get("hooks", []) if h.get("command") not in ours
+            ]
+            if entries:
+                groups.append({**group, "hooks": entries})
+        hooks["PreToolUse"] = groups + hooks_config["hooks"]["PreToolUse"]
+
+        # Write updated settings, only when they changed
+        text = json.dumps(existing_config, indent=2)
+        if text == existing_text:
+            self.log(f"{settings_file} already up to date")
+        else:
+            atomic_write(settings_file, text.encode())
+            self.log(f"Updated {settings_file}")
         return settings_file
 
-    def initialize_phase_file(self, target_dir):
-        """Initialize current_phase file"""
+    def initialize_phase_file(self, target_dir, reset=False):
+        """Initialize current_phase file, keeping an existing phase unless reset"""
         phase_file = Path(target_dir) / ".claude" / "current_phase"
+        if phase_file.exists() and not reset:
+            phase = phase_file.read_text().strip()
+            self.log(f"Kept {phase_file} at '{phase}' phase")
+            return phase_file
+        # Record it first so a running phase_watch.py accepts the change
+        record = {"phase": "explore", "ts": round(time.time(), 3)}
+        record_file = phase_file.with_name(PHASE_RECORD_NAME)
+        atomic_write(record_file, json.dumps(record).encode())
         with open(phase_file, "w") as f:
             f.write("explore\n")
-        print(f"Initialized {phase_file} with 'explore' phase")
+        self.log(f"Initialized {phase_file} with 'explore' phase")
         return phase_file
 
-    def deploy(self, target_dir, force=False):
+    def deploy(self, target_dir, force=False, bundle=False, reset_phase=False):
         """Main deployment method"""
-        print(f"Deploying 5-phase TDD workflow to: {target_dir}")
-        print("=" * 60)
+        self.log(f"Deploying 5-phase TDD workflow to: {target_dir}")
+        self.log("=" * 60)
 
         # Validate target
         self.validate_target(target_dir)
@@ -153,39 +329,132 @@ class PhaseDeployer:
         # Copy templates
         claude_dir = self.copy_templates(target_dir, force)
 
+        # Optionally pack the hooks into a precompiled bundle
+        # (rebuilt only when a hook changed, like the templates)
+        bundle_file = Path(target_dir) / ".claude" / "hooks" / BUNDLE_NAME
+        if bundle and (self.stats["copied"] or not bundle_file.exists()):
+            self.build_hook_bundle(target_dir)
+
         # Update settings
-        settings_file = self.update_settings_local(target_dir)
+        settings_file = self.update_settings_local(target_dir, bundle)
 
         # Initialize phase
-        phase_file = self.initialize_phase_file(target_dir)
+        phase_file = self.initialize_phase_file(target_dir, reset_phase)
 
         # Success message
-        print("=" * 60)
-        print("✅ Phase system deployed successfully!")
-        print()
-        print("Generated 5-phase TDD workflow:")
-        print("  1. EXPLORE   - Read-only analysis")
-        print("  2. PLAN      - Design and planning (markdown only)")
-        print("  3. TESTDESIGN - Write failing tests (TDD Red step)")
-        print("  4. CODE      - Implement code (TDD Green/Refactor steps)")
-        print("  5. SANDBOX   - Integration testing (temp/ directory only)")
-        print()
-        print("🔧 Configuration:")
-        print(f"  Settings: {settings_file}")
-        print(f"  Phase file: {phase_file}")
-        print(f"  Commands: {claude_dir}/commands/")
-        print(f"  Hooks: {claude_dir}/hooks/")
-        print()
-        print("📝 Next steps:")
-        print("  1. Restart Claude Code to load new settings")
-        print("  2. Use /phase_01_explore, /phase_02_plan, etc. commands")
-        print("  3. Current phase: EXPLORE")
-        print()
-        print("Both hooks ensure:")
-        print("  • check_phase.py     - Enforces file editing permissions per phase")
-        print(
+        self.log("=" * 60)
+        self.log("✅ Phase system deployed successfully!")
+        self.log()
+        self.log("Generated 5-phase TDD workflow:")
+        self.log("  1. EXPLORE   - Read-only analysis")
+        self.log("  2. PLAN      - Design and planning (markdown only)")
+        self.log("  3. TESTDESIGN - Write failing tests (TDD Red step)")
+        self.log("  4. CODE      - Implement code (TDD Green/Refactor steps)")
+        self.log("  5. SANDBOX   - Integration testing (temp/ directory only)")
+        self.log()
+        self.log("🔧 Configuration:")
+        self.log(f"  Settings: {settings_file}")
+        self.log(f"  Phase file: {phase_file}")
+        self.log(f"  Phase policy: {claude_dir}/{POLICY_NAME}")
+        self.log(f"  Commands: {claude_dir}/commands/")
+        self.log(f"  Hooks: {claude_dir}/hooks/")
+        self.log()
+        self.log("📝 Next steps:")
+        self.log("  1. Restart Claude Code to load new settings")
+        self.log("  2. Use /phase_01_explore, /phase_02_plan, etc. commands")
+        self.log(f"  3. Current phase: {phase_file.read_text().strip().upper()}")
+        self.log()
+        self.log("Both hooks ensure:")
+        self.log("  • check_phase.py     - Enforces file editing permissions per phase")
+        self.log(
             "  • protect_phase_file.py - Prevents direct modification of current_phase"
         )
+        self.log(
+            "Optional: run .claude/hooks/phase_watch.py in the background to also "
+            "catch phase changes made through Bash"
+        )
+
+
+def read_targets_file(path):
+    """Read target paths or globs, one per line ('#' comments, '-' for stdin)"""
+    f = sys.stdin if path == "-" else open(path, "r")
+    try:
+        lines = [line.strip() for line in f]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def expand_targets(patterns):
+    """Expand globs into unique directories, in order
+
+    Returns (targets, unmatched): patterns matching nothing are reported as
+    failures rather than silently dropped.
+    """
+    targets, unmatched, seen = [], [], set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if glob.has_magic(pattern):
+            matches = sorted(p for p in glob.glob(pattern) if os.path.isdir(p))
+        else:
+            matches = [pattern]
+        if not matches:
+            unmatched.append(pattern)
+        for match in matches:
+            key = os.path.realpath(match)
+            if key not in seen:
+                seen.add(key)
+                targets.append(match)
+    return targets, unmatched
+
+
+def target_record(target, status="deployed", error=None):
+    """A --summary record; every target gets the same fields"""
+    record = {"target": target, "status": status, "error": error}
+    record.update(dict.fromkeys(STAT_FIELDS, 0), seconds=0.0, log="")
+    return record
+
+
+def deploy_one(target, force=False, bundle=False, reset_phase=False):
+    """Deploy one target with its log captured, returning its result record"""
+    out = io.StringIO()
+    deployer = PhaseDeployer(out=out)
+    start = time.monotonic()
+    record = target_record(target)
+    try:
+        deployer.deploy(target, force, bundle, reset_phase)
+    except Exception as e:
+        record.update(status="failed", error=f"{type(e).__name__}: {e}")
+    record.update(
+        deployer.stats, seconds=round(time.monotonic() - start, 3), log=out.getvalue()
+    )
+    return record
+
+
+def deploy_fleet(targets, jobs, force=False, bundle=False, reset_phase=False):
+    """Deploy many targets with a bounded thread pool, yielding records as done"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(deploy_one, target, force, bundle, reset_phase)
+            for target in targets
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def write_summary(records, path):
+    summary = {
+        "deployed": sum(r["status"] == "deployed" for r in records),
+        "failed": sum(r["status"] == "failed" for r in records),
+        "targets": records,
+    }
+    if path == "-":
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
 
 
 def main():
@@ -194,19 +463,84 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
-        "--target", "-t", required=True, help="Target project directory"
+        "--target",
+        "-t",
+        action="append",
+        default=[],
+        help="Target project directory or glob (repeatable)",
+    )
+    parser.add_argument(
+        "--targets-from",
+        metavar="FILE",
+        help="File with one target directory or glob per line ('-' for stdin)",
     )
     parser.add_argument(
         "--force", "-f", action="store_true", help="Overwrite existing files"
     )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="Run hooks from a precompiled zipapp with isolated interpreter flags",
+    )
+    parser.add_argument(
+        "--reset-phase",
+        action="store_true",
+        help="Reset current_phase to explore even if the project already has one",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=8, help="Targets deployed in parallel"
+    )
+    parser.add_argument(
+        "--summary", metavar="FILE", help="Write per-target results as JSON ('-')"
+    )
 
     args = parser.parse_args()
 
-    try:
-        deployer = PhaseDeployer()
-        deployer.deploy(args.target, args.force)
-    except Exception as e:
-        print(f"❌ Deployment failed: {e}")
+    patterns = list(args.target)
+    if args.targets_from:
+        patterns += read_targets_file(args.targets_from)
+    if not patterns:
+        parser.error("no targets: use --target or --targets-from")
+    targets, unmatched = expand_targets(patterns)
+
+    # A single target keeps the interactive output
+    if len(targets) == 1 and not unmatched and not args.summary:
+        try:
+            deployer = PhaseDeployer()
+            deployer.deploy(targets[0], args.force, args.bundle, args.reset_phase)
+        except Exception as e:
+            print(f"❌ Deployment failed: {e}")
+            exit(1)
+        return
+
+    records = [
+        target_record(pattern, "failed", "no matching directories")
+        for pattern in unmatched
+    ]
+    # Logs go to stderr when the summary itself is written to stdout
+    stream = sys.stderr if args.summary == "-" else sys.stdout
+    for record in records:
+        print(f"❌ {record['target']}: {record['error']}", file=stream)
+    jobs = max(1, min(args.jobs, len(targets)))
+    for record in deploy_fleet(
+        targets, jobs, args.force, args.bundle, args.reset_phase
+    ):
+        records.append(record)
+        stream.write(record["log"])
+        if record["status"] == "deployed":
+            print(f"✅ {record['target']} ({record['seconds']}s)", file=stream)
+        else:
+            print(f"❌ {record['target']}: {record['error']}", file=stream)
+        stream.flush()
+
+    failed = sum(r["status"] == "failed" for r in records)
+    print(
+        f"\nDeployed {len(records) - failed}/{len(records)} targets, {failed} failed",
+        file=stream,
+    )
+    if args.summary:
+        write_summary(records, args.summary)
+    if failed:
         exit(1)
 
 
@@ -2,189 +2,266 @@
 """
 Claude Code PreToolUse Hook - Phase-based operation control
 Controls what operations are allowed in each development phase
+
+Phases and the files they allow are defined in .claude/phase_policy.json
+(deployed by phase_manager.py). Each phase lists "allow" rules matching
+any of:
+  names        file names, case-insensitive ("TODO.md")
+  extensions   file extensions (".md")
+  dirs         directory names anywhere in the path ("tests")
+  globs        fnmatch patterns; with a "/" they match the path relative to
+               the project, otherwise the file name ("src/*/test_*.py")
+  all          true to allow every file
+plus the "title", "reason" and "help" lines shown when a file is blocked.
+The policy is compiled into lookup tables and one regex per glob kind, so
+the cost of a check does not grow with the number of rules. The tables and
+regex sources are marshalled to .claude/phase_policy.marshal keyed by the
+policy file's (mtime, size), so each hook process reads them in one go and
+only compiles the current phase's regexes, when a lookup reaches them.
 """
+import fnmatch
 import json
+import marshal
 import os
+import re
 import sys
-from pathlib import Path
+
+try:
+    import hook_telemetry  # Copied next to the hooks by phase_manager.py
+except ImportError:
+    hook_telemetry = None
+try:
+    from hook_payload import read_payload  # Copied like hook_telemetry
+except ImportError:
+    read_payload = None
+
+
+# Last phase read, keyed by the phase file's mtime (reused by long-lived hosts)
+_phase_cache = {"mtime": None, "phase": None}
+# Last compiled policy, keyed by the policy file's (mtime, size)
+_policy_cache = {"stamp": None, "policy": None}
+
+POLICY_FILE = "phase_policy.json"
+POLICY_CACHE_FILE = "phase_policy.marshal"
+CACHE_VERSION = 1
+
+
+def get_hooks_dir():
+    """Return the .claude/hooks directory, also when running from a bundle"""
+    hooks_dir = os.path.dirname(os.path.abspath(__file__))
+    # Inside a zipapp bundle __file__ points into the archive
+    while hooks_dir and not os.path.isdir(hooks_dir):
+        hooks_dir = os.path.dirname(hooks_dir)
+    return hooks_dir
 
 
 def get_current_phase():
-    phase_file = os.path.join(os.path.dirname(__file__), "../current_phase")
+    phase_file = os.path.join(get_hooks_dir(), "../current_phase")
     try:
+        mtime = os.stat(phase_file).st_mtime_ns
+        if _phase_cache["mtime"] == mtime:
+            return _phase_cache["phase"]
         with open(phase_file, "r") as f:
             phase = f.read().strip().lower()
-            return phase
+        _phase_cache.update(mtime=mtime, phase=phase)
+        return phase
     except Exception as e:
         print(f"[ERROR] Failed to read phase file: {e}", file=sys.stderr)
         return "unknown"
 
 
-def is_markdown_file(filepath):
-    """Check if the file is a markdown file"""
-    return filepath.lower().endswith(".md")
+def compile_globs(globs):
+    """Join (glob, label) pairs into one regex source and {group: label}
 
+    The regex is matched with match().lastgroup to find the label.
+    """
+    if not globs:
+        return None
+    source = "|".join(
+        f"(?P<r{i}>{fnmatch.translate(glob)})" for i, (glob, _) in enumerate(globs)
+    )
+    return source, {f"r{i}": label for i, (_, label) in enumerate(globs)}
 
-def is_explore_file(filepath):
-    """Check if the file is DESIGN.md, QUALITY.md, TODO.md, or CLAUDE.md (allowed in explore phase)"""
-    filename = os.path.basename(filepath).upper()
-    return filename in ["DESIGN.MD", "QUALITY.MD", "TODO.MD", "CLAUDE.MD"]
 
+def compile_phase(name, spec):
+    """Compile one phase's allow rules into plain tables (marshal-able)"""
+    table = {
+        "title": spec.get("title", f"File blocked in {name} phase"),
+        "reason": spec.get("reason", f"File not allowed in {name} phase"),
+        "help": list(spec.get("help", [])),
+        "allow_all": None,
+        "names": {},
+        "extensions": {},
+        "dirs": {},
+    }
+    path_globs, name_globs = [], []
 
-def is_test_file(filepath):
-    """Check if the file is in any tests directory (anywhere in path)"""
-    return "/tests/" in filepath or filepath.startswith("tests/")
+    for rule in spec.get("allow", []):
+        label = rule.get("label", "File")
+        if rule.get("all") and table["allow_all"] is None:
+            table["allow_all"] = label
+        for filename in rule.get("names", []):
+            table["names"].setdefault(filename.upper(), label)
+        for ext in rule.get("extensions", []):
+            table["extensions"].setdefault(ext.lower(), label)
+        for directory in rule.get("dirs", []):
+            table["dirs"].setdefault(directory.strip("/"), label)
+        for glob in rule.get("globs", []):
+            (path_globs if "/" in glob else name_globs).append((glob, label))
 
+    table["path_globs"] = compile_globs(path_globs)
+    table["name_globs"] = compile_globs(name_globs)
+    return table
 
-def is_temp_file(filepath):
-    """Check if the file is in any temp directory (anywhere in path)"""
-    return "/temp/" in filepath or filepath.startswith("temp/")
 
+class PhaseRules:
+    """One phase's compiled allow rules, for constant-time lookups"""
 
-def main():
-    if sys.stdin.isatty():
-        print("[ERROR] No input data received", file=sys.stderr)
-        sys.exit(1)
-    try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
-        sys.exit(1)
-    tool_input = data.get("tool_input", {})
-    file_path = tool_input.get("file_path", "")
-    tool_name = data.get("tool_name", "")
-    current_phase = get_current_phase()
-    print(f"[INFO] Current phase: {current_phase}", file=sys.stderr)
-    if not file_path:
-        print("[OK] No file path to check", file=sys.stderr)
-        sys.exit(0)
-    if current_phase == "explore":
-        if not is_explore_file(file_path):
-            error_message = f"""
-[ERROR] File blocked in explore phase
+    def __init__(self, name, table):
+        self.name = name
+        self.title = table["title"]
+        self.reason = table["reason"]
+        self.help = table["help"]
+        self.allow_all = table["allow_all"]
+        self.names = table["names"]
+        self.extensions = table["extensions"]
+        self.dirs = table["dirs"]
+        self.path_globs = table["path_globs"]
+        self.name_globs = table["name_globs"]
+        self.patterns = {}
 
-Current phase: {current_phase}
-Attempted operation on: {file_path}
+    def glob_label(self, kind, text):
+        """Label of the first glob of a kind ("path_globs"/"name_globs") matching"""
+        globs = getattr(self, kind)
+        if globs is None:
+            return None
+        pattern = self.patterns.get(kind)
+        if pattern is None:
+            pattern = self.patterns[kind] = re.compile(globs[0])
+        m = pattern.match(text)
+        return m and globs[1][m.lastgroup]
 
-In explore phase, only these files can be modified:
-- TODO.md (mark items as [COMPLETED] or [OBSOLETE] only)
-- QUALITY.md (mark [RESOLVED] and add new issues)
-- DESIGN.md (update architecture understanding)
-- CLAUDE.md (project instructions and AI guidance)
+    def match(self, filepath, relpath):
+        """Return the label of the first kind of rule allowing filepath, or None"""
+        if self.allow_all is not None:
+            return self.allow_all
+        parts = filepath.replace(os.sep, "/").split("/")
+        filename = parts[-1]
 
-To modify other files:
-1. Change to 'plan' for other markdown files
-2. Change to 'testdesign' for test files
-3. Change to 'code' for implementation
+        label = self.names.get(filename.upper())
+        if label is None:
+            label = self.extensions.get(os.path.splitext(filename)[1].lower())
+        if label is None and self.dirs:
+            label = next((self.dirs[d] for d in parts[:-1] if d in self.dirs), None)
+        if label is None:
+            label = self.glob_label("name_globs", filename)
+        if label is None:
+            label = self.glob_label("path_globs", relpath)
+        return label or None
 
-To change phase, update: .claude/current_phase
-"""
-            print(error_message, file=sys.stderr)
-            decision = {
-                "decision": "block",
-                "reason": "Explore phase only allows TODO.md, QUALITY.md, DESIGN.md, and CLAUDE.md",
-            }
-            print(json.dumps(decision))
-            sys.exit(2)
-        else:
-            print(
-                f"[OK] {os.path.basename(file_path)} allowed in explore phase: {file_path}",
-                file=sys.stderr,
-            )
-    elif current_phase == "plan":
-        if not is_markdown_file(file_path):
-            error_message = f"""
-[ERROR] Non-markdown file blocked in plan phase
 
-Current phase: {current_phase}
-Attempted operation on: {file_path}
+def compile_policy(spec):
+    """Compile a parsed policy into {phase: table} (see compile_phase())"""
+    return {
+        name.lower(): compile_phase(name.lower(), phase)
+        for name, phase in spec.get("phases", {}).items()
+    }
 
-In plan phase, only markdown (.md) files are allowed.
-To modify other file types:
-1. Change to 'testdesign' for test files
-2. Change to 'code' for implementation
 
-To change phase, update: .claude/current_phase
-"""
-            print(error_message, file=sys.stderr)
-            decision = {
-                "decision": "block",
-                "reason": "Plan phase only allows markdown files",
-            }
-            print(json.dumps(decision))
-            sys.exit(2)
-        else:
-            print(
-                f"[OK] Markdown file allowed in plan phase: {file_path}",
-                file=sys.stderr,
-            )
-    elif current_phase == "testdesign":
-        if is_markdown_file(file_path):
-            print(
-                f"[OK] Markdown file allowed in testdesign phase: {file_path}",
-                file=sys.stderr,
-            )
-        elif is_test_file(file_path) or is_temp_file(file_path):
-            print(
-                f"[OK] Test/temp file allowed in testdesign phase: {file_path}",
-                file=sys.stderr,
-            )
-        else:
-            error_message = f"""
-[ERROR] Non-test/non-markdown file blocked in testdesign phase
+def source_stamp():
+    """(mtime_ns, size) of this file, or of the zipapp that contains it"""
+    path = os.path.abspath(__file__)
+    while path:
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+    return None
 
-Current phase: {current_phase}
-Attempted operation on: {file_path}
 
-In testdesign phase, only these files are allowed:
-1. Markdown files (.md) anywhere
-2. Files in any tests/ directory (e.g., tests/, src/tests/, project/tests/)
-3. Files in any temp/ directory (e.g., temp/, build/temp/, project/temp/)
+def read_policy_cache(path, key):
+    """Compiled tables stored under key, or None"""
+    try:
+        with open(path, "rb") as f:
+            cached_key, tables = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return tables if cached_key == key else None
 
-To modify implementation code, change phase to 'code'.
 
-To change phase, update: .claude/current_phase
-"""
-            print(error_message, file=sys.stderr)
-            decision = {
-                "decision": "block",
-                "reason": "Testdesign phase only allows markdown files and files in tests/ or temp/ directories",
-            }
-            print(json.dumps(decision))
-            sys.exit(2)
-    elif current_phase == "code":
-        print(f"[OK] All files allowed in code phase: {file_path}", file=sys.stderr)
-    elif current_phase == "sandbox":
-        if is_temp_file(file_path):
-            print(
-                f"[OK] File in temp/ directory allowed in sandbox phase: {file_path}",
-                file=sys.stderr,
-            )
-        else:
-            error_message = f"""
-[ERROR] File outside temp/ blocked in sandbox phase
+def write_policy_cache(path, key, tables):
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump((key, tables), f)
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        pass  # The policy is compiled again next time
 
-Current phase: {current_phase}
-Attempted operation on: {file_path}
 
-In sandbox phase, all operations must be confined to temp/ directories.
-Allowed: temp/, build/temp/, project/temp/, etc.
-To modify main project files, change phase to 'code'.
+def get_policy():
+    """Return the compiled phase policy, or None when it cannot be read"""
+    claude_dir = os.path.dirname(get_hooks_dir())
+    policy_file = os.path.join(claude_dir, POLICY_FILE)
+    try:
+        st = os.stat(policy_file)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _policy_cache["stamp"] == stamp:
+            return _policy_cache["policy"]
+        cache_file = os.path.join(claude_dir, POLICY_CACHE_FILE)
+        key = (CACHE_VERSION, sys.hexversion, stamp, source_stamp())
+        tables = read_policy_cache(cache_file, key)
+        if tables is None:
+            with open(policy_file, "r") as f:
+                tables = compile_policy(json.load(f))
+            write_policy_cache(cache_file, key, tables)
+        policy = {name: PhaseRules(name, table) for name, table in tables.items()}
+        _policy_cache.update(stamp=stamp, policy=policy)
+        return policy
+    except Exception as e:
+        print(f"[ERROR] Failed to read phase policy: {e}", file=sys.stderr)
+        return None
 
-To change phase, update: .claude/current_phase
-"""
-            print(error_message, file=sys.stderr)
-            decision = {
-                "decision": "block",
-                "reason": "Sandbox phase only allows operations in temp/ directory",
-            }
-            print(json.dumps(decision))
-            sys.exit(2)
-    else:
+
+def project_relpath(filepath):
+    """Path relative to the project root (the directory holding .claude)"""
+    root = os.path.dirname(os.path.dirname(get_hooks_dir()))
+    path = os.path.normpath(filepath)
+    if os.path.isabs(path) and path.startswith(root + os.sep):
+        path = os.path.relpath(path, root)
+    return path.replace(os.sep, "/")
+
+
+def run_hook(data):
+    """Evaluate a parsed hook payload and return (exit_code, decision)"""
+    tool_input = data.get("tool_input", {})
+    file_path = tool_input.get("file_path", "")
+    current_phase = get_current_phase()
+    print(f"[INFO] Current phase: {current_phase}", file=sys.stderr)
+    if not file_path:
+        print("[OK] No file path to check", file=sys.stderr)
+        return 0, None
+
+    policy = get_policy()
+    if policy is None:
+        decision = {
+            "decision": "block",
+            "reason": f"Phase policy .claude/{POLICY_FILE} is missing or invalid. "
+            "Redeploy it with phase_manager.py --force",
+        }
+        return 2, decision
+
+    rules = policy.get(current_phase)
+    if rules is None:
+        phases = ", ".join(policy)
         error_message = f"""
 [ERROR] Unknown phase: {current_phase}
 
-Valid phases are: explore, plan, testdesign, code, sandbox
+Valid phases are: {phases}
 Current phase file: .claude/current_phase
 
 Please set a valid phase to continue.
@@ -192,11 +269,59 @@ Please set a valid phase to continue.
         print(error_message, file=sys.stderr)
         decision = {
             "decision": "block",
-            "reason": f"Unknown phase: {current_phase}. Use: explore, plan, testdesign, code, or sandbox",
+            "reason": f"Unknown phase: {current_phase}. Use: {phases}",
         }
+        return 2, decision
+
+    label = rules.match(file_path, project_relpath(file_path))
+    if label is not None:
+        label = label.replace("{name}", os.path.basename(file_path))
+        print(
+            f"[OK] {label} allowed in {current_phase} phase: {file_path}",
+            file=sys.stderr,
+        )
+        return 0, None
+
+    help_text = "\n".join(rules.help)
+    error_message = f"""
+[ERROR] {rules.title}
+
+Current phase: {current_phase}
+Attempted operation on: {file_path}
+
+{help_text}
+
+To change phase, run: python3 .claude/hooks/phase.py -s <phase>
+"""
+    print(error_message, file=sys.stderr)
+    decision = {"decision": "block", "reason": rules.reason}
+    return 2, decision
+
+
+def main():
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+    started = hook_telemetry.start() if hook_telemetry else None
+    try:
+        if read_payload:
+            # Only the path is checked: the content is skipped, never decoded
+            payload = read_payload(sys.stdin.buffer)
+            data = payload.rest()
+            size = payload.bytes_read
+        else:
+            payload = sys.stdin.buffer.read()
+            data = json.loads(payload)
+            size = len(payload)
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+    exit_code, decision = run_hook(data)
+    if hook_telemetry:
+        hook_telemetry.record("check_phase", started, data, size, exit_code, decision)
+    if decision:
         print(json.dumps(decision))
-        sys.exit(2)
-    sys.exit(0)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
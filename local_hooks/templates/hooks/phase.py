@@ -3,14 +3,21 @@
 Script to clear a file and write a specified string to it.
 Usage: python3 phase.py --string "your_text"
 Default: writes 'code' if no string is specified
+
+The phase is recorded in .claude/.phase_record first, so phase_watch.py
+can tell this change from a direct write to current_phase.
 """
 import argparse
 import os
 
+from phase_watch import write_record
+
 
 def write_phase_file(content="code"):
+    claude_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
     file_path = os.path.join(os.path.dirname(__file__), "../current_phase")
     try:
+        write_record(claude_dir, content.strip())
         with open(file_path, "w") as f:
             f.write(content)
         print(f"Successfully wrote '{content}' to {file_path}")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Optional watcher that guards .claude/current_phase against direct writes
+
+protect_phase_file.py only sees the Edit/Write/MultiEdit tools; a Bash
+`echo code > .claude/current_phase` or a Python one-liner gets past it.
+This watcher runs next to Claude Code instead of inside every tool call:
+it uses inotify on the .claude/ directory (stat polling where inotify is
+not available) and reacts only when current_phase changes.
+
+phase.py records each sanctioned phase in .claude/.phase_record before
+writing current_phase. A change that does not match the record was not
+made by phase.py and is:
+  restore   rewritten back to the recorded phase (default)
+  flag      left in place and reported
+Either way it is printed to stderr and appended to .claude/phase_watch.log.
+
+Like protect_phase_file.py this is a tripwire, not a sandbox: anything
+that rewrites the record as well as the phase is not detected.
+
+Usage: python3 .claude/hooks/phase_watch.py [--mode restore|flag] [--once]
+                                            [--poll SECONDS]
+Run it in the background (nohup ... &) for the length of a session.
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
+import sys
+import time
+
+PHASE_NAME = "current_phase"
+RECORD_NAME = ".phase_record"
+LOG_NAME = "phase_watch.log"
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def default_claude_dir():
+    return os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def read_phase(claude_dir):
+    """Current phase as written, or None when the file is missing"""
+    try:
+        with open(os.path.join(claude_dir, PHASE_NAME), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def read_record(claude_dir):
+    """Phase last set through phase.py, or None"""
+    try:
+        with open(os.path.join(claude_dir, RECORD_NAME), "r") as f:
+            return json.load(f).get("phase")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_record(claude_dir, phase):
+    """Record a sanctioned phase (called by phase.py before the phase write)"""
+    path = os.path.join(claude_dir, RECORD_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"phase": phase, "ts": round(time.time(), 3)}, f)
+    os.replace(tmp, path)
+
+
+def restore_phase(claude_dir, phase):
+    """Put the recorded phase back with an atomic rename"""
+    path = os.path.join(claude_dir, PHASE_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(phase + "\n")
+    os.replace(tmp, path)
+
+
+def log_event(claude_dir, expected, found, action):
+    print(
+        f"[WARNING] {PHASE_NAME} changed to {found!r} outside phase.py "
+        f"(recorded: {expected!r}): {action}",
+        file=sys.stderr,
+        flush=True,
+    )
+    line = {
+        "ts": round(time.time(), 3),
+        "expected": expected,
+        "found": found,
+        "action": action,
+    }
+    try:
+        with open(os.path.join(claude_dir, LOG_NAME), "a") as f:
+            f.write(json.dumps(line) + "\n")
+    except OSError:
+        pass
+
+
+def verify(claude_dir, mode):
+    """Compare the phase file with the record; returns True when they agree"""
+    expected = read_record(claude_dir)
+    found = read_phase(claude_dir)
+    if expected is None:
+        # Deployed before phase.py kept a record: adopt the current phase
+        if found is not None:
+            write_record(claude_dir, found)
+        return True
+    if found == expected:
+        return True
+    if mode == "restore":
+        restore_phase(claude_dir, expected)
+        log_event(claude_dir, expected, found, "restored")
+    else:
+        log_event(claude_dir, expected, found, "flagged")
+    return False
+
+
+def inotify_fd(directory):
+    """An inotify descriptor watching directory, or None where unsupported"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+    except (OSError, AttributeError):
+        return None
+    return fd
+
+
+def read_events(fd):
+    """Yield (mask, name) for one batch of inotify events"""
+    buf = os.read(fd, 64 * 1024)
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(buf):
+        _, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+        start = offset + EVENT_HEADER.size
+        name = buf[start : start + length].rstrip(b"\0")
+        offset = start + length
+        yield mask, os.fsdecode(name)
+
+
+def watch_inotify(fd, claude_dir, mode):
+    """Block on inotify and verify each time the phase file changes"""
+    while True:
+        for mask, name in read_events(fd):
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                print(f"[ERROR] {claude_dir} was removed", file=sys.stderr)
+                return 1
+            if name == PHASE_NAME or mask & IN_Q_OVERFLOW:
+                verify(claude_dir, mode)
+
+
+def watch_poll(claude_dir, mode, interval):
+    """Fallback without inotify: compare stat results every interval"""
+    path = os.path.join(claude_dir, PHASE_NAME)
+    last = None
+    while True:
+        try:
+            st = os.stat(path)
+            stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != last:
+            verify(claude_dir, mode)
+            last = stamp
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Guard .claude/current_phase against changes outside phase.py"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("restore", "flag"),
+        default="restore",
+        help="Restore the recorded phase (default) or only report the change",
+    )
+    parser.add_argument(
+        "--claude-dir", default=default_claude_dir(), help="The .claude directory"
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Verify the phase once and exit"
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=None,
+        help="Poll every SECONDS instead of using inotify",
+    )
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.claude_dir):
+        print(f"[ERROR] Not a directory: {args.claude_dir}", file=sys.stderr)
+        sys.exit(1)
+    if args.once:
+        sys.exit(0 if verify(args.claude_dir, args.mode) else 2)
+
+    # Watch first, then verify, so no change slips in between
+    fd = None if args.poll else inotify_fd(args.claude_dir)
+    verify(args.claude_dir, args.mode)
+    backend = "inotify" if fd is not None else "polling"
+    print(
+        f"[INFO] Watching {args.claude_dir}/{PHASE_NAME} ({backend}, {args.mode})",
+        file=sys.stderr,
+        flush=True,
+    )
+    try:
+        if fd is not None:
+            sys.exit(watch_inotify(fd, args.claude_dir, args.mode))
+        watch_poll(args.claude_dir, args.mode, args.poll or 1.0)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
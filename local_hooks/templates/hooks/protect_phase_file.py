@@ -24,7 +24,11 @@ Protected tools:
 import json
 import os
 import sys
-from pathlib import Path
+
+try:
+    import hook_telemetry  # Copied next to the hooks by phase_manager.py
+except ImportError:
+    hook_telemetry = None
 
 
 def is_phase_file(filepath):
@@ -32,29 +36,20 @@ def is_phase_file(filepath):
     if not filepath:
         return False
     # Normalize path
-    path = Path(filepath).resolve()
-    filename = path.name
+    path = os.path.realpath(filepath)
+    filename = os.path.basename(path)
     # Check if it's the current_phase file
     if filename == "current_phase":
         # Check if it's in a .claude directory
-        parts = path.parts
+        parts = path.split(os.sep)
         for i, part in enumerate(parts):
             if part == ".claude":
                 return True
     return False
 
 
-def main():
-    """Main function"""
-    # Read JSON data from stdin
-    if sys.stdin.isatty():
-        print("[ERROR] No input data received", file=sys.stderr)
-        sys.exit(1)
-    try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
-        sys.exit(1)
+def run_hook(data):
+    """Evaluate a parsed hook payload and return (exit_code, decision)"""
     # Get tool information
     tool_name = data.get("tool_name", "")
     tool_input = data.get("tool_input", {})
@@ -91,11 +86,33 @@ def main():
             "decision": "block",
             "reason": "Direct modification of current_phase is forbidden. Use phase commands instead.",
         }
-        print(json.dumps(decision, ensure_ascii=False))
-        sys.exit(2)  # Block operation
+        return 2, decision  # Block operation
     # Allow all other operations
     print(f"[OK] Operation allowed for: {file_path}", file=sys.stderr)
-    sys.exit(0)
+    return 0, None
+
+
+def main():
+    """Main function"""
+    # Read JSON data from stdin
+    if sys.stdin.isatty():
+        print("[ERROR] No input data received", file=sys.stderr)
+        sys.exit(1)
+    started = hook_telemetry.start() if hook_telemetry else None
+    try:
+        payload = sys.stdin.buffer.read()
+        data = json.loads(payload)
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] JSON parsing error: {e}", file=sys.stderr)
+        sys.exit(1)
+    exit_code, decision = run_hook(data)
+    if hook_telemetry:
+        hook_telemetry.record(
+            "protect_phase_file", started, data, len(payload), exit_code, decision
+        )
+    if decision:
+        print(json.dumps(decision, ensure_ascii=False))
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
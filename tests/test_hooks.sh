@@ -30,6 +30,12 @@ ROOT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 cd "$ROOT_DIR"
 
 mkdir -p tests/tmp
+# Keep dispatch verdicts out of ~/.claude
+export HOOK_VERDICT_CACHE_PATH="$ROOT_DIR/tests/tmp/verdict_cache.sqlite"
+rm -f "$HOOK_VERDICT_CACHE_PATH"*
+export TYPO_INDEX_PATH="$ROOT_DIR/tests/tmp/typo_index.sqlite"
+export HOOK_RULE_CACHE_DIR="$ROOT_DIR/tests/tmp/rule_cache"
+rm -rf "$HOOK_RULE_CACHE_DIR"
 
 ########################################
 # filename_ban_hook.py
@@ -43,6 +49,68 @@ json_ok='{"tool_input":{"file_path":"good_name.py"}}'
 out=$(printf '%s' "$json_ok" | python3 hooks/filename_ban_hook.py 2>tests/tmp/err2.txt); rc=$?
 assert_exit "$rc" 0 "filename_ban: allow good name"
 
+json_numbered='{"tool_name":"Write","tool_input":{"file_path":"Script12.py"}}'
+out=$(printf '%s' "$json_numbered" | python3 hooks/filename_ban_hook.py 2>tests/tmp/err13.txt); rc=$?
+assert_exit "$rc" 2 "filename_ban: block numbered pattern (case-insensitive)"
+
+json_fuzzy='{"tool_name":"Write","tool_input":{"file_path":"src/data_lodaer.py"}}'
+out=$(printf '%s' "$json_fuzzy" | python3 hooks/filename_ban_hook.py 2>tests/tmp/err31.txt); rc=$?
+assert_exit "$rc" 0 "filename_ban: fuzzy typo check is opt-in"
+rm -f "$TYPO_INDEX_PATH"
+out=$(printf '%s' "$json_fuzzy" | TYPO_FUZZY=true python3 hooks/filename_ban_hook.py 2>tests/tmp/err43.txt); rc=$?
+assert_exit "$rc" 0 "filename_ban: fuzzy typo check skipped without an index"
+assert_contains "$(cat tests/tmp/err43.txt)" 'typo_index.py build' "filename_ban: missing typo index reported"
+python3 hooks/typo_index.py build >/dev/null
+out=$(printf '%s' "$json_fuzzy" | TYPO_FUZZY=true python3 hooks/filename_ban_hook.py 2>tests/tmp/err31.txt); rc=$?
+assert_exit "$rc" 2 "filename_ban: typo outside COMMON_TYPOS found by the fuzzy index"
+assert_contains "$out" 'data_loader.py' "filename_ban: fuzzy typo correction suggested"
+json_relay='{"tool_name":"Write","tool_input":{"file_path":"src/relay_medal.py"}}'
+out=$(printf '%s' "$json_relay" | TYPO_FUZZY=true python3 hooks/filename_ban_hook.py 2>tests/tmp/err44.txt); rc=$?
+assert_exit "$rc" 0 "filename_ban: real words are not fuzzy typos"
+
+mkdir -p tests/tmp/rules_project/.claude
+cat > tests/tmp/rules_project/.claude/hook_rules.toml <<'EOF'
+[filename.bad_patterns.vendored]
+patterns = ["^vendored_", "^pkgcopy_|_pkgcopy$"]
+reason = "Vendored copy detected"
+
+[filename.bad_patterns.repeated]
+patterns = ['(\w+)_\1$', '^(?P<word>x+)-(?P=word)$']
+reason = "Repeated word"
+
+[filename]
+markdown_allowlist = ["CHANGELOG.md"]
+EOF
+json_vendored='{"tool_name":"Write","tool_input":{"file_path":"vendored_lib.py"}}'
+for run in 1 2; do  # The second run loads the compiled rules from the cache
+  out=$(printf '%s' "$json_vendored" | CLAUDE_PROJECT_DIR=tests/tmp/rules_project python3 hooks/filename_ban_hook.py 2>tests/tmp/err32.txt); rc=$?
+  assert_exit "$rc" 2 "filename_ban: rule file adds a bad pattern (run $run)"
+done
+json_alternation='{"tool_name":"Write","tool_input":{"file_path":"notes_pkgcopy.py"}}'
+out=$(printf '%s' "$json_alternation" | CLAUDE_PROJECT_DIR=tests/tmp/rules_project python3 hooks/filename_ban_hook.py 2>tests/tmp/err38.txt); rc=$?
+assert_exit "$rc" 2 "filename_ban: unanchored branch of a ^a|b$ pattern"
+json_repeated='{"tool_name":"Write","tool_input":{"file_path":"report_report.py"}}'
+out=$(printf '%s' "$json_repeated" | CLAUDE_PROJECT_DIR=tests/tmp/rules_project python3 hooks/filename_ban_hook.py 2>tests/tmp/err45.txt); rc=$?
+assert_exit "$rc" 2 "filename_ban: rule pattern with a backreference"
+assert_contains "$out" 'Repeated word' "filename_ban: backreference pattern reports its own category"
+json_changelog='{"tool_name":"Write","tool_input":{"file_path":"CHANGELOG.md"}}'
+out=$(printf '%s' "$json_changelog" | CLAUDE_PROJECT_DIR=tests/tmp/rules_project python3 hooks/filename_ban_hook.py 2>tests/tmp/err33.txt); rc=$?
+assert_exit "$rc" 0 "filename_ban: rule file extends the markdown allowlist"
+
+json_vendor='{"tool_name":"Write","tool_input":{"file_path":"node_modules/pkg/final_v2.py"}}'
+out=$(printf '%s' "$json_vendor" | python3 hooks/filename_ban_hook.py 2>tests/tmp/err34.txt); rc=$?
+assert_exit "$rc" 0 "filename_ban: skip paths under node_modules/"
+printf 'generated/\n' > tests/tmp/rules_project/.gitignore
+out=$(printf '%s' '{"tool_input":{"file_path":"generated/plot.py","content":"plt.show()\n"}}' | (cd tests/tmp/rules_project && python3 "$ROOT_DIR/hooks/no_show_in_python_hook.py") 2>tests/tmp/err35.txt); rc=$?
+assert_exit "$rc" 0 "no_show: skip paths excluded by .gitignore"
+
+# Large payloads are parsed as a stream, also when file_path follows content
+python3 -c 'import json; print(json.dumps({"tool_name": "Write", "tool_input": {"content": "x = \"a\\\\b\"\n" * 300000 + "plt.show()\n", "file_path": "big_v2.py"}}))' > tests/tmp/big_payload.json
+out=$(python3 hooks/filename_ban_hook.py < tests/tmp/big_payload.json 2>tests/tmp/err36.txt); rc=$?
+assert_exit "$rc" 2 "filename_ban: path after a large streamed content"
+out=$(python3 hooks/no_show_in_python_hook.py < tests/tmp/big_payload.json 2>tests/tmp/err37.txt); rc=$?
+assert_exit "$rc" 2 "no_show: call at the end of a large streamed content"
+
 ########################################
 # check_chinese_hook.py
 ########################################
@@ -56,6 +124,28 @@ out=$(CHECK_MODE=comments CHECK_CHINESE=true BLOCK_ON_DETECTION=true \
       printf '%s' "$json_ascii" | python3 hooks/check_chinese_hook.py 2>tests/tmp/err4.txt); rc=$?
 assert_exit "$rc" 0 "check_chinese: allow ASCII comments"
 
+json_cn_many='{"tool_input":{"file_path":"main.py","content":"# 中文 中文 中\n"}}'
+out=$(printf '%s' "$json_cn_many" | CHECK_MODE=comments BLOCK_ON_DETECTION=false \
+      python3 hooks/check_chinese_hook.py 2>tests/tmp/err16.txt); rc=$?
+assert_exit "$rc" 0 "check_chinese: report mode allows operation"
+assert_contains "$(cat tests/tmp/err16.txt)" 'Total 5 Chinese' "check_chinese: report mode counts characters"
+
+json_cn_string='{"tool_input":{"file_path":"main.py","content":"x = \"# 中文\"  # ascii\n"}}'
+out=$(printf '%s' "$json_cn_string" | CHECK_MODE=comments python3 hooks/check_chinese_hook.py 2>tests/tmp/err17.txt); rc=$?
+assert_exit "$rc" 0 "check_chinese: '#' inside a string is not a comment"
+
+json_cn_block='{"tool_input":{"file_path":"main.c","content":"int x; /* 中文 unterminated"}}'
+out=$(printf '%s' "$json_cn_block" | CHECK_MODE=comments python3 hooks/check_chinese_hook.py 2>tests/tmp/err18.txt); rc=$?
+assert_exit "$rc" 2 "check_chinese: block on unterminated block comment"
+
+json_cn_rust_char=$(printf '{"tool_input":{"file_path":"main.rs","content":"fn f<%sa>(s: &%sa str) { let q = %s; } // 中文注释\\n"}}' "'" "'" "'\\\"'")
+out=$(printf '%s' "$json_cn_rust_char" | CHECK_MODE=comments python3 hooks/check_chinese_hook.py 2>tests/tmp/err48.txt); rc=$?
+assert_exit "$rc" 2 "check_chinese: Rust '\"' char literal does not open a string"
+
+json_cn_multi='{"tool_name":"MultiEdit","tool_input":{"file_path":"main.py","edits":[{"old_string":"a = 1","new_string":"a = 2"},{"old_string":"b = 1","new_string":"b = 1  # 中文"}]}}'
+out=$(printf '%s' "$json_cn_multi" | CHECK_MODE=comments python3 hooks/check_chinese_hook.py 2>tests/tmp/err19.txt); rc=$?
+assert_exit "$rc" 2 "check_chinese: block on Chinese added by a MultiEdit edit"
+
 ########################################
 # no_show_in_python_hook.py
 ########################################
@@ -63,6 +153,38 @@ json_show='{"tool_input":{"file_path":"plot.py","content":"import matplotlib\\ni
 out=$(printf '%s' "$json_show" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err5.txt); rc=$?
 assert_exit "$rc" 2 "no_show: block plt.show()"
 
+json_show_removed='{"tool_name":"Edit","tool_input":{"file_path":"plot.py","old_string":"plt.plot(x)\nplt.show()","new_string":"plt.plot(x)\nplt.savefig(\"x.png\")"}}'
+out=$(printf '%s' "$json_show_removed" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err20.txt); rc=$?
+assert_exit "$rc" 0 "no_show: allow an Edit that removes plt.show()"
+
+json_show_string='{"tool_input":{"file_path":"doc.py","content":"msg = \"call plt.show() later\"  # not fig.show()\n"}}'
+out=$(printf '%s' "$json_show_string" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err21.txt); rc=$?
+assert_exit "$rc" 0 "no_show: ignore .show() inside strings and comments"
+
+json_input='{"tool_input":{"file_path":"cli.py","content":"import cv2\nname = input(\"name? \")\n"}}'
+out=$(printf '%s' "$json_input" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err22.txt); rc=$?
+assert_exit "$rc" 2 "no_show: block input() call"
+assert_contains "$(cat tests/tmp/err22.txt)" '2:8 input()' "no_show: report line and column"
+
+json_alias='{"tool_input":{"file_path":"docs.py","content":"from webbrowser import open as wopen\n# a\u000cb c\nwopen(url)\n"}}'
+out=$(printf '%s' "$json_alias" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err39.txt); rc=$?
+assert_exit "$rc" 2 "no_show: block a call renamed on import"
+assert_contains "$(cat tests/tmp/err39.txt)" '3:1 webbrowser.open()' "no_show: line numbers ignore form feeds"
+json_cr='{"tool_input":{"file_path":"docs.py","content":"x = 1\r# note\rimport webbrowser\rwebbrowser.open(\"u\")\n"}}'
+out=$(printf '%s' "$json_cr" | python3 hooks/no_show_in_python_hook.py 2>tests/tmp/err46.txt); rc=$?
+assert_exit "$rc" 2 "no_show: block a call in CR-only content"
+assert_contains "$(cat tests/tmp/err46.txt)" '4:1 webbrowser.open()' "no_show: CR line breaks counted like the compiler"
+
+########################################
+# hook_telemetry.py
+########################################
+rm -f tests/tmp/telemetry.jsonl*
+printf '%s' "$json_cn" | HOOK_TELEMETRY=true HOOK_TELEMETRY_LOG=tests/tmp/telemetry.jsonl \
+  python3 hooks/check_chinese_hook.py >/dev/null 2>&1
+out=$(python3 hooks/hook_telemetry.py stats --log tests/tmp/telemetry.jsonl --by hook 2>&1); rc=$?
+assert_exit "$rc" 0 "hook_telemetry: stats over logged calls"
+assert_contains "$out" 'check_chinese_hook' "hook_telemetry: hook call recorded"
+
 ########################################
 # protect_phase_file.py
 ########################################
@@ -70,6 +192,211 @@ json_phase='{"tool_input":{"file_path":"/home/user/project/.claude/current_phase
 out=$(printf '%s' "$json_phase" | python3 local_hooks/templates/hooks/protect_phase_file.py 2>tests/tmp/err6.txt); rc=$?
 assert_exit "$rc" 2 "protect_phase: block direct phase file edit"
 
+########################################
+# check_phase.py (deployed by phase_manager.py)
+########################################
+rm -rf tests/tmp/phase_project && mkdir -p tests/tmp/phase_project
+python3 local_hooks/phase_manager.py --target tests/tmp/phase_project >/dev/null
+echo testdesign > tests/tmp/phase_project/.claude/current_phase
+out=$(printf '%s' '{"tool_input":{"file_path":"src/tests/test_api.py"}}' | \
+      python3 tests/tmp/phase_project/.claude/hooks/check_phase.py 2>tests/tmp/err28.txt); rc=$?
+assert_exit "$rc" 0 "check_phase: policy allows tests/ in testdesign"
+out=$(printf '%s' '{"tool_input":{"file_path":"src/api.py"}}' | \
+      python3 tests/tmp/phase_project/.claude/hooks/check_phase.py 2>tests/tmp/err29.txt); rc=$?
+assert_exit "$rc" 2 "check_phase: policy blocks code in testdesign"
+assert_contains "$out" 'tests/ or temp/' "check_phase: block reason comes from the policy"
+[ -f tests/tmp/phase_project/.claude/phase_policy.marshal ]
+assert_exit "$?" 0 "check_phase: compiled policy cached on disk"
+python3 -c '
+import json, sys
+path = sys.argv[1]
+with open(path) as f:
+    policy = json.load(f)
+policy["phases"]["testdesign"]["allow"].append({"label": "Spec", "globs": ["src/*_spec.py"]})
+with open(path, "w") as f:
+    json.dump(policy, f)' tests/tmp/phase_project/.claude/phase_policy.json
+out=$(printf '%s' '{"tool_input":{"file_path":"src/api_spec.py"}}' | \
+      python3 tests/tmp/phase_project/.claude/hooks/check_phase.py 2>tests/tmp/err52.txt); rc=$?
+assert_exit "$rc" 0 "check_phase: an edited policy replaces the cached one"
+
+rm -rf tests/tmp/fleet && mkdir -p tests/tmp/fleet/repo_a tests/tmp/fleet/repo_b
+echo code > tests/tmp/phase_project/.claude/current_phase
+out=$(python3 local_hooks/phase_manager.py --target 'tests/tmp/fleet/*' --target tests/tmp/phase_project \
+      --jobs 2 --summary - 2>/dev/null | \
+      python3 -c 'import json, sys; d = json.load(sys.stdin); print(d["deployed"], d["failed"])'); rc=$?
+assert_contains "$out" '3 0' "phase_manager: fleet deploy summary"
+out=$(python3 local_hooks/phase_manager.py --target 'tests/tmp/fleet/repo_a' --target 'tests/tmp/fleet/none_*' \
+      --summary - 2>/dev/null | \
+      python3 -c 'import json, sys; print(len({tuple(sorted(r)) for r in json.load(sys.stdin)["targets"]}))')
+assert_contains "$out" '^1$' "phase_manager: unmatched globs get the same summary fields"
+assert_contains "$(cat tests/tmp/phase_project/.claude/current_phase)" 'code' "phase_manager: re-run keeps the current phase"
+echo '# local note' >> tests/tmp/phase_project/.claude/commands/phase_02_plan.md
+out=$(python3 local_hooks/phase_manager.py --target tests/tmp/phase_project 2>&1); rc=$?
+assert_contains "$out" 'template files already up to date' "phase_manager: unchanged templates are not rewritten"
+assert_contains "$out" 'phase_02_plan.md was modified locally' "phase_manager: local edits are kept without --force"
+
+cat > tests/tmp/user_settings.json <<EOF
+{"hooks": {"PreToolUse": [{"matcher": "Edit|Write|MultiEdit", "hooks": [{"type": "command",
+  "command": "HOOK_CHECKS=chinese,filename,show,protect_phase $ROOT_DIR/hooks/dispatch_hook.py"}]}]}}
+EOF
+so_args="--project tests/tmp/phase_project --user-settings tests/tmp/user_settings.json"
+out=$(python3 hooks/settings_optimizer.py $so_args --telemetry-log tests/tmp/none --write 2>&1); rc=$?
+assert_contains "$out" 'Write: protect_phase runs in 2 processes' "settings_optimizer: duplicate check reported"
+out=$(python3 hooks/settings_optimizer.py $so_args --telemetry-log tests/tmp/none 2>&1); rc=$?
+assert_contains "$out" 'already minimal' "settings_optimizer: --write leaves one process per check"
+rm -rf tests/tmp/local_phase_project && mkdir -p tests/tmp/local_phase_project
+python3 local_hooks/phase_manager.py --target tests/tmp/local_phase_project >/dev/null
+echo '{}' > tests/tmp/no_user_settings.json
+out=$(python3 hooks/settings_optimizer.py --project tests/tmp/local_phase_project \
+      --user-settings tests/tmp/no_user_settings.json --telemetry-log tests/tmp/none 2>&1); rc=$?
+assert_contains "$out" 'already minimal' "settings_optimizer: project-local hooks are not folded into dispatch"
+
+python3 tests/tmp/phase_project/.claude/hooks/phase.py -s plan >/dev/null
+echo code > tests/tmp/phase_project/.claude/current_phase
+python3 tests/tmp/phase_project/.claude/hooks/phase_watch.py --once 2>tests/tmp/err30.txt; rc=$?
+assert_exit "$rc" 2 "phase_watch: direct phase write detected"
+assert_contains "$(cat tests/tmp/phase_project/.claude/current_phase)" 'plan' "phase_watch: recorded phase restored"
+
+########################################
+# dispatch_hook.py
+########################################
+json_multi='{"tool_name":"Write","tool_input":{"file_path":"final_v2.py","content":"# 注释\nplt.show()"}}'
+out=$(printf '%s' "$json_multi" | HOOK_CHECKS=chinese,filename,show,protect_phase \
+      python3 hooks/dispatch_hook.py 2>tests/tmp/err8.txt); rc=$?
+assert_exit "$rc" 2 "dispatch: block when any check blocks"
+assert_contains "$out" 'Version number' "dispatch: merged reason includes filename check"
+assert_contains "$out" 'savefig' "dispatch: merged reason includes show check"
+
+json_edit_ok='{"tool_name":"Edit","tool_input":{"file_path":"final_v2.py","old_string":"a","new_string":"b"}}'
+out=$(printf '%s' "$json_edit_ok" | python3 hooks/dispatch_hook.py 2>tests/tmp/err9.txt); rc=$?
+assert_exit "$rc" 0 "dispatch: filename check only runs on Write"
+
+out=$(printf '%s' "$json_phase" | HOOK_CHECKS=protect_phase python3 hooks/dispatch_hook.py 2>tests/tmp/err10.txt); rc=$?
+assert_exit "$rc" 2 "dispatch: protect_phase found in templates"
+
+mkdir -p tests/tmp/no_hooks_project
+out=$(printf '%s' "$json_edit_ok" | CLAUDE_PROJECT_DIR=tests/tmp/no_hooks_project HOOK_CHECKS=phase \
+      python3 hooks/dispatch_hook.py 2>tests/tmp/err42.txt); rc=$?
+assert_exit "$rc" 2 "dispatch: a configured check whose file is missing blocks"
+assert_contains "$out" 'check_phase.py was not found' "dispatch: missing check named in the reason"
+
+out=$(printf '%s' "$json_multi" | HOOK_CHECKS=chinese,filename,show \
+      python3 hooks/dispatch_hook.py 2>tests/tmp/err27.txt); rc=$?
+assert_exit "$rc" 2 "dispatch: cached verdict still blocks"
+assert_contains "$(cat tests/tmp/err27.txt)" "Check 'show': cached verdict" "dispatch: retried write hits verdict cache"
+
+python3 -c 'import json; print(json.dumps({"tool_name": "Write", "tool_input": {"file_path": "big.py", "content": "x = 1\n" * 300000 + "plt.show()  # 注释\n"}}))' > tests/tmp/big_dispatch.json
+out=$(HOOK_CHECKS=chinese,show python3 hooks/dispatch_hook.py < tests/tmp/big_dispatch.json 2>tests/tmp/err47.txt); rc=$?
+assert_exit "$rc" 2 "dispatch: content checks share a large streamed content"
+assert_contains "$out" 'Chinese; .show()' "dispatch: both content checks read the streamed content"
+out=$(sed 's/big\.py/big.txt/' tests/tmp/big_dispatch.json | python3 -c '
+import sys
+sys.path.insert(0, "hooks")
+import dispatch_hook, hook_payload
+spools = []
+class Spool(hook_payload.ContentSpool):
+    def __init__(self, chunks):
+        super().__init__(chunks)
+        spools.append(self)
+hook_payload.ContentSpool = Spool
+payload = hook_payload.read_payload(sys.stdin.buffer)
+code, _ = dispatch_hook.dispatch(payload, dispatch_hook.load_checks(["show"]))
+print(code, spools[0].size)' 2>tests/tmp/err50.txt)
+assert_contains "$out" '^0 0$' "dispatch: a skipped path leaves streamed content unread"
+
+rm -rf tests/tmp/nested_ignore && mkdir -p tests/tmp/nested_ignore/sub
+json_nested='{"tool_name":"Write","tool_input":{"file_path":"sub/foo_v2.py"}}'
+(cd tests/tmp/nested_ignore && printf '%s' "$json_nested" | HOOK_CHECKS=filename python3 "$ROOT_DIR/hooks/dispatch_hook.py" >/dev/null 2>&1)
+printf '*\n' > tests/tmp/nested_ignore/sub/.gitignore
+out=$(cd tests/tmp/nested_ignore && printf '%s' "$json_nested" | HOOK_CHECKS=filename \
+      python3 "$ROOT_DIR/hooks/dispatch_hook.py" 2>"$ROOT_DIR/tests/tmp/err41.txt"); rc=$?
+assert_exit "$rc" 0 "dispatch: a new nested .gitignore invalidates cached verdicts"
+
+########################################
+# hook_client.py / hook_daemon.py
+########################################
+sock="$ROOT_DIR/tests/tmp/hook_daemon.sock"
+out=$(printf '%s' "$json_multi" | HOOK_DAEMON_SOCKET="$sock" HOOK_DAEMON_AUTOSTART=false \
+      python3 hooks/hook_client.py 2>tests/tmp/err11.txt); rc=$?
+assert_exit "$rc" 2 "hook_client: in-process fallback without daemon"
+
+python3 hooks/hook_daemon.py --socket "$sock" --idle-timeout 30 2>tests/tmp/daemon.txt &
+for _ in 1 2 3 4 5 6 7 8 9 10; do [ -S "$sock" ] && break; sleep 0.2; done
+out=$(printf '%s' "$json_multi" | HOOK_DAEMON_SOCKET="$sock" HOOK_DAEMON_AUTOSTART=false \
+      python3 hooks/hook_client.py 2>tests/tmp/err12.txt); rc=$?
+assert_exit "$rc" 2 "hook_client: block via daemon"
+assert_contains "$out" 'Version number' "hook_client: daemon returns merged decision"
+json_input='{"tool_name":"Write","tool_input":{"file_path":"ask.py","content":"x = input()\n"}}'
+out=$(printf '%s' "$json_input" | HOOK_DAEMON_SOCKET="$sock" HOOK_DAEMON_AUTOSTART=false HOOK_CHECKS=show \
+      CHECK_ALLOWED_CALLS=input python3 hooks/hook_client.py 2>tests/tmp/err49.txt); rc=$?
+assert_exit "$rc" 0 "hook_client: daemon applies CHECK_ALLOWED_CALLS"
+python3 hooks/hook_daemon.py --socket "$sock" --stop 2>/dev/null
+wait
+
+out=$(python3 -c '
+import os, sys
+sys.path.insert(0, "hooks")
+import hook_daemon
+server = hook_daemon.HookServer(sys.argv[1])
+try:
+    for i in range(20):
+        server.get_context({"HOOK_CHECKS": "chinese,show", "CLAUDE_SESSION_ID": str(i)})
+    sizes = [len(server.contexts)]
+    for i in range(20):
+        server.get_context({"HOOK_CHECKS": "show", "CHECK_ALLOWED_CALLS": str(i)})
+    sizes.append(len(server.contexts))
+finally:
+    server.server_close()
+    os.unlink(sys.argv[1])
+print(*sizes, hook_daemon.MAX_CONTEXTS)' "$sock" 2>tests/tmp/err51.txt)
+assert_contains "$out" '^1 8 8$' "hook_daemon: contexts keyed on read variables, LRU-capped"
+
+########################################
+# build_bundle.py (precompiled zipapp)
+########################################
+python3 hooks/build_bundle.py --output tests/tmp/claude_hooks.pyz >/dev/null
+out=$(printf '%s' "$json_multi" | python3 -I -S tests/tmp/claude_hooks.pyz dispatch 2>tests/tmp/err14.txt); rc=$?
+assert_exit "$rc" 2 "bundle: dispatch blocks under -I -S"
+out=$(printf '%s' "$json_phase" | python3 -I -S tests/tmp/claude_hooks.pyz protect_phase 2>tests/tmp/err15.txt); rc=$?
+assert_exit "$rc" 2 "bundle: protect_phase entry point"
+
+########################################
+# audit.py (repository-wide audit)
+########################################
+rm -rf tests/tmp/audit_tree && mkdir -p tests/tmp/audit_tree/src
+printf '# 注释\nimport matplotlib.pyplot as plt\nplt.show()\n' > tests/tmp/audit_tree/src/plot_final.py
+echo 'x = 1' > tests/tmp/audit_tree/src/user_service.py
+out=$(python3 hooks/audit.py tests/tmp/audit_tree --jobs 2 2>tests/tmp/err23.txt); rc=$?
+assert_exit "$rc" 2 "audit: exit 2 when findings exist"
+assert_contains "$out" '"rule": "blocking_call", .*"line": 3' "audit: JSON Lines finding with line"
+out=$(python3 hooks/audit.py tests/tmp/audit_tree --format sarif --jobs 1 2>/dev/null | \
+      python3 -c 'import json,sys; print(len(json.load(sys.stdin)["runs"][0]["results"]))')
+assert_contains "$out" '^3$' "audit: SARIF output is valid JSON"
+
+repo=tests/tmp/staged_repo
+rm -rf "$repo" && mkdir -p "$repo" && git -C "$repo" init -q
+printf 'import matplotlib.pyplot as plt\nplt.show()\n' > "$repo/plot.py"
+git -C "$repo" add plot.py
+git -C "$repo" -c user.name=t -c user.email=t@t commit -qm init
+printf 'x = 1\n' >> "$repo/plot.py"
+git -C "$repo" add plot.py
+out=$(cd "$repo" && python3 "$ROOT_DIR/hooks/audit.py" --staged 2>"$ROOT_DIR/tests/tmp/err24.txt"); rc=$?
+assert_exit "$rc" 0 "audit --staged: only added lines are checked"
+printf '# 注释\n' > "$repo/final_v2.py"
+git -C "$repo" add final_v2.py
+out=$(cd "$repo" && python3 "$ROOT_DIR/hooks/audit.py" --staged 2>"$ROOT_DIR/tests/tmp/err25.txt"); rc=$?
+assert_exit "$rc" 2 "audit --staged: block staged issues"
+assert_contains "$out" '"decision": "block"' "audit --staged: hook decision JSON"
+repo=tests/tmp/staged_names_repo
+rm -rf "$repo" && mkdir -p "$repo" && git -C "$repo" init -q
+printf 'import matplotlib.pyplot as plt\nplt.show()\n' > "$repo/my plot.py"
+printf 'import matplotlib.pyplot as plt\nplt.show()\n' > "$repo/grafik_\"ü\".py"
+git -C "$repo" add .
+out=$(cd "$repo" && python3 "$ROOT_DIR/hooks/audit.py" --staged --checks show 2>"$ROOT_DIR/tests/tmp/err40.txt"); rc=$?
+assert_exit "$rc" 2 "audit --staged: content checks on quoted diff paths"
+assert_contains "$out" 'my plot.py: ' "audit --staged: path with a space"
+assert_contains "$out" 'grafik_\\"ü\\".py: ' "audit --staged: C-quoted non-ASCII path"
+
 ########################################
 # formatting_hook.sh (wrapper)
 ########################################
@@ -79,6 +406,53 @@ out=$(printf '%s' "$json_fmt" | bash hooks/formatting_hook.sh 2>tests/tmp/err7.t
 # Even without formatters installed, should not fail
 assert_exit "$rc" 0 "formatting_hook: run without error"
 
+if command -v jq >/dev/null 2>&1; then
+  rm -rf tests/tmp/format_cache
+  echo '{"a":1}' > tests/tmp/sample.json
+  json_fmt_json='{"tool_input":{"file_path":"tests/tmp/sample.json"}}'
+  printf '%s' "$json_fmt_json" | FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting_hook.sh >/dev/null 2>&1
+  out=$(printf '%s' "$json_fmt_json" | FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting_hook.sh 2>&1); rc=$?
+  assert_exit "$rc" 0 "formatting_hook: second run of a clean file"
+  assert_contains "$out" 'cached' "formatting_hook: clean file skipped via content-hash cache"
+
+  # Config files next to the formatted file (not in $PWD) are part of the key
+  mkdir -p tests/tmp/fmt_cfg && rm -f tests/tmp/fmt_cfg/.editorconfig
+  echo '{"b":1}' > tests/tmp/fmt_cfg/sample.json
+  CLAUDE_FILE_PATHS=tests/tmp/fmt_cfg/sample.json FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting.sh >/dev/null 2>&1
+  printf 'root = true\n' > tests/tmp/fmt_cfg/.editorconfig
+  out=$(CLAUDE_FILE_PATHS=tests/tmp/fmt_cfg/sample.json FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting.sh 2>&1)
+  assert_exit "$(printf '%s' "$out" | grep -c 'cached')" 0 "formatting.sh: config file in the file's directory invalidates the cache"
+  rm -f tests/tmp/fmt_cfg/package.json
+  CLAUDE_FILE_PATHS=tests/tmp/fmt_cfg/sample.json FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting.sh >/dev/null 2>&1
+  echo '{"prettier":{"tabWidth":4}}' > tests/tmp/fmt_cfg/package.json
+  out=$(CLAUDE_FILE_PATHS=tests/tmp/fmt_cfg/sample.json FORMAT_CACHE_DIR=tests/tmp/format_cache bash hooks/formatting.sh 2>&1)
+  assert_exit "$(printf '%s' "$out" | grep -c 'cached')" 0 "formatting.sh: a package.json prettier key invalidates the cache"
+
+  # Eviction keeps the most recently used markers
+  rm -rf tests/tmp/format_lru && mkdir -p tests/tmp/format_lru
+  for name in a b c; do echo "{\"$name\":1}" > "tests/tmp/format_lru/$name.json"; done
+  fmt_lru() {
+    CLAUDE_FILE_PATHS="tests/tmp/format_lru/$1.json" FORMAT_CACHE_DIR=tests/tmp/format_lru/cache \
+      FORMAT_CACHE_MAX_ENTRIES=2 FORMAT_CACHE_EVICT_EVERY=1 bash hooks/formatting.sh 2>&1
+  }
+  fmt_lru a >/dev/null; fmt_lru b >/dev/null; fmt_lru a >/dev/null; fmt_lru c >/dev/null
+  assert_contains "$(fmt_lru a)" 'cached' "formatting.sh: a recently hit marker survives eviction"
+  assert_exit "$(fmt_lru b | grep -c 'cached')" 0 "formatting.sh: the least recently used marker is evicted"
+fi
+
+fsock="$ROOT_DIR/tests/tmp/format_server.sock"
+python3 hooks/format_server.py --socket "$fsock" --idle-timeout 30 2>tests/tmp/format_server.txt &
+for _ in 1 2 3 4 5 6 7 8 9 10; do [ -S "$fsock" ] && break; sleep 0.2; done
+echo 'a=1' > tests/tmp/sample.sh
+out=$(FORMAT_SERVER_SOCKET="$fsock" python3 hooks/format_client.py tests/tmp/sample.sh 2>/dev/null); rc=$?
+assert_exit "$rc" 0 "format_client: server reachable"
+assert_contains "$out" 'tests/tmp/sample.sh' "format_client: unsupported files are handed back"
+out=$(printf '%s' "$json_fmt" | FORMAT_SERVER=true FORMAT_SERVER_SOCKET="$fsock" \
+      bash hooks/formatting_hook.sh 2>tests/tmp/err26.txt); rc=$?
+assert_exit "$rc" 0 "formatting_hook: format via server"
+python3 hooks/format_server.py --socket "$fsock" --stop 2>/dev/null
+wait
+
 echo ""
 echo "Summary: $pass_count passed, $fail_count failed"
 if [ "$fail_count" -gt 0 ]; then
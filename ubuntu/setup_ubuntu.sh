@@ -12,6 +12,21 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 REPO_ROOT="$(dirname "$SCRIPT_DIR")"
 HOOKS_DIR="$REPO_ROOT/hooks"
 
+# PreToolUse entry point: in-process dispatcher (default), the daemon client
+# (--daemon) or the precompiled bundle run with isolated flags (--bundle).
+# --daemon also sends formatting to the long-lived format server.
+PRETOOL_COMMAND="$HOOKS_DIR/dispatch_hook.py"
+POSTTOOL_COMMAND="$HOOKS_DIR/formatting_hook.sh"
+for arg in "$@"; do
+    case "$arg" in
+        --daemon)
+            PRETOOL_COMMAND="$HOOKS_DIR/hook_client.py"
+            POSTTOOL_COMMAND="FORMAT_SERVER=true $HOOKS_DIR/formatting_hook.sh"
+            ;;
+        --bundle) PRETOOL_COMMAND="python3 -I -S $HOOKS_DIR/claude_hooks.pyz dispatch" ;;
+    esac
+done
+
 # Check if hooks directory exists
 if [ ! -d "$HOOKS_DIR" ]; then
     echo "Error: hooks directory not found at $HOOKS_DIR"
@@ -24,6 +39,14 @@ echo "Setting permissions..."
 chmod +x "$HOOKS_DIR"/*.py
 chmod +x "$HOOKS_DIR"/*.sh
 
+# Build the precompiled hook bundle when requested
+case " $* " in
+    *" --bundle "*)
+        echo "Building precompiled hook bundle..."
+        python3 "$HOOKS_DIR/build_bundle.py" --output "$HOOKS_DIR/claude_hooks.pyz"
+        ;;
+esac
+
 # Create Claude settings directory
 echo "Creating Claude settings directory..."
 mkdir -p ~/.claude
@@ -47,34 +70,7 @@ else
         "hooks": [
           {
             "type": "command",
-            "command": "CHECK_MODE=comments $HOOKS_DIR/check_chinese_hook.py"
-          }
-        ]
-      },
-      {
-        "matcher": "Write",
-        "hooks": [
-          {
-            "type": "command",
-            "command": "$HOOKS_DIR/filename_ban_hook.py"
-          }
-        ]
-      },
-      {
-        "matcher": "Edit|Write|MultiEdit",
-        "hooks": [
-          {
-            "type": "command",
-            "command": "$HOOKS_DIR/no_show_in_python_hook.py"
-          }
-        ]
-      },
-      {
-        "matcher": "Edit|Write|MultiEdit",
-        "hooks": [
-          {
-            "type": "command",
-            "command": "$HOOKS_DIR/protect_phase_file.py"
+            "command": "CHECK_MODE=comments HOOK_CHECKS=chinese,filename,show,protect_phase $PRETOOL_COMMAND"
           }
         ]
       }
@@ -85,7 +81,7 @@ else
         "hooks": [
           {
             "type": "command",
-            "command": "$HOOKS_DIR/formatting_hook.sh"
+            "command": "$POSTTOOL_COMMAND"
           }
         ]
       }
@@ -96,6 +92,8 @@ EOF
     
     # Replace variables with actual paths
     sed -i "s|\$HOOKS_DIR|$HOOKS_DIR|g" ~/.claude/settings.json
+    sed -i "s|\$PRETOOL_COMMAND|$PRETOOL_COMMAND|g" ~/.claude/settings.json
+    sed -i "s|\$POSTTOOL_COMMAND|$POSTTOOL_COMMAND|g" ~/.claude/settings.json
     echo "Success: Settings file created successfully!"
 fi
 